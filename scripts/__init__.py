@@ -0,0 +1,6 @@
+"""
+Cost reporting scripts for Simple Claude Conductor.
+
+Modules import each other through this package (from scripts.x import ...),
+whether loaded by the server or run as command-line scripts.
+"""
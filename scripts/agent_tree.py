@@ -0,0 +1,153 @@
+"""
+Subagent Spawn Tree for Simple Claude Conductor
+
+Rebuilds who spawned whom in a session from its parsed logs. A parent's
+Task call is linked to the agent its result names (toolUseResult.agentId);
+a log nested under another agent's directory belongs to that agent; any
+other subagent is matched to the spawn call that was open when it started,
+and falls back to the main session.
+
+Tokens, cost and wall-clock time are rolled up per subtree, so an
+expensive or slow delegation branch stands out.
+"""
+
+from scripts.phase_costs import parse_time
+
+TOKEN_FIELDS = ('input_tokens', 'output_tokens', 'cache_read', 'cache_write')
+
+
+def folder_parent(path):
+    """Log of the agent whose directory a nested subagent log sits in, or None."""
+    parent_dir = path.parent.parent
+    if path.parent.name == 'subagents' and parent_dir.name.startswith('agent-'):
+        return parent_dir.with_name(parent_dir.name + '.jsonl')
+    return None
+
+
+def _is_ancestor(parents, candidate, node):
+    """Check whether node is candidate or one of its ancestors."""
+    while candidate is not None:
+        if candidate == node:
+            return True
+        candidate = parents.get(candidate)
+    return False
+
+
+def link_agents(agents, aggregates, paths):
+    """
+    Find the parent of every subagent.
+
+    Args:
+        agents: Agent rows (main first), as built by summarize_session
+        aggregates: Parsed logs parallel to agents
+        paths: Log paths parallel to agents
+
+    Returns:
+        Dict of child index -> (parent index, how it was linked: 'agentId',
+        'folder', 'time' or 'fallback', spawning tool_use id or None)
+    """
+    index = {}
+    by_path = {path: i for i, path in enumerate(paths)}
+    for i, (agent, stats) in enumerate(zip(agents, aggregates)):
+        index[agent['id']] = i
+        if i and stats.get('agent_id'):
+            index.setdefault(stats['agent_id'], i)
+
+    links = {}
+    parents = {}
+    open_spawns = []
+
+    def link(child, parent, how, spawn_id):
+        links[child] = (parent, how, spawn_id)
+        parents[child] = parent
+
+    for i, stats in enumerate(aggregates):
+        for spawn in stats.get('spawns', []):
+            child = index.get(spawn['agent'])
+            if child and child not in links and not _is_ancestor(parents, i, child):
+                link(child, i, 'agentId', spawn['id'])
+            else:
+                open_spawns.append((i, spawn))
+
+    for child in range(1, len(agents)):
+        if child in links:
+            continue
+        parent = by_path.get(folder_parent(paths[child]))
+        if parent is not None and not _is_ancestor(parents, parent, child):
+            link(child, parent, 'folder', None)
+
+    for child in range(1, len(agents)):
+        if child in links:
+            continue
+        started = parse_time(agents[child]['start_time'])
+        best = None
+        if started is not None:
+            for n, (parent, spawn) in enumerate(open_spawns):
+                call, result = parse_time(spawn['start']), parse_time(spawn['end'])
+                if (parent != child and call is not None and call <= started and
+                        (result is None or started <= result) and not _is_ancestor(parents, parent, child) and
+                        (best is None or call > parse_time(open_spawns[best][1]['start']))):
+                    best = n
+        if best is not None:
+            parent, spawn = open_spawns.pop(best)
+            link(child, parent, 'time', spawn['id'])
+        else:
+            link(child, 0, 'fallback', None)
+    return links
+
+
+def build_agent_tree(agents, aggregates, paths):
+    """
+    Build the spawn tree of a session with per-subtree roll-ups.
+
+    Returns:
+        Root node (the main session). Each node has id, model, cost,
+        tokens, messages, start, end, seconds, link, spawnedBy, children
+        and subtree (agents, cost, tokens, start, end, seconds)
+    """
+    links = link_agents(agents, aggregates, paths)
+    nodes = []
+    for i, agent in enumerate(agents):
+        start, end = parse_time(agent['start_time']), parse_time(agent['end_time'])
+        parent, how, spawn_id = links.get(i, (None, 'root', None))
+        nodes.append({
+            'id': agent['id'],
+            'model': agent['model'],
+            'cost': agent['cost'],
+            'tokens': {field: agent[field] for field in TOKEN_FIELDS},
+            'messages': agent['messages'],
+            'start': agent['start_time'],
+            'end': agent['end_time'],
+            'seconds': round(end - start, 1) if start is not None and end is not None else None,
+            'link': how,
+            'spawnedBy': spawn_id,
+            'children': []
+        })
+    for child, (parent, _, _) in sorted(links.items()):
+        nodes[parent]['children'].append(nodes[child])
+
+    # Roll up children before parents
+    order = []
+    stack = [nodes[0]]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(node['children'])
+    for node in reversed(order):
+        node['children'].sort(key=lambda c: c['subtree']['cost'], reverse=True)
+        members = [node] + [c['subtree'] for c in node['children']]
+        starts = [m['start'] for m in members if m['start']]
+        ends = [m['end'] for m in members if m['end']]
+        start = min(starts) if starts else None
+        end = max(ends) if ends else None
+        node['subtree'] = {
+            'agents': 1 + sum(c['subtree']['agents'] for c in node['children']),
+            'cost': round(node['cost'] + sum(c['subtree']['cost'] for c in node['children']), 6),
+            'tokens': {field: node['tokens'][field] + sum(c['subtree']['tokens'][field] for c in node['children'])
+                       for field in TOKEN_FIELDS},
+            'start': start,
+            'end': end,
+            'seconds': round(parse_time(end) - parse_time(start), 1) if start and end else None
+        }
+    return nodes[0]
+
@@ -0,0 +1,353 @@
+"""
+Batch Cost Reports for Simple Claude Conductor
+
+Reports the cost of many projects in one pass: the current project, every
+project archived under archive/<timestamp>_<name> and, with --all, every
+other project the Claude CLI has logs for.
+
+Archives carry no session ids of their own. Sessions of the conductor are
+assigned to the archive created after they started (or to the one whose
+STATUS.md names them); sessions since the last archive belong to the
+current project.
+
+All logs are parsed in one process pool through the cost index, so a
+repeated review only reads what was appended since the last one. The
+result is a combined summary (summary.csv, summary.json) and one markdown
+report per project.
+
+Usage:
+    python scripts/generate_cost_report.py --archive
+    python scripts/generate_cost_report.py --all --output output/cost_batch
+"""
+
+import csv
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+from scripts.session_parser import DEFAULT_DEDUP, DEFAULT_PARSE_MODE, parse_files
+from scripts.cost_index import CostIndex
+from scripts.pricing import category_costs
+from scripts.session_discovery import claude_projects_dir, open_session_index
+from scripts.phase_costs import parse_time
+from scripts.generate_cost_report import model_short_name, read_project_name, subagent_logs, summarize_session
+
+# Default output directory, relative to the conductor
+BATCH_OUTPUT = Path('output') / 'cost_batch'
+
+# archive/<YYYY-MM-DD>_<HHMM>_<name>, as written by /api/archive and /api/reset
+ARCHIVE_NAME = re.compile(r'^(\d{4}-\d{2}-\d{2})_(\d{4})_(.+)$')
+
+# Archive timestamps have minute resolution
+ARCHIVE_SLACK = 60
+
+SUMMARY_FIELDS = ('project', 'kind', 'session_id', 'start_time', 'end_time', 'model', 'messages', 'subagents',
+                  'input_tokens', 'output_tokens', 'cache_read', 'cache_write', 'cost', 'cache_efficiency')
+
+TOKEN_FIELDS = ('input_tokens', 'output_tokens', 'cache_read', 'cache_write')
+
+
+def archive_time(name):
+    """Creation time of an archive (epoch seconds, local time) from its name, or None."""
+    match = ARCHIVE_NAME.match(name)
+    if not match:
+        return None
+    try:
+        return datetime.strptime(f"{match.group(1)} {match.group(2)}", '%Y-%m-%d %H%M').timestamp()
+    except ValueError:
+        return None
+
+
+def archive_session_id(archive_path):
+    """Session id recorded in an archive's STATUS.md frontmatter, or None."""
+    try:
+        with open(Path(archive_path) / 'STATUS.md', 'r', encoding='utf-8') as f:
+            content = f.read()
+    except OSError:
+        return None
+    frontmatter = re.match(r'^---\n(.+?)\n---', content, re.DOTALL)
+    if not frontmatter:
+        return None
+    match = re.search(r"^session_id:\s*'?([A-Za-z0-9-]+)'?\s*$", frontmatter.group(1), re.MULTILINE)
+    return match.group(1) if match and match.group(1) != 'null' else None
+
+
+def archive_project_name(archive_path):
+    """Project name of an archive: its saved config, else the name part of the folder."""
+    try:
+        with open(Path(archive_path) / 'config' / 'project-config.json', 'r', encoding='utf-8') as f:
+            name = json.load(f).get('projectName')
+        if name:
+            return name
+    except (OSError, ValueError, AttributeError):
+        pass
+    match = ARCHIVE_NAME.match(Path(archive_path).name)
+    return match.group(3).replace('_', ' ') if match else Path(archive_path).name
+
+
+def log_sessions(log_dir):
+    """Main session logs of a Claude project directory, oldest first."""
+    return sorted((p for p in Path(log_dir).glob('*.jsonl') if not p.name.startswith('agent-')),
+                  key=lambda p: p.stat().st_mtime)
+
+
+def discover_projects(project_path, include_archive=True, include_all=False, projects_dir=None):
+    """
+    Map projects and archives to their session logs.
+
+    Args:
+        project_path: Conductor root (holds archive/ and .conductor/)
+        include_archive: Split the conductor's sessions into the current
+            project and its archives
+        include_all: Also report every other Claude project directory
+        projects_dir: Claude projects directory (default: claude_projects_dir())
+
+    Returns:
+        List of project dicts: id, name, kind ('project', 'archive' or
+        'claude'), path and sessions (dicts with id, file, subagentDir)
+    """
+    project_path = Path(project_path).resolve()
+    projects_dir = Path(projects_dir) if projects_dir else claude_projects_dir()
+    index = open_session_index(project_path, projects_dir)
+
+    def session(path):
+        return {'id': path.stem, 'file': path, 'subagentDir': path.parent / path.stem / 'subagents'}
+
+    current = {'id': 'current', 'name': read_project_name(project_path), 'kind': 'project',
+               'path': str(project_path), 'sessions': []}
+    projects = []
+
+    if include_archive:
+        archives = []
+        archive_dir = project_path / 'archive'
+        if archive_dir.is_dir():
+            for entry in sorted(archive_dir.iterdir()):
+                created = archive_time(entry.name)
+                if entry.is_dir() and created is not None:
+                    archives.append({'id': entry.name, 'name': archive_project_name(entry), 'kind': 'archive',
+                                     'path': str(entry), 'sessions': [], 'created': created,
+                                     'sessionId': archive_session_id(entry)})
+        archives.sort(key=lambda a: a['created'])
+        pinned = {a['sessionId']: a for a in archives if a['sessionId']}
+
+        for indexed in sorted(index.sessions(), key=lambda s: s['start'] or ''):
+            owner = pinned.get(indexed['id'])
+            if owner is None:
+                started = parse_time(indexed['start']) or indexed['mtime']
+                owner = next((a for a in archives if started < a['created'] + ARCHIVE_SLACK), current)
+            owner['sessions'].append(session(indexed['file']))
+
+        for archive in archives:
+            del archive['created'], archive['sessionId']
+        projects += archives
+    elif index.log_dir:
+        current['sessions'] = [session(s['file']) for s in sorted(index.sessions(), key=lambda s: s['start'] or '')]
+    projects.append(current)
+
+    if include_all and projects_dir.is_dir():
+        own = index.log_dir.resolve() if index.log_dir else None
+        for log_dir in sorted(p for p in projects_dir.iterdir() if p.is_dir()):
+            if log_dir.resolve() == own:
+                continue
+            sessions = [session(p) for p in log_sessions(log_dir)]
+            if sessions:
+                projects.append({'id': log_dir.name, 'name': log_dir.name, 'kind': 'claude',
+                                 'path': str(log_dir), 'sessions': sessions})
+    return projects
+
+
+def session_row(project, document, agents):
+    """Flatten a session's report into a summary row."""
+    metrics = document['metrics']
+    return {
+        'project': project['id'],
+        'kind': project['kind'],
+        'session_id': document['sessionId'],
+        'start_time': metrics['startTime'],
+        'end_time': metrics['endTime'],
+        'model': metrics['model'],
+        'messages': sum(a['messages'] for a in agents),
+        'subagents': metrics['subagentCount'],
+        **{field: document['totals'][field] for field in TOKEN_FIELDS},
+        'cost': metrics['totalCost'],
+        'cache_efficiency': metrics['cacheEfficiency'],
+        # Per-category cost at each agent's own model pricing
+        'category_costs': category_costs(agents)
+    }
+
+
+def project_summary(project, rows):
+    """Roll a project's session rows up into one summary."""
+    total_tokens = sum(r[field] for r in rows for field in TOKEN_FIELDS)
+    starts = [r['start_time'] for r in rows if r['start_time']]
+    ends = [r['end_time'] for r in rows if r['end_time']]
+    return {
+        'id': project['id'],
+        'name': project['name'],
+        'kind': project['kind'],
+        'path': project['path'],
+        'sessions': len(rows),
+        'messages': sum(r['messages'] for r in rows),
+        'subagents': sum(r['subagents'] for r in rows),
+        **{field: sum(r[field] for r in rows) for field in TOKEN_FIELDS},
+        'cost': round(sum(r['cost'] for r in rows), 4),
+        'cacheEfficiency': round(sum(r['cache_read'] for r in rows) / total_tokens * 100, 1) if total_tokens else 0,
+        'startTime': min(starts) if starts else None,
+        'endTime': max(ends) if ends else None
+    }
+
+
+def render_project_report(summary, rows):
+    """Render the markdown cost report of one project across its sessions."""
+    source = {
+        'archive': f"Archive `{summary['id']}`",
+        'project': 'Current project',
+        'claude': f"Claude project `{summary['id']}`"
+    }[summary['kind']]
+    start_time = summary['startTime'][:19] if summary['startTime'] else 'N/A'
+    end_time = summary['endTime'][:19] if summary['endTime'] else 'N/A'
+    costs = {field: sum(r['category_costs'][field] for r in rows) for field in TOKEN_FIELDS}
+    total_tokens = sum(summary[field] for field in TOKEN_FIELDS)
+
+    report = f"""# Cost Report: {summary['name']}
+
+Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Source: {source}
+
+## Summary
+
+| Metric | Value |
+|--------|-------|
+| Total Estimated Cost | **${summary['cost']:.2f}** |
+| Sessions | {summary['sessions']} |
+| Period | {start_time} to {end_time} |
+| Messages | {summary['messages']:,} |
+| Subagents Spawned | {summary['subagents']} |
+| Cache Efficiency | {summary['cacheEfficiency']:.1f}% |
+
+## Token Usage
+
+| Category | Tokens | Cost |
+|----------|--------|------|
+| Input Tokens | {summary['input_tokens']:,} | ${costs['input_tokens']:.4f} |
+| Output Tokens | {summary['output_tokens']:,} | ${costs['output_tokens']:.4f} |
+| Cache Read | {summary['cache_read']:,} | ${costs['cache_read']:.4f} |
+| Cache Write | {summary['cache_write']:,} | ${costs['cache_write']:.4f} |
+| **Total** | **{total_tokens:,}** | **${summary['cost']:.2f}** |
+
+## Sessions
+
+| Session ID | Start | Model | Messages | Subagents | Cache Efficiency | Cost |
+|------------|-------|-------|----------|-----------|------------------|------|
+"""
+    for r in rows:
+        start = r['start_time'][:19] if r['start_time'] else 'N/A'
+        report += (f"| {r['session_id']} | {start} | {model_short_name(r['model'])} | {r['messages']} | "
+                   f"{r['subagents']} | {r['cache_efficiency']:.1f}% | ${r['cost']:.4f} |\n")
+    if not rows:
+        report += "| (none) | - | - | - | - | - | - |\n"
+
+    report += """
+> Note: This report uses API pricing for reference. Subscription users pay a flat monthly fee regardless of usage.
+"""
+    return report
+
+
+def report_filename(project_id):
+    """Markdown file name of a project's report."""
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', project_id) + '.md'
+
+
+def write_summary(output_dir, summary):
+    """Write summary.json, summary.csv and the per-project markdown reports."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = output_dir / 'summary.json.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    os.replace(tmp_path, output_dir / 'summary.json')
+
+    with open(output_dir / 'summary.csv', 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(summary['sessions'])
+
+    for project in summary['projects']:
+        rows = [r for r in summary['sessions'] if r['project'] == project['id']]
+        with open(output_dir / project['report'], 'w', encoding='utf-8') as f:
+            f.write(render_project_report(project, rows))
+
+
+def run_batch(project_path, include_archive=True, include_all=False, output_dir=None, workers=None,
+              mode=DEFAULT_PARSE_MODE, dedup=DEFAULT_DEDUP, use_index=True, projects_dir=None, progress=None):
+    """
+    Report the cost of every discovered project and archive.
+
+    Args:
+        project_path: Conductor root
+        include_archive: Report the conductor's archives separately
+        include_all: Also report every other Claude project
+        output_dir: Where to write the summary and reports
+            (default: <project>/output/cost_batch)
+        workers: Parser processes (default: one per CPU)
+        mode: Parse mode ('full', 'scan' or 'verify')
+        dedup: Message de-duplication ('exact', 'bloom' or 'off')
+        use_index: Resume from the incremental cost index
+        projects_dir: Claude projects directory (default: claude_projects_dir())
+        progress: Optional callback(files_done, files_total)
+
+    Returns:
+        Summary dict (generatedAt, outputDir, projects, sessions, totals,
+        throughput), as written to summary.json
+    """
+    project_path = Path(project_path).resolve()
+    output_dir = Path(output_dir) if output_dir else project_path / BATCH_OUTPUT
+    projects = discover_projects(project_path, include_archive, include_all, projects_dir)
+
+    # One flat parse over every log keeps the process pool busy
+    paths = []
+    slices = []
+    for project in projects:
+        for s in project['sessions']:
+            subagent_files = subagent_logs(s['subagentDir'])
+            slices.append((project, s['file'], s['subagentDir'], subagent_files, len(paths)))
+            paths += [s['file']] + subagent_files
+
+    if use_index:
+        index = CostIndex(project_path / '.conductor' / 'cost-index.json')
+        parsed, throughput = index.parse_files(paths, workers=workers, mode=mode, progress=progress, dedup=dedup)
+    else:
+        parsed, throughput = parse_files(paths, workers=workers, mode=mode, progress=progress, dedup=dedup)
+
+    rows = {project['id']: [] for project in projects}
+    for project, session_file, subagent_dir, subagent_files, start in slices:
+        document, agents = summarize_session(session_file, subagent_files,
+                                             parsed[start:start + 1 + len(subagent_files)], throughput,
+                                             subagent_dir)
+        rows[project['id']].append(session_row(project, document, agents))
+
+    summaries = []
+    for project in projects:
+        summary = project_summary(project, rows[project['id']])
+        summary['report'] = report_filename(project['id'])
+        summaries.append(summary)
+
+    sessions = [r for project in projects for r in rows[project['id']]]
+    result = {
+        'generatedAt': datetime.now().isoformat(),
+        'outputDir': str(output_dir),
+        'projects': summaries,
+        'sessions': sessions,
+        'totals': {
+            'projects': len(summaries),
+            'sessions': len(sessions),
+            'cost': round(sum(s['cost'] for s in summaries), 4),
+            **{field: sum(s[field] for s in summaries) for field in TOKEN_FIELDS}
+        },
+        'throughput': throughput
+    }
+    write_summary(output_dir, result)
+    return result
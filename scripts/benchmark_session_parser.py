@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Session Parser Benchmark for Simple Claude Conductor
+
+Writes a synthetic Claude session log dominated by large tool outputs and
+times each parse mode on it, checking that every mode produces the same
+aggregate as full decoding. Assistant messages are logged several times
+with the same message and request id, as the CLI does for streamed content
+blocks, and each run is checked to count every message's usage once.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+if __package__ in (None, ''):
+    # Run as a file: make the scripts package importable, so siblings load
+    # as scripts.<name> here too, never as top-level modules
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.session_parser import DEFAULT_DEDUP, JSON_DECODER, PARSE_MODES, parse_file
+
+TOKEN_FIELDS = ('input_tokens', 'output_tokens', 'cache_read', 'cache_write')
+
+
+def write_synthetic_log(path, size_mb, tool_output_kb, seed=0, duplicates=1):
+    """
+    Write a session log of roughly size_mb megabytes.
+
+    Each turn is an assistant message with usage and a tool call, followed
+    by a tool result of about tool_output_kb kilobytes, mimicking sessions
+    that read large reference files. The assistant message is written
+    `duplicates` times with the same ids and usage.
+
+    Returns:
+        Token totals and message count with every message counted once
+    """
+    rng = random.Random(seed)
+    expected = {field: 0 for field in TOKEN_FIELDS}
+    expected['messages'] = 0
+    target = size_mb * 1_000_000
+    written = 0
+    turn = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        prompt = {'type': 'user', 'timestamp': '2026-01-01T00:00:00.000Z',
+                  'message': {'role': 'user', 'content': 'Execute the plan'}}
+        f.write(json.dumps(prompt) + '\n')
+        while written < target:
+            turn += 1
+            timestamp = f'2026-01-01T{turn // 3600 % 24:02d}:{turn // 60 % 60:02d}:{turn % 60:02d}.000Z'
+            assistant = {
+                'type': 'assistant',
+                'timestamp': timestamp,
+                'requestId': f'req_{turn:08d}',
+                'message': {
+                    'id': f'msg_{turn:08d}',
+                    'model': 'claude-sonnet-4-20250514',
+                    'content': [{'type': 'tool_use', 'id': f'toolu_{turn:08d}', 'name': 'Read',
+                                 'input': {'file_path': f'File_References_For_Your_Project/ref{turn % 7}.md'}}],
+                    'usage': {
+                        'input_tokens': rng.randint(1, 50),
+                        'output_tokens': rng.randint(50, 800),
+                        'cache_read_input_tokens': rng.randint(10000, 90000),
+                        'cache_creation_input_tokens': rng.randint(100, 4000),
+                    },
+                },
+            }
+            body = ''.join(rng.choice('abcdefghij \n"{}') for _ in range(64)) * (tool_output_kb * 16)
+            result = {
+                'type': 'user',
+                'timestamp': timestamp,
+                'message': {'role': 'user', 'content': [
+                    {'type': 'tool_result', 'tool_use_id': f'toolu_{turn:08d}', 'content': body}
+                ]},
+            }
+            usage = assistant['message']['usage']
+            expected['input_tokens'] += usage['input_tokens']
+            expected['output_tokens'] += usage['output_tokens']
+            expected['cache_read'] += usage['cache_read_input_tokens']
+            expected['cache_write'] += usage['cache_creation_input_tokens']
+            expected['messages'] += 1
+            for entry in [assistant] * duplicates + [result]:
+                line = json.dumps(entry) + '\n'
+                f.write(line)
+                written += len(line)
+    return expected
+
+
+def counts(stats):
+    """Token totals and message count of an aggregate."""
+    return {field: stats[field] for field in TOKEN_FIELDS + ('messages',)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark session-log parse modes')
+    parser.add_argument('--size-mb', type=int, default=100, help='Synthetic log size')
+    parser.add_argument('--tool-output-kb', type=int, default=64, help='Size of each tool result')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per mode (best is reported)')
+    parser.add_argument('--duplicates', type=int, default=2,
+                        help='Times each assistant message is logged (synthetic log only)')
+    parser.add_argument('--log', help='Benchmark an existing log instead of a synthetic one')
+    args = parser.parse_args()
+
+    tmp_dir = None
+    expected = None
+    path = args.log
+    if not path:
+        tmp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmp_dir.name, 'synthetic.jsonl')
+        print(f"Writing {args.size_mb} MB synthetic log ({args.tool_output_kb} KB tool outputs, "
+              f"messages logged {args.duplicates}x)...")
+        expected = write_synthetic_log(path, args.size_mb, args.tool_output_kb, duplicates=args.duplicates)
+
+    size = os.path.getsize(path)
+    print(f"Log: {size / 1_000_000:.1f} MB, decoder: {JSON_DECODER}\n")
+    print(f"{'Mode':<8} {'Dedup':<6} {'Best (s)':>10} {'MB/s':>10} {'Speedup':>9}  Matches full  Counts once")
+    print("-" * 75)
+
+    runs = [(mode, DEFAULT_DEDUP) for mode in PARSE_MODES] + [('scan', 'bloom'), ('scan', 'off')]
+    reference = None
+    baseline_seconds = None
+    for mode, dedup in runs:
+        best = None
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            stats = parse_file(path, mode=mode, dedup=dedup)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        stats.pop('seen')
+        if reference is None:
+            reference, baseline_seconds = stats, best
+        speedup = baseline_seconds / best if best > 0 else 0
+        if expected is None:
+            once = '-'
+        else:
+            once = 'yes' if counts(stats) == expected else 'NO'
+            if dedup == 'off' and args.duplicates > 1:
+                once = f"{once} (expected NO)"
+        print(f"{mode:<8} {dedup:<6} {best:>10.3f} {size / 1_000_000 / best:>10.1f} {speedup:>8.1f}x  "
+              f"{'yes' if stats == reference else 'NO':<12}  {once}")
+
+    if tmp_dir:
+        tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
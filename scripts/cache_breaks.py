@@ -0,0 +1,167 @@
+"""
+Prompt-Cache Break Detection for Simple Claude Conductor
+
+Builds a per-turn timeline of fresh input, cache reads and cache writes
+for the main session and each subagent, and flags cache breaks: turns
+where the cached prefix was lost, so cache reads collapse and the context
+is written to the cache again at the higher cache-write rate.
+
+Each break is correlated with what most likely caused it: a compaction,
+a model switch, an idle gap longer than the cache lifetime, or a
+subagent spawned by the previous turn. Anything else means the prompt
+prefix itself changed.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from scripts.session_parser import PARALLEL_MIN_BYTES, read_turns
+from scripts.pricing import get_pricing
+from scripts.phase_costs import parse_time
+
+# A break: cache reads fall below this share of the previous turn's...
+BREAK_READ_DROP = 0.5
+# ...while at least this many tokens are written to the cache
+BREAK_MIN_WRITE = 5000
+
+# Seconds a prompt-cache entry lives without being read
+CACHE_TTL = 300
+
+# Buckets in the hit-rate sparkline of the report
+SPARKLINE_WIDTH = 60
+SPARK_CHARS = '▁▂▃▄▅▆▇█'
+
+
+def hit_rate(turn):
+    """Share of a turn's prompt served from cache, in percent."""
+    prompt = turn['input_tokens'] + turn['cache_read'] + turn['cache_write']
+    return round(turn['cache_read'] / prompt * 100, 1) if prompt else 0
+
+
+def break_causes(turn, previous):
+    """Likely causes of a cache break, most specific first."""
+    causes = []
+    if turn['compacted']:
+        causes.append('compaction')
+    if turn['model'] != previous['model']:
+        causes.append(f"model switch ({previous['model']} -> {turn['model']})")
+    start, end = parse_time(previous['timestamp']), parse_time(turn['timestamp'])
+    if start is not None and end is not None and end - start > CACHE_TTL:
+        causes.append(f"idle {int((end - start) // 60)}m (cache expired)")
+    if previous['spawned']:
+        causes.append('subagent spawn')
+    return causes or ['prompt prefix changed']
+
+
+def detect_breaks(turns):
+    """
+    Find the cache breaks in one log's turns.
+
+    Returns:
+        List of breaks: turn (1-based), timestamp, model, cache_read,
+        previous_cache_read, cache_write, extra_cost (the rewrite at the
+        cache-write rate minus reading it from cache) and causes
+    """
+    breaks = []
+    for i in range(1, len(turns)):
+        turn, previous = turns[i], turns[i - 1]
+        if (previous['cache_read'] and turn['cache_read'] < previous['cache_read'] * BREAK_READ_DROP and
+                turn['cache_write'] >= BREAK_MIN_WRITE):
+            written = turn['cache_write']
+            pricing = get_pricing(turn['model'], turn['timestamp'],
+                                  turn['input_tokens'] + turn['cache_read'] + written)
+            breaks.append({
+                'turn': i + 1,
+                'timestamp': turn['timestamp'],
+                'model': turn['model'],
+                'cache_read': turn['cache_read'],
+                'previous_cache_read': previous['cache_read'],
+                'cache_write': written,
+                'extra_cost': round(written / 1_000_000 * (pricing['cache_write'] - pricing['cache_read']), 4),
+                'causes': break_causes(turn, previous)
+            })
+    return breaks
+
+
+def _timeline_job(path):
+    """Process-pool entry point."""
+    return read_turns(str(path))
+
+
+def cache_timeline(logs, workers=None):
+    """
+    Read the turn timeline of several logs and detect their cache breaks.
+
+    Logs are read in a process pool when there is enough data to pay for it.
+
+    Args:
+        logs: (agent_id, path) pairs, main session first
+        workers: Reader processes (default: one per CPU)
+
+    Returns:
+        List per agent of dicts with agent, turns (timestamp, model, token
+        counts, hitRate, spawned, compacted) and breaks
+    """
+    paths = [path for _, path in logs]
+    total = sum(os.path.getsize(p) for p in paths if os.path.exists(p))
+    if workers is None:
+        workers = min(len(paths), os.cpu_count() or 1)
+    if workers <= 1 or total < PARALLEL_MIN_BYTES:
+        results = [_timeline_job(p) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_timeline_job, paths))
+
+    timeline = []
+    for (agent_id, _), turns in zip(logs, results):
+        for turn in turns:
+            turn['hitRate'] = hit_rate(turn)
+        timeline.append({'agent': agent_id, 'turns': turns, 'breaks': detect_breaks(turns)})
+    return timeline
+
+
+def sparkline(values, width=SPARKLINE_WIDTH):
+    """Percentages as a one-line bar chart, averaged into at most `width` buckets."""
+    if not values:
+        return ''
+    buckets = min(width, len(values))
+    chars = []
+    for b in range(buckets):
+        chunk = values[b * len(values) // buckets:(b + 1) * len(values) // buckets]
+        average = sum(chunk) / len(chunk)
+        chars.append(SPARK_CHARS[min(len(SPARK_CHARS) - 1, int(average / 100 * len(SPARK_CHARS)))])
+    return ''.join(chars)
+
+
+def summarize_timeline(timeline, top=15):
+    """
+    Condense a timeline for the stored report document.
+
+    Returns:
+        Dict with agents (agent, turns, hitRate, breaks, extraCost),
+        breaks (the costliest, each tagged with its agent), totalBreaks,
+        extraCost and mainSparkline (cache hit rate per turn of the main
+        session)
+    """
+    agents = []
+    breaks = []
+    for entry in timeline:
+        turns = entry['turns']
+        prompt = sum(t['input_tokens'] + t['cache_read'] + t['cache_write'] for t in turns)
+        agents.append({
+            'agent': entry['agent'],
+            'turns': len(turns),
+            'hitRate': round(sum(t['cache_read'] for t in turns) / prompt * 100, 1) if prompt else 0,
+            'breaks': len(entry['breaks']),
+            'extraCost': round(sum(b['extra_cost'] for b in entry['breaks']), 4)
+        })
+        breaks += [{**b, 'agent': entry['agent']} for b in entry['breaks']]
+
+    main = timeline[0]['turns'] if timeline else []
+    return {
+        'agents': agents,
+        'breaks': sorted(breaks, key=lambda b: b['extra_cost'], reverse=True)[:top],
+        'totalBreaks': len(breaks),
+        'extraCost': round(sum(b['extra_cost'] for b in breaks), 4),
+        'mainSparkline': sparkline([t['hitRate'] for t in main])
+    }
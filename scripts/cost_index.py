@@ -0,0 +1,138 @@
+"""
+Incremental Cost Index for Simple Claude Conductor
+
+Session logs are append-only, so a report only needs to parse the bytes
+written since the last run. The index persists, per log file, its identity
+(device, inode, a checksum of its head), the offset parsed so far and the
+aggregate of everything before that offset.
+
+A file is fully re-parsed only when it was truncated or rotated: a different
+inode, a size below the checkpoint, or a changed head.
+"""
+
+import json
+import os
+import zlib
+
+from scripts.session_parser import DEFAULT_DEDUP, DEFAULT_PARSE_MODE, parse_files
+
+# Bytes at the start of a log used to detect a file rewritten in place
+HEAD_BYTES = 4096
+
+
+def head_checksum(path, length):
+    """CRC32 of the first `length` bytes of a file."""
+    with open(path, 'rb') as f:
+        return zlib.crc32(f.read(length))
+
+
+class CostIndex:
+    """
+    Persistent per-file parse checkpoints.
+
+    Stored as JSON (default `.conductor/cost-index.json` in the project)
+    and written atomically, so an interrupted run never leaves a corrupt
+    index behind.
+    """
+
+    # 2: aggregates carry the message seen-set
+    # 3: aggregates carry per-tool and per-file context attribution
+    # 4: aggregates carry subagent spawns
+    VERSION = 4
+
+    def __init__(self, index_path):
+        """
+        Initialize CostIndex.
+
+        Args:
+            index_path: Path to the JSON index file (created on save)
+        """
+        self.index_path = str(index_path)
+        self.files = {}
+        self.reparsed = 0
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.VERSION:
+                self.files = data.get('files', {})
+        except (OSError, ValueError):
+            # Missing or unreadable index - start empty
+            self.files = {}
+
+    def save(self):
+        """Write the index atomically (temp file + rename), dropping deleted logs."""
+        self.files = {k: v for k, v in self.files.items() if os.path.exists(k)}
+        os.makedirs(os.path.dirname(self.index_path) or '.', exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.VERSION, 'files': self.files}, f)
+        os.replace(tmp_path, self.index_path)
+
+    def checkpoint(self, path, dedup=DEFAULT_DEDUP):
+        """
+        Get a still-valid checkpoint for a log file.
+
+        A checkpoint taken with another de-duplication mode is not valid.
+
+        Returns:
+            Tuple of (offset, stats) to resume from, or None to parse the
+            file from byte zero
+        """
+        key = os.path.abspath(path)
+        entry = self.files.get(key)
+        if not entry:
+            return None
+        try:
+            st = os.stat(path)
+            rotated = (st.st_ino != entry['inode'] or st.st_dev != entry['device'])
+            truncated = st.st_size < entry['offset']
+            rewritten = (not rotated and not truncated and
+                         head_checksum(path, entry['head_length']) != entry['head'])
+            redone = (entry['stats'].get('seen') or {}).get('mode', 'off') != dedup
+        except (OSError, KeyError):
+            rotated = truncated = rewritten = redone = True
+
+        if rotated or truncated or rewritten or redone:
+            del self.files[key]
+            self.reparsed += 1
+            return None
+        return entry['offset'], entry['stats']
+
+    def record(self, path, stats):
+        """Store the checkpoint for a parsed log file."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        head_length = min(stats['offset'], HEAD_BYTES)
+        self.files[os.path.abspath(path)] = {
+            'device': st.st_dev,
+            'inode': st.st_ino,
+            'size': st.st_size,
+            'offset': stats['offset'],
+            'head_length': head_length,
+            'head': head_checksum(path, head_length),
+            'stats': stats,
+        }
+
+    def parse_files(self, paths, workers=None, mode=DEFAULT_PARSE_MODE, progress=None, dedup=DEFAULT_DEDUP):
+        """
+        Parse log files, reading only bytes appended since the last run.
+
+        Same contract as session_parser.parse_files; the index is saved
+        afterwards.
+        """
+        paths = list(paths)
+        self.reparsed = 0
+        resume = [self.checkpoint(p, dedup) for p in paths]
+        results, throughput = parse_files(paths, workers=workers, resume=resume, mode=mode, progress=progress,
+                                          dedup=dedup)
+        for path, stats in zip(paths, results):
+            self.record(path, stats)
+        self.save()
+        throughput['resumed'] = sum(1 for r in resume if r)
+        throughput['reparsed'] = self.reparsed
+        return results, throughput
@@ -0,0 +1,191 @@
+"""
+Cost Metrics Store for Simple Claude Conductor
+
+Persists the result of a cost report in machine-readable form next to the
+project, so the server can serve it directly instead of scraping markdown:
+
+- .conductor/cost-metrics.json - summary metrics, main-session stats,
+  totals and the log fingerprint the report was built from
+- .conductor/cost.db - SQLite table with one row per agent (the main
+  session and every subagent), for paginated listing
+- .conductor/cache-timeline.json - per-turn cache usage and detected
+  cache breaks of every agent
+
+The markdown report is rendered from this data only when requested.
+"""
+
+import json
+import os
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS agent_costs (
+    session_id TEXT NOT NULL,
+    agent_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    model TEXT,
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    cache_read INTEGER NOT NULL DEFAULT 0,
+    cache_write INTEGER NOT NULL DEFAULT 0,
+    messages INTEGER NOT NULL DEFAULT 0,
+    cost REAL NOT NULL DEFAULT 0,
+    work_type TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    position INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (session_id, agent_id)
+);
+CREATE INDEX IF NOT EXISTS idx_agent_costs_cost ON agent_costs (session_id, kind, cost DESC);
+"""
+
+AGENT_COLUMNS = ('agent_id', 'kind', 'model', 'input_tokens', 'output_tokens', 'cache_read', 'cache_write',
+                 'messages', 'cost', 'work_type', 'start_time', 'end_time')
+
+# Allowed orderings for agent listings
+AGENT_ORDER = {
+    'cost': 'cost DESC, position',
+    'position': 'position',
+}
+
+
+class CostStore:
+    """Reads and writes the structured cost metrics of a project."""
+
+    def __init__(self, conductor_dir):
+        """
+        Initialize CostStore.
+
+        Args:
+            conductor_dir: The project's .conductor directory
+        """
+        self.conductor_dir = str(conductor_dir)
+        self.metrics_path = os.path.join(self.conductor_dir, 'cost-metrics.json')
+        self.db_path = os.path.join(self.conductor_dir, 'cost.db')
+        self.timeline_path = os.path.join(self.conductor_dir, 'cache-timeline.json')
+
+    def _connect(self):
+        os.makedirs(self.conductor_dir, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(SCHEMA)
+        return conn
+
+    def save(self, document, agents):
+        """
+        Store a report.
+
+        Agent rows are replaced in one transaction before the JSON document
+        is written atomically, so a readable document always has its rows.
+
+        Args:
+            document: JSON-serialisable report document (must have sessionId)
+            agents: Agent dicts with 'id', 'kind' and the AGENT_COLUMNS fields
+        """
+        session_id = document['sessionId']
+        rows = [
+            (session_id, a['id'], a['kind'], a.get('model'), a.get('input_tokens', 0), a.get('output_tokens', 0),
+             a.get('cache_read', 0), a.get('cache_write', 0), a.get('messages', 0), a.get('cost', 0),
+             a.get('work_type'), a.get('start_time'), a.get('end_time'), position)
+            for position, a in enumerate(agents)
+        ]
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM agent_costs WHERE session_id = ?", (session_id,))
+                conn.executemany(
+                    "INSERT INTO agent_costs (session_id, agent_id, kind, model, input_tokens, output_tokens, "
+                    "cache_read, cache_write, messages, cost, work_type, start_time, end_time, position) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+        finally:
+            conn.close()
+
+        tmp_path = f"{self.metrics_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+        os.replace(tmp_path, self.metrics_path)
+
+    def load(self):
+        """
+        Load the latest report document.
+
+        Returns:
+            Document dict, or None if no report has been stored
+        """
+        try:
+            with open(self.metrics_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save_timeline(self, session_id, timeline):
+        """
+        Store the cache timeline of a report (see cache_breaks.cache_timeline).
+
+        Written atomically, before the document that refers to it.
+        """
+        os.makedirs(self.conductor_dir, exist_ok=True)
+        tmp_path = f"{self.timeline_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'sessionId': session_id, 'agents': timeline}, f)
+        os.replace(tmp_path, self.timeline_path)
+
+    def load_timeline(self):
+        """
+        Load the latest cache timeline.
+
+        Returns:
+            Dict with sessionId and agents, or None if none has been stored
+        """
+        try:
+            with open(self.timeline_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def agents(self, session_id, kind=None, offset=0, limit=None, order='cost'):
+        """
+        List agent rows of a report.
+
+        Args:
+            session_id: Session the report was built for
+            kind: 'main' or 'subagent' to filter, None for both
+            offset: Rows to skip
+            limit: Maximum rows to return (None for all)
+            order: 'cost' (most expensive first) or 'position' (report order)
+
+        Returns:
+            Tuple of (list of row dicts with 'id' instead of 'agent_id',
+            total row count)
+        """
+        if order not in AGENT_ORDER:
+            raise ValueError(f"Invalid order: {order}. Must be one of {sorted(AGENT_ORDER)}")
+        if not os.path.exists(self.db_path):
+            return [], 0
+
+        where = "session_id = ?"
+        params = [session_id]
+        if kind:
+            where += " AND kind = ?"
+            params.append(kind)
+
+        conn = self._connect()
+        try:
+            total = conn.execute(f"SELECT COUNT(*) FROM agent_costs WHERE {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {', '.join(AGENT_COLUMNS)} FROM agent_costs WHERE {where} "
+                f"ORDER BY {AGENT_ORDER[order]} LIMIT ? OFFSET ?",
+                params + [limit if limit is not None else -1, offset]
+            ).fetchall()
+        finally:
+            conn.close()
+
+        agents = []
+        for row in rows:
+            agent = dict(row)
+            agent['id'] = agent.pop('agent_id')
+            agents.append(agent)
+        return agents, total
@@ -2,128 +2,319 @@
 """
 Cost Report Generator for Simple Claude Conductor
 Parses Claude Code session logs and generates a cost report.
+
+Usable as a CLI or as a library: build_report() is what the server runs
+as a background job. Figures are stored as JSON/SQLite (see cost_store);
+the markdown report is rendered from them on demand. With --archive or
+--all, every archived (or every logged) project is reported in one batch
+run; see batch_reports.
 """
 
-import json
+import hashlib
 import os
 import sys
 from datetime import datetime
 from pathlib import Path
 
-# API Pricing (per 1M tokens)
-PRICING = {
-    'claude-opus-4-5-20251101': {'input': 15.00, 'output': 75.00, 'cache_read': 1.875, 'cache_write': 18.75},
-    'claude-sonnet-4-20250514': {'input': 3.00, 'output': 15.00, 'cache_read': 0.30, 'cache_write': 3.75},
-    'claude-haiku-3-5-20241022': {'input': 0.80, 'output': 4.00, 'cache_read': 0.08, 'cache_write': 1.00},
-    'default': {'input': 3.00, 'output': 15.00, 'cache_read': 0.30, 'cache_write': 3.75}
-}
-
-def get_pricing(model):
-    """Get pricing for a model."""
-    for key in PRICING:
-        if key in str(model):
-            return PRICING[key]
-    return PRICING['default']
+if __package__ in (None, ''):
+    # Run as a file: make the scripts package importable, so siblings load
+    # as scripts.<name> here too, never as top-level modules
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.session_parser import (DEDUP_MODES, DEFAULT_DEDUP, DEFAULT_PARSE_MODE, PARSE_MODES, new_stats,
+                                    merge_stats, parse_file, parse_files)
+from scripts.cost_index import CostIndex
+from scripts.cost_store import CostStore
+from scripts.pricing import catalog_version, category_costs, get_pricing, price_list, row_costs, token_cost
+from scripts.usage_warehouse import UsageWarehouse, subagent_id
+from scripts.session_discovery import open_session_index
+from scripts.phase_costs import attribute_phases, load_phase_events, phase_segments
+from scripts.cache_breaks import cache_timeline, summarize_timeline
+from scripts.agent_tree import build_agent_tree
+
+# Rendered markdown report, relative to the project
+REPORT_PATH = Path('output') / 'cost_report.md'
+
+# Rows per table in the Context Inflation section
+TOP_CONTEXT = 10
+
+# Agents drawn in the Delegation Tree section
+TREE_LINES = 200
 
 def parse_session(filepath):
     """Parse a session log file and extract token usage."""
-    stats = {
-        'input_tokens': 0,
-        'output_tokens': 0,
-        'cache_read': 0,
-        'cache_write': 0,
-        'model': 'unknown',
-        'messages': 0,
-        'start_time': None,
-        'end_time': None
-    }
-
-    try:
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-                    usage = entry.get('message', {}).get('usage', {})
-                    model = entry.get('message', {}).get('model', '')
-                    timestamp = entry.get('timestamp', '')
-
-                    if model:
-                        stats['model'] = model
-                    if timestamp:
-                        if not stats['start_time']:
-                            stats['start_time'] = timestamp
-                        stats['end_time'] = timestamp
-
-                    stats['input_tokens'] += usage.get('input_tokens', 0)
-                    stats['output_tokens'] += usage.get('output_tokens', 0)
-                    stats['cache_read'] += usage.get('cache_read_input_tokens', 0)
-                    stats['cache_write'] += usage.get('cache_creation_input_tokens', 0)
-
-                    if entry.get('type') == 'assistant':
-                        stats['messages'] += 1
-                except json.JSONDecodeError:
-                    pass
-    except FileNotFoundError:
-        pass
-
-    return stats
+    return parse_file(filepath)
 
 def find_latest_session(project_path):
     """Find the most recent session for a project."""
-    claude_projects = Path.home() / '.claude' / 'projects'
-
-    # Look for project directory - Claude uses a specific naming format
-    # e.g., c--NEOGOV-AIPM for C:\NEOGOV\AIPM
-    session_dir = None
-
-    if claude_projects.exists():
-        dirs = list(claude_projects.iterdir())
-        # Sort by modification time to get most recently used first
-        dirs.sort(key=lambda x: x.stat().st_mtime if x.is_dir() else 0, reverse=True)
-
-        for d in dirs:
-            if d.is_dir():
-                # Check if directory name contains project path components
-                d_lower = d.name.lower()
-                if 'aipm' in d_lower or 'neogov' in d_lower:
-                    session_dir = d
-                    break
-
-    if not session_dir or not session_dir.exists():
+    index = open_session_index(project_path)
+    latest = index.latest()
+    if not latest:
         return None, None
+    return latest['file'], index.log_dir / latest['id'] / 'subagents'
+
+def price_agents(agents):
+    """Set each agent row's cost, at its model's pricing on the day the agent started."""
+    for agent, costs in zip(agents, row_costs(agents)):
+        agent['cost'] = round(sum(costs), 6)
+    return agents
+
+def work_type(output_tokens):
+    """Classify an agent's work by its output tokens."""
+    if output_tokens > 1000:
+        return "Heavy Work"
+    elif output_tokens > 200:
+        return "Light Work"
+    return "Exploration"
+
+def model_short_name(model):
+    """Extract model short name."""
+    model = (model or '').lower()
+    if 'opus' in model:
+        return 'Opus'
+    elif 'sonnet' in model:
+        return 'Sonnet'
+    elif 'haiku' in model:
+        return 'Haiku'
+    return 'unknown'
+
+def agent_row(agent_id, kind, stats):
+    """Flatten an aggregate into an agent row for the cost store."""
+    return {
+        'id': agent_id,
+        'kind': kind,
+        'model': stats['model'],
+        'input_tokens': stats['input_tokens'],
+        'output_tokens': stats['output_tokens'],
+        'cache_read': stats['cache_read'],
+        'cache_write': stats['cache_write'],
+        'messages': stats['messages'],
+        'cost': 0.0,
+        'work_type': work_type(stats['output_tokens']),
+        'start_time': stats['start_time'],
+        'end_time': stats['end_time']
+    }
 
-    # Find the most recent session file
-    session_files = list(session_dir.glob('*.jsonl'))
-    session_files = [f for f in session_files if not f.name.startswith('agent-')]
+def compute_report(session_file, subagent_dir, workers=None, index=None, mode=DEFAULT_PARSE_MODE, progress=None,
+                   dedup=DEFAULT_DEDUP):
+    """
+    Parse a session's logs and compute the report figures.
+
+    With a CostIndex, only bytes appended since the previous report are parsed.
+
+    Returns:
+        Tuple of (document, agents): a JSON-serialisable report document
+        (sessionId, metrics, main, totals, throughput) and the agent rows
+        (main session first, then subagents)
+    """
+    # Parse main session and subagents concurrently
+    subagent_files = subagent_logs(subagent_dir)
+    if index is not None:
+        parsed, throughput = index.parse_files([session_file] + subagent_files, workers=workers, mode=mode,
+                                               progress=progress, dedup=dedup)
+    else:
+        parsed, throughput = parse_files([session_file] + subagent_files, workers=workers, mode=mode,
+                                         progress=progress, dedup=dedup)
+    return summarize_session(session_file, subagent_files, parsed, throughput, subagent_dir)
 
-    if not session_files:
-        return None, None
+def subagent_logs(subagent_dir):
+    """
+    Subagent logs of a session, in report order.
 
-    # Sort by modification time
-    session_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
-    latest = session_files[0]
+    Searched recursively, so logs of agents spawned by subagents are found
+    wherever the CLI nests them.
+    """
+    if subagent_dir and subagent_dir.exists():
+        return sorted(subagent_dir.rglob('*.jsonl'))
+    return []
+
+def summarize_session(session_file, subagent_files, parsed, throughput, subagent_dir=None):
+    """
+    Compute the report figures of a session from its parsed logs.
+
+    Args:
+        session_file: Main session log
+        subagent_files: Subagent logs, in the order they were parsed
+        parsed: Aggregates of the main log followed by the subagent logs
+        throughput: Parse throughput to store with the document
+        subagent_dir: Folder the subagent logs were found in (default:
+            the main log's <session>/subagents)
+
+    Returns:
+        Tuple of (document, agents) as for compute_report
+    """
+    session_id = session_file.stem if session_file else 'unknown'
+    if subagent_dir is None and session_file:
+        subagent_dir = session_file.parent / session_file.stem / 'subagents'
+    main_stats = parsed[0]
+    subagent_stats = parsed[1:]
+
+    agents = [agent_row('main', 'main', main_stats)]
+    for f, stats in zip(subagent_files, subagent_stats):
+        agents.append(agent_row(subagent_id(f, subagent_dir), 'subagent', stats))
+    price_agents(agents)
+
+    # Merge partial aggregates into session-wide totals
+    totals = merge_stats(new_stats(), main_stats)
+    for sa in subagent_stats:
+        merge_stats(totals, sa)
 
-    return latest, session_dir / latest.stem / 'subagents'
+    main_cost = agents[0]['cost']
+    subagent_cost = sum(a['cost'] for a in agents[1:])
+    total_cost = main_cost + subagent_cost
 
-def generate_report(project_name, session_file, subagent_dir, output_path):
-    """Generate a cost report."""
+    # Calculate delegation metrics
+    total_subagent_output = totals['output_tokens'] - main_stats['output_tokens']
+    delegation_ratio = (total_subagent_output / totals['output_tokens'] * 100) if totals['output_tokens'] > 0 else 0
 
-    # Parse main session
-    main_stats = parse_session(session_file)
-    session_id = session_file.stem if session_file else 'unknown'
+    # Calculate efficiency
+    total_tokens = totals['input_tokens'] + totals['output_tokens'] + totals['cache_read'] + totals['cache_write']
+    cache_efficiency = (totals['cache_read'] / total_tokens * 100) if total_tokens > 0 else 0
+
+    metrics = {
+        'sessionId': session_id,
+        'totalCost': round(total_cost, 4),
+        'mainCost': round(main_cost, 4),
+        'subagentCost': round(subagent_cost, 4),
+        'cacheEfficiency': round(cache_efficiency, 1),
+        'subagentCount': len(subagent_stats),
+        'delegationRatio': round(delegation_ratio, 1),
+        'model': main_stats['model'],
+        'startTime': main_stats['start_time'],
+        'endTime': main_stats['end_time'],
+        'tokens': {
+            'input': totals['input_tokens'],
+            'output': totals['output_tokens'],
+            'cacheRead': totals['cache_read'],
+            'cacheWrite': totals['cache_write']
+        }
+    }
 
-    # Parse subagents
-    subagent_stats = []
-    if subagent_dir and subagent_dir.exists():
-        for f in subagent_dir.glob('*.jsonl'):
-            stats = parse_session(f)
-            stats['id'] = f.stem.replace('agent-', '')
-            subagent_stats.append(stats)
+    document = {
+        'sessionId': session_id,
+        'metrics': metrics,
+        'main': {key: main_stats[key] for key in
+                 ('input_tokens', 'output_tokens', 'cache_read', 'cache_write', 'messages', 'model',
+                  'start_time', 'end_time', 'runs')},
+        'totals': {key: totals[key] for key in ('input_tokens', 'output_tokens', 'cache_read', 'cache_write')},
+        'context': context_breakdown(parsed, [a['id'] for a in agents]),
+        'tree': build_agent_tree(agents, parsed, [session_file] + list(subagent_files)),
+        'pricing': {'version': catalog_version()},
+        'throughput': throughput
+    }
+    return document, agents
+
+def context_breakdown(aggregates, agent_ids, top=TOP_CONTEXT):
+    """
+    Combine the per-log context attribution of a session.
+
+    A tool result stays in the context of every later turn of its log;
+    those carried tokens are priced as cache reads at the log's model.
+
+    Args:
+        aggregates: Parsed logs, main session first
+        agent_ids: Agent id of each log ('main' for the main session)
+        top: Rows to keep per list
+
+    Returns:
+        Dict with tools and files (name, calls, results, bytes, tokens,
+        carried, cost) and results (the largest single tool results),
+        each most-carried first and cut to `top` rows
+    """
+    tools, files, results = {}, {}, []
+    for agent_id, stats in zip(agent_ids, aggregates):
+        turns = stats['messages']
+        for source, into in ((stats.get('tools', {}), tools), (stats.get('files', {}), files)):
+            for name, row in source.items():
+                merged = into.setdefault(name, {'name': name, 'calls': 0, 'results': 0, 'bytes': 0, 'tokens': 0,
+                                                'carried': 0, 'cost': 0.0})
+                carried = row['tokens'] * turns - row['weighted']
+                for field in ('calls', 'results', 'bytes', 'tokens'):
+                    merged[field] += row[field]
+                merged['carried'] += carried
+                merged['cost'] += token_cost(stats['model'], 0, 0, carried, 0, stats['start_time'])
+        for result in stats.get('top_results', []):
+            carried = result['tokens'] * (turns - result['turn'])
+            results.append({**result, 'agent': agent_id, 'carried': carried,
+                            'cost': round(token_cost(stats['model'], 0, 0, carried, 0, stats['start_time']), 4)})
+
+    def ranked(rows):
+        rows = sorted(rows, key=lambda r: r['carried'], reverse=True)[:top]
+        return [{**r, 'cost': round(r['cost'], 4)} for r in rows]
+
+    return {'tools': ranked(tools.values()), 'files': ranked(files.values()), 'results': ranked(results)}
+
+def context_section(context):
+    """
+    Build the Context Inflation section from a context breakdown.
+
+    Returns an empty string when no tool results were attributed.
+    """
+    if not context or not context['tools']:
+        return ""
+
+    section = """## Context Inflation
+
+Tokens each tool result added to the context, and the same tokens summed over every later turn that carried them (billed as cache reads).
+
+| Tool | Calls | Result Size | Context Tokens | Carried Tokens | Est. Cost |
+|------|-------|-------------|----------------|----------------|-----------|
+"""
+    for tool in context['tools']:
+        section += (f"| {tool['name']} | {tool['calls']:,} | {tool['bytes'] / 1024:,.0f} KB | {tool['tokens']:,} | "
+                    f"{tool['carried']:,} | ${tool['cost']:.4f} |\n")
 
-    # Calculate delegation metrics
+    if context['files']:
+        section += """
+### Files Inflating Context
+
+| File | Reads/Writes | Context Tokens | Carried Tokens | Est. Cost |
+|------|--------------|----------------|----------------|-----------|
+"""
+        for f in context['files']:
+            section += (f"| `{f['name']}` | {f['calls']:,} | {f['tokens']:,} | {f['carried']:,} | "
+                        f"${f['cost']:.4f} |\n")
+
+    if context['results']:
+        section += """
+### Largest Tool Results
+
+| Agent | Tool | File | Turn | Context Tokens | Carried Tokens | Est. Cost |
+|-------|------|------|------|----------------|----------------|-----------|
+"""
+        for r in context['results']:
+            file_name = f"`{r['file']}`" if r['file'] else '-'
+            section += (f"| {r['agent']} | {r['tool']} | {file_name} | {r['turn'] + 1} | "
+                        f"{r['tokens']:,} | {r['carried']:,} | ${r['cost']:.4f} |\n")
+    section += "\n"
+    return section
+
+def render_report(project_name, document, agents):
+    """
+    Render the markdown cost report from a report document.
+
+    Args:
+        project_name: Project name for the title
+        document: Report document from compute_report (or the cost store)
+        agents: Agent rows in report order, main session first
+    """
+    metrics = document['metrics']
+    main_stats = document['main']
+    totals = document['totals']
+    throughput = document['throughput']
+    session_id = document['sessionId']
+    subagent_stats = [a for a in agents if a['kind'] == 'subagent']
+
+    total_cost = metrics['totalCost']
+    main_cost = metrics['mainCost']
+    delegation_ratio = metrics['delegationRatio']
+    cache_efficiency = metrics['cacheEfficiency']
     total_subagent_output = sum(sa['output_tokens'] for sa in subagent_stats)
-    total_all_output = main_stats['output_tokens'] + total_subagent_output
-    delegation_ratio = (total_subagent_output / total_all_output * 100) if total_all_output > 0 else 0
+
+    total_input = totals['input_tokens']
+    total_output = totals['output_tokens']
+    total_cache_read = totals['cache_read']
+    total_cache_write = totals['cache_write']
 
     # Identify "heavy work" subagents (>1000 output tokens = did real implementation)
     heavy_work_agents = [sa for sa in subagent_stats if sa['output_tokens'] > 1000]
@@ -134,43 +325,9 @@ def generate_report(project_name, session_file, subagent_dir, output_path):
     over_delegated = delegation_ratio > 50
     too_many_agents = len(subagent_stats) > 5
     main_session_bloated = main_stats['output_tokens'] > 50000
-    delegation_healthy = not over_delegated and not too_many_agents
-
-    # Calculate costs
-    pricing = get_pricing(main_stats['model'])
-
-    main_cost = (
-        (main_stats['input_tokens'] / 1_000_000) * pricing['input'] +
-        (main_stats['output_tokens'] / 1_000_000) * pricing['output'] +
-        (main_stats['cache_read'] / 1_000_000) * pricing['cache_read'] +
-        (main_stats['cache_write'] / 1_000_000) * pricing['cache_write']
-    )
-
-    total_input = main_stats['input_tokens']
-    total_output = main_stats['output_tokens']
-    total_cache_read = main_stats['cache_read']
-    total_cache_write = main_stats['cache_write']
 
-    subagent_cost = 0
-    for sa in subagent_stats:
-        sa_pricing = get_pricing(sa['model'])
-        sa_cost = (
-            (sa['input_tokens'] / 1_000_000) * sa_pricing['input'] +
-            (sa['output_tokens'] / 1_000_000) * sa_pricing['output'] +
-            (sa['cache_read'] / 1_000_000) * sa_pricing['cache_read'] +
-            (sa['cache_write'] / 1_000_000) * sa_pricing['cache_write']
-        )
-        subagent_cost += sa_cost
-        total_input += sa['input_tokens']
-        total_output += sa['output_tokens']
-        total_cache_read += sa['cache_read']
-        total_cache_write += sa['cache_write']
-
-    total_cost = main_cost + subagent_cost
-
-    # Calculate efficiency
-    total_tokens = total_input + total_output + total_cache_read + total_cache_write
-    cache_efficiency = (total_cache_read / total_tokens * 100) if total_tokens > 0 else 0
+    pricing = get_pricing(main_stats['model'], main_stats['start_time'])
+    costs = category_costs(agents)
 
     # Format timestamps
     start_time = main_stats['start_time'][:19] if main_stats['start_time'] else 'N/A'
@@ -197,10 +354,10 @@ Session ID: {session_id}
 
 | Category | Tokens | Cost |
 |----------|--------|------|
-| Input Tokens | {total_input:,} | ${(total_input / 1_000_000) * pricing['input']:.4f} |
-| Output Tokens | {total_output:,} | ${(total_output / 1_000_000) * pricing['output']:.4f} |
-| Cache Read | {total_cache_read:,} | ${(total_cache_read / 1_000_000) * pricing['cache_read']:.4f} |
-| Cache Write | {total_cache_write:,} | ${(total_cache_write / 1_000_000) * pricing['cache_write']:.4f} |
+| Input Tokens | {total_input:,} | ${costs['input_tokens']:.4f} |
+| Output Tokens | {total_output:,} | ${costs['output_tokens']:.4f} |
+| Cache Read | {total_cache_read:,} | ${costs['cache_read']:.4f} |
+| Cache Write | {total_cache_write:,} | ${costs['cache_write']:.4f} |
 | **Total** | **{total_input + total_output + total_cache_read + total_cache_write:,}** | **${total_cost:.2f}** |
 
 ## Main Session
@@ -221,38 +378,12 @@ Session ID: {session_id}
 """
 
     for sa in subagent_stats:
-        sa_pricing = get_pricing(sa['model'])
-        sa_cost = (
-            (sa['input_tokens'] / 1_000_000) * sa_pricing['input'] +
-            (sa['output_tokens'] / 1_000_000) * sa_pricing['output'] +
-            (sa['cache_read'] / 1_000_000) * sa_pricing['cache_read'] +
-            (sa['cache_write'] / 1_000_000) * sa_pricing['cache_write']
-        )
-        # Determine work type based on output tokens
-        if sa['output_tokens'] > 1000:
-            work_type = "Heavy Work"
-        elif sa['output_tokens'] > 200:
-            work_type = "Light Work"
-        else:
-            work_type = "Exploration"
-
-        # Extract model short name
-        model_short = 'unknown'
-        if 'opus' in sa['model'].lower():
-            model_short = 'Opus'
-        elif 'sonnet' in sa['model'].lower():
-            model_short = 'Sonnet'
-        elif 'haiku' in sa['model'].lower():
-            model_short = 'Haiku'
-
-        report += f"| {sa['id'][:20]}... | {model_short} | {sa['output_tokens']:,} | {sa['messages']} | ${sa_cost:.4f} | {work_type} |\n"
+        report += (f"| {sa['id']} | {model_short_name(sa['model'])} | {sa['output_tokens']:,} | "
+                   f"{sa['messages']} | ${sa['cost']:.4f} | {sa['work_type']} |\n")
 
     if not subagent_stats:
         report += "| (none) | - | - | - | - | - |\n"
 
-    # Add Delegation Analysis section
-    delegation_status = "HEALTHY" if delegation_healthy else "WARNING"
-
     # Determine delegation ratio status
     if delegation_ratio > 50:
         ratio_status = "Over-delegated"
@@ -323,6 +454,18 @@ Main session output exceeds 50K tokens. Consider:
 - Starting fresh session for next phase
 
 """
+        inflating = (document.get('context') or {}).get('files', [])[:3]
+        if inflating:
+            report += "Largest context contributors (see Context Inflation below):\n"
+            for f in inflating:
+                report += f"- `{f['name']}`: {f['carried']:,} carried tokens (~${f['cost']:.2f})\n"
+            report += "\n"
+
+    report += session_reuse_section(main_stats['runs'])
+    report += phase_section(document.get('phases'))
+    report += context_section(document.get('context'))
+    report += cache_section(document.get('cache'))
+    report += tree_section(document.get('tree'))
 
     if heavy_work_agents:
         report += "### Heavy Work Agents (>1000 output tokens)\n\n"
@@ -332,15 +475,15 @@ Main session output exceeds 50K tokens. Consider:
 
     savings = (total_cache_read / 1_000_000) * (pricing['input'] - pricing['cache_read'])
 
-    report += f"""
-## Pricing Reference (per 1M tokens)
-
-| Model | Input | Output | Cache Read | Cache Write |
-|-------|-------|--------|------------|-------------|
-| Opus 4.5 | $15.00 | $75.00 | $1.875 | $18.75 |
-| Sonnet 4 | $3.00 | $15.00 | $0.30 | $3.75 |
-| Haiku 3.5 | $0.80 | $4.00 | $0.08 | $1.00 |
+    parse_note = (f"Parsed {throughput['bytes'] / 1_000_000:.1f} MB from {throughput['files']} log(s) "
+                  f"in {throughput['seconds']:.2f}s ({throughput['mb_per_s']:.1f} MB/s, "
+                  f"{throughput['decoder']} decoder, {throughput['mode']} mode, {throughput['workers']} worker(s), "
+                  f"{throughput.get('dedup', 'off')} message de-duplication)")
+    if 'resumed' in throughput:
+        parse_note += f"; {throughput['resumed']} log(s) resumed from the cost index"
 
+    report += pricing_section(main_stats['start_time'])
+    report += f"""
 ## Efficiency Analysis
 
 - **Cache Efficiency: {cache_efficiency:.1f}%** - Percentage of tokens served from cache
@@ -348,47 +491,416 @@ Main session output exceeds 50K tokens. Consider:
 - **Context Reuse Savings: ~${savings:.2f}** - Saved by using cache vs fresh input
 
 > Note: This report uses API pricing for reference. Subscription users pay a flat monthly fee regardless of usage.
+
+_{parse_note}_
 """
 
-    # Save report
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(report)
+    return report
+
+def cache_hit_rate(run):
+    """Percentage of a run's input-side tokens served from the prompt cache."""
+    total = run['input_tokens'] + run['cache_read'] + run['cache_write']
+    return (run['cache_read'] / total * 100) if total > 0 else 0
+
+def session_reuse_section(runs):
+    """
+    Build the Session Reuse section comparing the cold first run of a
+    session with the follow-up runs that resumed it.
+
+    Returns an empty string when the session only contains a single run.
+    """
+    if len(runs) < 2:
+        return ""
 
-    return report, total_cost
+    section = """## Session Reuse
+
+| Run | Started | Fresh Input | Cache Read | Cache Write | Cache Hit Rate |
+|-----|---------|-------------|------------|-------------|----------------|
+"""
+    for i, run in enumerate(runs, 1):
+        started = run['start_time'][:19] if run['start_time'] else 'N/A'
+        label = 'Cold' if i == 1 else 'Resumed'
+        section += (f"| {i} ({label}) | {started} | {run['input_tokens']:,} | {run['cache_read']:,} | "
+                    f"{run['cache_write']:,} | {cache_hit_rate(run):.1f}% |\n")
+
+    cold = cache_hit_rate(runs[0])
+    resumed = {key: sum(r[key] for r in runs[1:]) for key in ('input_tokens', 'cache_read', 'cache_write')}
+    uplift = cache_hit_rate(resumed) - cold
+
+    section += f"""
+- **Cold Run Cache Hit Rate: {cold:.1f}%**
+- **Resumed Runs Cache Hit Rate: {cache_hit_rate(resumed):.1f}%**
+- **Cache-Read Uplift: {uplift:+.1f} pts** - Gained by resuming the session instead of starting cold
+
+"""
+    return section
+
+def format_duration(seconds):
+    """Format a wall-clock duration, e.g. 1h 02m, 12m 05s or 40s."""
+    if seconds is None:
+        return '-'
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+def phase_section(phases):
+    """
+    Build the Phase Breakdown section from per-phase rows.
+
+    Returns an empty string when no phase boundaries were journaled.
+    """
+    if not phases:
+        return ""
+
+    section = """## Phase Breakdown
+
+| Phase | Wall Clock | Runs | Messages | Output | Cache Efficiency | Cost |
+|-------|------------|------|----------|--------|------------------|------|
+"""
+    for phase in phases:
+        section += (f"| {phase['label']} | {format_duration(phase['seconds'])} | {phase['runs'] or '-'} | "
+                    f"{phase['messages']:,} | {phase['output_tokens']:,} | {phase['cacheEfficiency']:.1f}% | "
+                    f"${phase['cost']:.4f} |\n")
+
+    costed = [p for p in phases if p['key'] != 'unattributed']
+    if costed:
+        priciest = max(costed, key=lambda p: p['cost'])
+        section += f"\n- **Most Expensive: {priciest['label']}** (${priciest['cost']:.2f})\n"
+        timed = [p for p in costed if p['seconds']]
+        if timed:
+            slowest = max(timed, key=lambda p: p['seconds'])
+            section += f"- **Slowest: {slowest['label']}** ({format_duration(slowest['seconds'])})\n"
+    section += "\n"
+    return section
+
+def cache_section(cache):
+    """
+    Build the Cache Timeline section from the summarized cache timeline.
+
+    Returns an empty string for reports built without one.
+    """
+    if not cache:
+        return ""
+
+    section = "## Cache Timeline\n\n"
+    if cache['mainSparkline']:
+        section += f"Main session cache hit rate per turn: `{cache['mainSparkline']}`\n\n"
+    section += """| Agent | Turns | Cache Hit Rate | Cache Breaks | Break Cost |
+|-------|-------|----------------|--------------|------------|
+"""
+    for agent in cache['agents']:
+        section += (f"| {agent['agent']} | {agent['turns']:,} | {agent['hitRate']:.1f}% | {agent['breaks']} | "
+                    f"${agent['extraCost']:.4f} |\n")
+
+    if cache['breaks']:
+        section += f"""
+### Cache Breaks
+
+{cache['totalBreaks']} break(s) cost ~${cache['extraCost']:.2f} in cache rewrites. Costliest:
+
+| Agent | Turn | Time | Cache Read (before -> after) | Cache Write | Extra Cost | Likely Cause |
+|-------|------|------|------------------------------|-------------|------------|--------------|
+"""
+        for b in cache['breaks']:
+            time = b['timestamp'][11:19] if b['timestamp'] else 'N/A'
+            section += (f"| {b['agent']} | {b['turn']} | {time} | {b['previous_cache_read']:,} -> "
+                        f"{b['cache_read']:,} | {b['cache_write']:,} | ${b['extra_cost']:.4f} | "
+                        f"{', '.join(b['causes'])} |\n")
+    else:
+        section += "\nNo cache breaks detected.\n"
+    section += "\n"
+    return section
+
+def pricing_section(at):
+    """Pricing Reference table, from the catalog rates in force at the session start."""
+    day = at[:10] if at else datetime.now().strftime('%Y-%m-%d')
+    section = f"""
+## Pricing Reference (per 1M tokens)
+
+Rates in force on {day} (pricing catalog v{catalog_version()}).
+
+| Model | Input | Output | Cache Read | Cache Write | Effective |
+|-------|-------|--------|------------|-------------|-----------|
+"""
+    notes = []
+    for model in price_list(at):
+        section += (f"| {model['name']} | {price(model['input'])} | {price(model['output'])} | "
+                    f"{price(model['cache_read'])} | {price(model['cache_write'])} | {model['effective']} |\n")
+        for tier in model.get('tiers', ()):
+            notes.append(f"- {model['name']} requests with prompts over {tier['above']:,} tokens: "
+                         f"{price(tier['input'])} input, {price(tier['output'])} output, "
+                         f"{price(tier['cache_read'])} cache read, {price(tier['cache_write'])} cache write")
+    if notes:
+        section += "\n" + "\n".join(notes) + "\n"
+    return section
+
+def price(rate):
+    """A per-1M-token rate as dollars, with at least two decimals."""
+    return f"${rate:.2f}" if round(rate, 2) == rate else f"${rate:g}"
+
+def tree_section(tree):
+    """
+    Build the Delegation Tree section: who spawned whom, with the cost and
+    wall-clock time of every subtree, most expensive branch first.
+
+    Returns an empty string for single-agent sessions.
+    """
+    if not tree or not tree['children']:
+        return ""
+
+    def label(node):
+        text = f"{node['id']} ({model_short_name(node['model'])})  ${node['cost']:.4f}"
+        if node['children']:
+            subtree = node['subtree']
+            text += f" | subtree ${subtree['cost']:.4f}, {subtree['agents']} agents"
+            seconds = subtree['seconds']
+        else:
+            seconds = node['seconds']
+        if seconds is not None:
+            text += f", {format_duration(seconds)}"
+        return text
+
+    lines = []
+    stack = [(tree, '', '')]
+    while stack and len(lines) < TREE_LINES:
+        node, prefix, branch = stack.pop()
+        lines.append(prefix + branch + label(node))
+        child_prefix = prefix + ('' if not branch else '    ' if branch.startswith('└') else '│   ')
+        children = node['children']
+        for n in range(len(children) - 1, -1, -1):
+            stack.append((children[n], child_prefix, '└── ' if n == len(children) - 1 else '├── '))
+
+    section = "## Delegation Tree\n\n```\n" + "\n".join(lines) + "\n```\n"
+    hidden = tree['subtree']['agents'] - len(lines)
+    if hidden > 0:
+        section += f"\n_{hidden} more agent(s) not shown; see /api/cost/tree._\n"
+    guessed = sum(1 for node in _walk(tree) if node['link'] in ('time', 'fallback'))
+    if guessed:
+        section += (f"\n_{guessed} agent(s) placed by start time rather than by the spawning call's "
+                    f"result._\n")
+    section += "\n"
+    return section
+
+def _walk(tree):
+    """All nodes of a spawn tree, parents before children."""
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(node['children'])
+
+def phase_breakdown(conductor_dir, session_file, subagent_dir):
+    """
+    Attribute a session's usage to the plan phases journaled by the server.
+
+    Records are streamed from the usage warehouse in timestamp order after
+    ingesting whatever was appended to the session's logs.
+
+    Returns:
+        Per-phase rows (see phase_costs.attribute_phases), or None when
+        there is no phase journal
+    """
+    events = load_phase_events(Path(conductor_dir) / 'phase-events.jsonl')
+    if not events:
+        return None
+
+    paths = [session_file] + subagent_logs(subagent_dir)
+    warehouse = UsageWarehouse(Path(conductor_dir) / 'usage.db', session_file.parent.parent)
+    warehouse.ingest(paths)
+    return attribute_phases(warehouse.records(session_file.stem), phase_segments(events))
 
 def list_sessions(project_path):
     """List all available sessions for a project."""
-    claude_projects = Path.home() / '.claude' / 'projects'
-
-    session_dir = None
-    if claude_projects.exists():
-        for d in claude_projects.iterdir():
-            if d.is_dir():
-                d_lower = d.name.lower()
-                if 'aipm' in d_lower or 'neogov' in d_lower:
-                    session_dir = d
-                    break
+    index = open_session_index(project_path)
+    if not index.log_dir:
+        return [], None
 
-    if not session_dir:
-        return []
+    # Message counts and models come from the usage warehouse, which only
+    # reads what was appended to each log since the last listing
+    warehouse = UsageWarehouse(Path(project_path).resolve() / '.conductor' / 'usage.db', index.log_dir.parent)
+    warehouse.ingest(warehouse.discover(index.log_dir.name))
+    summaries = {s['id']: s for s in warehouse.sessions(project_dir=index.log_dir.name)[0]}
 
     sessions = []
-    for f in session_dir.glob('*.jsonl'):
-        if not f.name.startswith('agent-'):
-            stats = parse_session(f)
-            sessions.append({
-                'id': f.stem,
-                'file': f,
-                'start': stats['start_time'],
-                'end': stats['end_time'],
-                'messages': stats['messages'],
-                'model': stats['model']
-            })
-
-    # Sort by start time
-    sessions.sort(key=lambda x: x['start'] or '', reverse=True)
-    return sessions, session_dir
+    for session in index.sessions():
+        summary = summaries.get(session['id'], {})
+        sessions.append({
+            **session,
+            'messages': summary.get('messages', 0),
+            'model': summary.get('model') or 'unknown'
+        })
+    return sessions, index.log_dir
+
+def read_project_name(project_path):
+    """Get the project name from project.yaml."""
+    project_name = "Unknown Project"
+    yaml_path = Path(project_path) / 'project.yaml'
+    if yaml_path.exists():
+        with open(yaml_path, 'r') as f:
+            for line in f:
+                if 'name:' in line:
+                    project_name = line.split(':', 1)[1].strip().strip('"\'')
+                    break
+    return project_name
+
+def locate_session(project_path, session_id=None):
+    """
+    Find a session log and its subagent directory.
+
+    Args:
+        project_path: Project directory
+        session_id: Session id or prefix; latest session when omitted
+
+    Returns:
+        Tuple of (session_file, subagent_dir), or (None, None) if not found
+    """
+    if not session_id:
+        return find_latest_session(project_path)
+
+    index = open_session_index(project_path)
+    session = index.find(session_id)
+    if not session:
+        return None, None
+    return session['file'], index.log_dir / session['id'] / 'subagents'
+
+def log_fingerprint(session_file, subagent_dir):
+    """
+    Fingerprint the logs a report is built from.
+
+    Changes whenever a log is added, removed, appended to or replaced.
+    """
+    files = [session_file] + subagent_logs(subagent_dir)
+
+    digest = hashlib.sha1()
+    for f in files:
+        try:
+            st = f.stat()
+            digest.update(f"{f}|{st.st_size}|{st.st_mtime_ns}|{st.st_ino}\n".encode('utf-8'))
+        except OSError:
+            digest.update(f"{f}|missing\n".encode('utf-8'))
+    return digest.hexdigest()
+
+def cached_report(store, session_file, subagent_dir, dedup=DEFAULT_DEDUP):
+    """
+    Stored cost figures, if they are still current.
+
+    They are current while the logs are unchanged and they were computed
+    with the same de-duplication mode and pricing catalog version.
+
+    Returns:
+        The stored document, or None if it must be rebuilt
+    """
+    stored = store.load()
+    if (stored and stored.get('fingerprint') == log_fingerprint(session_file, subagent_dir) and
+            stored.get('throughput', {}).get('dedup', 'off') == dedup and
+            stored.get('pricing', {}).get('version') == catalog_version()):
+        return stored
+    return None
+
+def build_report(project_path, session_id=None, workers=None, mode=DEFAULT_PARSE_MODE,
+                 use_index=True, use_cache=True, render=True, progress=None, dedup=DEFAULT_DEDUP):
+    """
+    Locate a session, compute its cost figures and store them.
+
+    Results go to the project's CostStore (.conductor/cost-metrics.json and
+    .conductor/cost.db), keyed on the log fingerprint, so asking again
+    while nothing changed returns instantly. The markdown report is only
+    rendered when `render` is set.
+
+    Args:
+        project_path: Project directory
+        session_id: Session id or prefix; latest session when omitted
+        workers: Parser processes (default: one per CPU)
+        mode: Parse mode ('full', 'scan' or 'verify')
+        use_index: Resume from the incremental cost index
+        use_cache: Return stored metrics while they are current (see cached_report)
+        render: Also write output/cost_report.md
+        progress: Optional callback(percent, message)
+        dedup: Message de-duplication ('exact', 'bloom' or 'off')
+
+    Returns:
+        The stored document (sessionId, fingerprint, generatedAt, metrics,
+        ...) plus cached and report (markdown, or None when not rendered)
+
+    Raises:
+        LookupError: If no session logs can be found
+    """
+    def report_progress(percent, message):
+        if progress:
+            progress(percent, message)
+
+    project_path = Path(project_path).resolve()
+    conductor_dir = project_path / '.conductor'
+    store = CostStore(conductor_dir)
+
+    report_progress(5, 'Finding session logs')
+    session_file, subagent_dir = locate_session(project_path, session_id)
+    if not session_file:
+        raise LookupError(f"Session '{session_id}' not found" if session_id else
+                          "Could not find session logs")
+
+    fingerprint = log_fingerprint(session_file, subagent_dir)
+    if use_cache:
+        stored = cached_report(store, session_file, subagent_dir, dedup)
+        if stored:
+            report = render_stored_report(project_path, store, stored) if render else None
+            report_progress(100, 'Logs unchanged - using stored metrics')
+            return {**stored, 'cached': True, 'report': report}
+
+    def parse_progress(done, total):
+        report_progress(10 + 80 * done / total, f'Parsed {done}/{total} log(s)')
+
+    index = CostIndex(conductor_dir / 'cost-index.json') if use_index else None
+    document, agents = compute_report(session_file, subagent_dir, workers=workers, index=index, mode=mode,
+                                      progress=parse_progress, dedup=dedup)
+    report_progress(92, 'Attributing usage to phases')
+    phases = phase_breakdown(conductor_dir, session_file, subagent_dir)
+    if phases is not None:
+        document['phases'] = phases
+
+    report_progress(95, 'Detecting cache breaks')
+    timeline = cache_timeline([(a['id'], path) for a, path in
+                               zip(agents, [session_file] + subagent_logs(subagent_dir))], workers=workers)
+    store.save_timeline(document['sessionId'], timeline)
+    document['cache'] = summarize_timeline(timeline)
+
+    document.update({
+        'fingerprint': fingerprint,
+        'generatedAt': datetime.now().isoformat(),
+        'projectName': read_project_name(project_path),
+        'reportPath': str(project_path / REPORT_PATH)
+    })
+    store.save(document, agents)
+
+    report = render_stored_report(project_path, store, document) if render else None
+    report_progress(100, 'Cost figures stored')
+    return {**document, 'cached': False, 'report': report}
+
+def render_stored_report(project_path, store=None, document=None):
+    """
+    Render output/cost_report.md from the stored cost figures, without
+    touching the session logs.
+
+    Returns:
+        Report markdown, or None if no report has been stored
+    """
+    project_path = Path(project_path).resolve()
+    store = store or CostStore(project_path / '.conductor')
+    document = document or store.load()
+    if not document:
+        return None
+
+    agents, _ = store.agents(document['sessionId'], order='position')
+    report = render_report(document.get('projectName') or read_project_name(project_path), document, agents)
+
+    output_path = project_path / REPORT_PATH
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(report)
+    return report
 
 def main():
     # Parse arguments
@@ -397,19 +909,44 @@ def main():
     parser.add_argument('project_path', nargs='?', default='.', help='Project directory')
     parser.add_argument('--session', '-s', help='Specific session ID to analyze')
     parser.add_argument('--list', '-l', action='store_true', help='List available sessions')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help='Parser processes (default: one per CPU)')
+    parser.add_argument('--full', action='store_true',
+                        help='Ignore the cost index and cached metrics; re-parse every log')
+    parser.add_argument('--parse-mode', choices=PARSE_MODES, default=DEFAULT_PARSE_MODE,
+                        help='full: decode every line; scan: decode only usage candidates; '
+                             'verify: scan and check against full decoding')
+    parser.add_argument('--dedup', choices=DEDUP_MODES, default=DEFAULT_DEDUP,
+                        help='Count repeated messages once: exact hash set, bloom filter (constant memory '
+                             'for huge logs) or off')
+    parser.add_argument('--archive', action='store_true',
+                        help='Batch: report the current project and every archived project')
+    parser.add_argument('--all', action='store_true',
+                        help='Batch: also report every other project Claude has logs for')
+    parser.add_argument('--output', '-o', help='Batch output directory (default: output/cost_batch)')
     args = parser.parse_args()
 
     project_path = Path(args.project_path).resolve()
-
-    # Try to get project name from project.yaml
-    project_name = "Unknown Project"
-    yaml_path = project_path / 'project.yaml'
-    if yaml_path.exists():
-        with open(yaml_path, 'r') as f:
-            for line in f:
-                if 'name:' in line:
-                    project_name = line.split(':', 1)[1].strip().strip('"\'')
-                    break
+    project_name = read_project_name(project_path)
+
+    if args.archive or args.all:
+        from scripts.batch_reports import run_batch
+        result = run_batch(project_path, include_archive=args.archive, include_all=args.all,
+                           output_dir=args.output, workers=args.workers, mode=args.parse_mode,
+                           dedup=args.dedup, use_index=not args.full)
+        print(f"{'Project':<40} {'Kind':<8} {'Sessions':>8} {'Messages':>10} {'Cost':>12}")
+        print("-" * 82)
+        for p in result['projects']:
+            print(f"{p['id'][:40]:<40} {p['kind']:<8} {p['sessions']:>8} {p['messages']:>10,} "
+                  f"{'$' + format(p['cost'], ',.2f'):>12}")
+        totals = result['totals']
+        throughput = result['throughput']
+        print("-" * 82)
+        print(f"{'Total':<40} {'':<8} {totals['sessions']:>8} {'':>10} {'$' + format(totals['cost'], ',.2f'):>12}")
+        print(f"\nParsed {throughput['bytes'] / 1_000_000:.1f} MB from {throughput['files']} log(s) in "
+              f"{throughput['seconds']:.2f}s ({throughput['workers']} worker(s))")
+        print(f"Summary and reports saved to: {result['outputDir']}")
+        return
 
     # List sessions if requested
     if args.list:
@@ -422,39 +959,23 @@ def main():
             print(f"{s['id']:<40} {start:<22} {s['messages']:<10} {s['model']}")
         return
 
-    # Find session
-    if args.session:
-        # Use specified session
-        sessions, session_dir = list_sessions(project_path)
-        session_file = None
-        for s in sessions:
-            if s['id'] == args.session or s['id'].startswith(args.session):
-                session_file = s['file']
-                break
-
-        if not session_file:
-            print(f"Error: Session '{args.session}' not found.")
+    try:
+        result = build_report(project_path, session_id=args.session, workers=args.workers,
+                              mode=args.parse_mode, use_index=not args.full, use_cache=not args.full,
+                              dedup=args.dedup)
+    except LookupError as e:
+        print(f"Error: {e}.")
+        if args.session:
             print("Use --list to see available sessions.")
-            sys.exit(1)
-
-        subagent_dir = session_dir / session_file.stem / 'subagents'
-    else:
-        # Find latest session
-        session_file, subagent_dir = find_latest_session(project_path)
-
-    if not session_file:
-        print("Error: Could not find session logs.")
-        print("Make sure you've run a Claude session in this project.")
+        else:
+            print("Make sure you've run a Claude session in this project.")
         sys.exit(1)
 
-    print(f"Found session: {session_file.name}")
-
-    # Generate report
-    output_path = project_path / 'output' / 'cost_report.md'
-    report, total_cost = generate_report(project_name, session_file, subagent_dir, output_path)
-
-    print(report)
-    print(f"\n---\nReport saved to: {output_path}")
+    print(f"Found session: {result['sessionId']}")
+    print(result['report'])
+    if result['cached']:
+        print("\n(Logs unchanged since the last report - rendered from stored metrics)")
+    print(f"\n---\nReport saved to: {result['reportPath']}")
 
 if __name__ == '__main__':
     main()
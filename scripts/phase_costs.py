@@ -0,0 +1,153 @@
+"""
+Per-Phase Cost Attribution for Simple Claude Conductor
+
+The server journals every change of state, plan phase or Claude run to
+.conductor/phase-events.jsonl. Each event opens a segment that lasts until
+the next one. Usage records, in timestamp order, are stream-joined against
+these segments to give tokens, cost, cache efficiency and wall-clock time
+per plan phase.
+"""
+
+import json
+from datetime import datetime
+
+from scripts.pricing import request_cost
+
+# States whose segments count towards a plan phase
+PHASE_STATES = {'executing', 'questions'}
+PLANNING_STATES = {'planning', 'plan_questions'}
+
+UNATTRIBUTED = ('unattributed', 'Unattributed')
+
+TOKEN_FIELDS = ('input_tokens', 'output_tokens', 'cache_read', 'cache_write')
+
+
+def parse_time(timestamp):
+    """ISO timestamp (as in session logs and the journal) to epoch seconds, or None."""
+    if not timestamp:
+        return None
+    try:
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def load_phase_events(journal_path):
+    """Read the phase journal; unreadable lines are skipped."""
+    events = []
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(event, dict) and parse_time(event.get('time')) is not None:
+                    events.append(event)
+    except OSError:
+        pass
+    events.sort(key=lambda e: parse_time(e['time']))
+    return events
+
+
+def segment_key(event):
+    """Phase key and label of the segment an event opens; (None, None) when idle."""
+    state = event.get('state')
+    phase = event.get('phase')
+    if state in PHASE_STATES and phase:
+        label = f"Phase {phase}"
+        if event.get('phase_name'):
+            label += f": {event['phase_name']}"
+        return f"phase-{phase}", label
+    if state in PLANNING_STATES:
+        return 'planning', 'Planning'
+    return None, None
+
+
+def phase_segments(events):
+    """
+    Turn journal events into consecutive segments.
+
+    Returns:
+        List of dicts with key, label, phase, run_id, start and end (epoch
+        seconds; end is None for the segment still open)
+    """
+    segments = []
+    for i, event in enumerate(events):
+        key, label = segment_key(event)
+        segments.append({
+            'key': key,
+            'label': label,
+            'phase': event.get('phase') if key and key != 'planning' else None,
+            'run_id': event.get('run_id'),
+            'start': parse_time(event['time']),
+            'end': parse_time(events[i + 1]['time']) if i + 1 < len(events) else None
+        })
+    return segments
+
+
+def attribute_phases(records, segments):
+    """
+    Stream-join usage records with phase segments.
+
+    Args:
+        records: Usage records (agent_id, model, timestamp, token counts)
+            in timestamp order, e.g. UsageWarehouse.records()
+        segments: Output of phase_segments()
+
+    Returns:
+        Per-phase rows in order of first use: key, label, phase, token
+        counts, messages, cost, cacheEfficiency, seconds (wall clock of
+        the phase's segments; None for unattributed usage), runs, start
+        and end (first/last record timestamps)
+    """
+    rows = {}
+    used = {}
+    i = 0
+    for record in records:
+        t = parse_time(record['timestamp'])
+        if t is None:
+            continue
+        while i < len(segments) and segments[i]['end'] is not None and segments[i]['end'] <= t:
+            i += 1
+        segment = segments[i] if i < len(segments) and segments[i]['start'] <= t else None
+
+        key, label = (segment['key'], segment['label']) if segment and segment['key'] else UNATTRIBUTED
+        row = rows.get(key)
+        if row is None:
+            row = rows[key] = {
+                'key': key,
+                'label': label,
+                'phase': segment['phase'] if segment and segment['key'] else None,
+                'messages': 0,
+                'cost': 0.0,
+                'start': record['timestamp'],
+                'runs': set(),
+                **{field: 0 for field in TOKEN_FIELDS}
+            }
+        row['messages'] += 1
+        for field in TOKEN_FIELDS:
+            row[field] += record[field]
+        row['cost'] += request_cost(record['model'], *(record[field] for field in TOKEN_FIELDS), record['timestamp'])
+        row['end'] = record['timestamp']
+        if key != UNATTRIBUTED[0]:
+            row['runs'].add(segment['run_id'])
+            # Wall clock of an open segment runs to its last record
+            used.setdefault(key, {})[i] = max(used.get(key, {}).get(i, t), t)
+
+    result = []
+    for key, row in rows.items():
+        if key == UNATTRIBUTED[0]:
+            seconds = None
+        else:
+            seconds = sum((segments[i]['end'] if segments[i]['end'] is not None else last) - segments[i]['start']
+                          for i, last in used[key].items())
+        total = sum(row[field] for field in TOKEN_FIELDS)
+        result.append({
+            **row,
+            'cost': round(row['cost'], 4),
+            'cacheEfficiency': round(row['cache_read'] / total * 100, 1) if total else 0,
+            'seconds': round(seconds, 1) if seconds is not None else None,
+            'runs': len(row['runs'] - {None})
+        })
+    return result
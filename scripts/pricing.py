@@ -0,0 +1,159 @@
+"""
+Model Pricing for Simple Claude Conductor
+
+API prices used to estimate what a session would cost. Shared by the cost
+report, the usage warehouse and the live cost meter.
+
+Prices come from a versioned catalog (pricing.json next to this module),
+loaded once per process. Each model lists its rates with the date they took
+effect, so a historical session is priced at the rate in force when it ran.
+A rate may carry tiers that apply when a single request's prompt exceeds a
+size (long-context pricing); aggregated token counts cannot tell which
+requests crossed the threshold, so they are priced at the base tier.
+"""
+
+import json
+from bisect import bisect_right
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+
+# Versioned price catalog
+CATALOG_PATH = Path(__file__).with_name('pricing.json')
+
+# Rate keys of a catalog entry (per 1M tokens)...
+RATE_FIELDS = ('input', 'output', 'cache_read', 'cache_write')
+# ...and the token counts they price, in the same order
+TOKEN_FIELDS = ('input_tokens', 'output_tokens', 'cache_read', 'cache_write')
+
+
+@lru_cache(maxsize=None)
+def load_catalog(path=CATALOG_PATH):
+    """
+    Read the pricing catalog.
+
+    Returns:
+        Dict with version, models (catalog id -> entry with name, rates
+        sorted by effective date and their dates) and default rates
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        catalog = json.load(f)
+    models = {}
+    for model in catalog['models']:
+        rates = sorted(model['rates'], key=lambda r: r['effective'])
+        models[model['id']] = {'name': model.get('name', model['id']), 'rates': rates,
+                               'dates': [r['effective'] for r in rates]}
+    return {'version': catalog['version'], 'models': models, 'default': catalog['default']}
+
+
+def catalog_version():
+    """Version of the loaded catalog; stored figures priced under another are stale."""
+    return load_catalog()['version']
+
+
+@lru_cache(maxsize=1024)
+def resolve_model(model):
+    """Catalog id of a model string (the longest id it contains), or None."""
+    model = str(model)
+    matches = [key for key in load_catalog()['models'] if key in model]
+    return max(matches, key=len) if matches else None
+
+
+@lru_cache(maxsize=4096)
+def _rate_on(key, day):
+    """Rate entry of a catalog model in force on a day (the earliest before its first date)."""
+    entry = load_catalog()['models'][key]
+    return entry['rates'][max(0, bisect_right(entry['dates'], day) - 1)]
+
+
+def _day(at):
+    """ISO day of a timestamp; today when there is none."""
+    return str(at)[:10] if at else date.today().isoformat()
+
+
+def get_pricing(model, at=None, prompt_tokens=0):
+    """
+    Get pricing for a model.
+
+    Args:
+        model: Model string as logged
+        at: ISO timestamp the usage happened at (default: now)
+        prompt_tokens: Prompt size of a single request, to pick its tier
+
+    Returns:
+        Dict of per-1M-token rates (input, output, cache_read, cache_write)
+    """
+    key = resolve_model(model)
+    if key is None:
+        return load_catalog()['default']
+    rate = _rate_on(key, _day(at))
+    for tier in sorted(rate.get('tiers', ()), key=lambda t: t['above'], reverse=True):
+        if prompt_tokens > tier['above']:
+            return tier
+    return rate
+
+
+def token_cost(model, input_tokens, output_tokens, cache_read, cache_write, at=None):
+    """Estimated cost of token counts at a model's pricing (base tier)."""
+    pricing = get_pricing(model, at)
+    return (
+        (input_tokens / 1_000_000) * pricing['input'] +
+        (output_tokens / 1_000_000) * pricing['output'] +
+        (cache_read / 1_000_000) * pricing['cache_read'] +
+        (cache_write / 1_000_000) * pricing['cache_write']
+    )
+
+
+def request_cost(model, input_tokens, output_tokens, cache_read, cache_write, at=None):
+    """Estimated cost of one API request, at the tier its prompt size falls in."""
+    pricing = get_pricing(model, at, input_tokens + cache_read + cache_write)
+    return (
+        (input_tokens / 1_000_000) * pricing['input'] +
+        (output_tokens / 1_000_000) * pricing['output'] +
+        (cache_read / 1_000_000) * pricing['cache_read'] +
+        (cache_write / 1_000_000) * pricing['cache_write']
+    )
+
+
+def row_costs(rows, time_key='start_time'):
+    """
+    Price many token rows at once.
+
+    Rates are looked up once per distinct (model, day) rather than per row.
+
+    Args:
+        rows: Dicts with model, the token fields and a timestamp
+        time_key: Key of the timestamp to price each row at
+
+    Returns:
+        List of per-category cost lists (parallel to TOKEN_FIELDS), one per row
+    """
+    rates = {}
+    costs = []
+    for row in rows:
+        group = (row['model'], _day(row[time_key]))
+        if group not in rates:
+            pricing = get_pricing(group[0], group[1])
+            rates[group] = [pricing[field] / 1_000_000 for field in RATE_FIELDS]
+        costs.append([row[field] * rate for field, rate in zip(TOKEN_FIELDS, rates[group])])
+    return costs
+
+
+def category_costs(rows, time_key='start_time'):
+    """Cost of each token category summed over rows, each at its own model's pricing."""
+    totals = [0.0] * len(TOKEN_FIELDS)
+    for costs in row_costs(rows, time_key):
+        totals = [t + c for t, c in zip(totals, costs)]
+    return dict(zip(TOKEN_FIELDS, totals))
+
+
+def price_list(at=None):
+    """
+    Catalog rates in force at a time, for rendering a pricing table.
+
+    Returns:
+        List of dicts with id, name, effective date, the rates and tiers
+    """
+    catalog = load_catalog()
+    return [{'id': key, 'name': entry['name'], **_rate_on(key, _day(at))}
+            for key, entry in catalog['models'].items()]
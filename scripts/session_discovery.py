@@ -0,0 +1,209 @@
+"""
+Session Discovery for Simple Claude Conductor
+
+Maps a project root to the directory the Claude CLI logs its sessions in
+(~/.claude/projects/<encoded path>) and keeps a cached index of the session
+logs found there.
+
+Per-log metadata (first/last timestamp, size, mtime) is only re-read for
+logs whose size, mtime or inode changed, and timestamps come from the head
+and tail of a log, so listing sessions or finding the latest one costs one
+directory scan plus work proportional to the changed files.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+
+from scripts.session_parser import log_time_range
+
+
+def claude_projects_dir():
+    """Claude's projects dir, honouring CLAUDE_CONFIG_DIR like the CLI."""
+    config_dir = os.environ.get('CLAUDE_CONFIG_DIR') or os.path.join(os.path.expanduser('~'), '.claude')
+    return Path(config_dir) / 'projects'
+
+
+def encode_project_path(path):
+    """
+    Encode a project path the way the Claude CLI names its project dirs.
+
+    Every character other than a letter or digit becomes '-', e.g.
+    C:\\NEOGOV\\AIPM -> C--NEOGOV-AIPM, /home/me/app -> -home-me-app.
+    """
+    return re.sub(r'[^A-Za-z0-9]', '-', os.path.abspath(str(path)))
+
+
+def project_log_dir(project_path, projects_dir=None):
+    """
+    Find the Claude log directory of a project.
+
+    Args:
+        project_path: Project root Claude was run in
+        projects_dir: Claude projects directory (default: claude_projects_dir())
+
+    Returns:
+        Path of the log directory, or None if Claude never ran there
+    """
+    projects_dir = Path(projects_dir) if projects_dir else claude_projects_dir()
+    encoded = encode_project_path(project_path)
+    log_dir = projects_dir / encoded
+    if log_dir.is_dir():
+        return log_dir
+
+    # Drive letters and folder names are case-insensitive on Windows, so the
+    # CLI may have logged under a differently-cased path
+    try:
+        for entry in os.scandir(projects_dir):
+            if entry.is_dir() and entry.name.lower() == encoded.lower():
+                return Path(entry.path)
+    except OSError:
+        pass
+    return None
+
+
+def expected_log_dir(project_path, projects_dir=None):
+    """
+    Log directory of a project, or where the CLI will create it.
+
+    Useful before the first session of a project has been logged.
+    """
+    projects_dir = Path(projects_dir) if projects_dir else claude_projects_dir()
+    return project_log_dir(project_path, projects_dir) or projects_dir / encode_project_path(project_path)
+
+
+class SessionIndex:
+    """
+    Cached metadata of the session logs in one Claude project directory.
+
+    Stored as JSON (default `.conductor/session-index.json` in the
+    project) and written atomically.
+    """
+
+    VERSION = 1
+
+    def __init__(self, index_path, log_dir):
+        """
+        Initialize SessionIndex.
+
+        Args:
+            index_path: Path to the JSON index file (created on save)
+            log_dir: Claude project directory holding the session logs
+        """
+        self.index_path = str(index_path)
+        self.log_dir = Path(log_dir) if log_dir else None
+        self.files = {}
+        self.refreshed = 0
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.VERSION and data.get('logDir') == str(self.log_dir):
+                self.files = data.get('files', {})
+        except (OSError, ValueError):
+            # Missing or unreadable index - start empty
+            self.files = {}
+
+    def save(self):
+        """Write the index atomically (temp file + rename)."""
+        os.makedirs(os.path.dirname(self.index_path) or '.', exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.VERSION, 'logDir': str(self.log_dir), 'files': self.files}, f)
+        os.replace(tmp_path, self.index_path)
+
+    def refresh(self):
+        """
+        Bring the index up to date with the log directory.
+
+        Only logs whose size, mtime or inode changed are opened. Subagent
+        logs (agent-*.jsonl) are not sessions and are left out.
+
+        Returns:
+            Number of logs whose metadata was re-read
+        """
+        self.refreshed = 0
+        if not self.log_dir or not self.log_dir.is_dir():
+            if self.files:
+                self.files = {}
+                self.save()
+            return 0
+
+        seen = {}
+        changed = False
+        for entry in os.scandir(self.log_dir):
+            if not entry.name.endswith('.jsonl') or entry.name.startswith('agent-') or not entry.is_file():
+                continue
+            st = entry.stat()
+            cached = self.files.get(entry.name)
+            if (cached and cached['size'] == st.st_size and cached['mtime_ns'] == st.st_mtime_ns and
+                    cached['inode'] == st.st_ino):
+                seen[entry.name] = cached
+                continue
+
+            start, end = log_time_range(entry.path)
+            seen[entry.name] = {
+                'size': st.st_size,
+                'mtime_ns': st.st_mtime_ns,
+                'inode': st.st_ino,
+                'start': start,
+                'end': end,
+            }
+            self.refreshed += 1
+            changed = True
+
+        if changed or len(seen) != len(self.files):
+            self.files = seen
+            self.save()
+        return self.refreshed
+
+    def _session(self, name, meta):
+        return {
+            'id': name[:-len('.jsonl')],
+            'file': self.log_dir / name,
+            'start': meta['start'],
+            'end': meta['end'],
+            'size': meta['size'],
+            'mtime': meta['mtime_ns'] / 1e9,
+        }
+
+    def sessions(self):
+        """Indexed sessions, newest start time first."""
+        sessions = [self._session(name, meta) for name, meta in self.files.items()]
+        sessions.sort(key=lambda s: s['start'] or '', reverse=True)
+        return sessions
+
+    def latest(self):
+        """The most recently written session, or None."""
+        if not self.files:
+            return None
+        name = max(self.files, key=lambda n: self.files[n]['mtime_ns'])
+        return self._session(name, self.files[name])
+
+    def find(self, session_id):
+        """Session by id or id prefix (newest match), or None."""
+        for session in self.sessions():
+            if session['id'] == session_id or session['id'].startswith(session_id):
+                return session
+        return None
+
+
+def open_session_index(project_path, projects_dir=None):
+    """
+    Open and refresh the session index of a project.
+
+    Args:
+        project_path: Project root Claude was run in
+        projects_dir: Claude projects directory (default: claude_projects_dir())
+
+    Returns:
+        Up-to-date SessionIndex (empty when Claude never ran in the project)
+    """
+    project_path = Path(project_path).resolve()
+    index = SessionIndex(project_path / '.conductor' / 'session-index.json',
+                         project_log_dir(project_path, projects_dir))
+    index.refresh()
+    return index
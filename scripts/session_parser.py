@@ -0,0 +1,865 @@
+"""
+Streaming Session-Log Parser for Simple Claude Conductor
+
+Aggregates token usage from Claude Code JSONL session logs one line at a
+time, so memory stays flat regardless of log size. Several logs (main
+session plus subagents) are parsed concurrently across a process pool and
+their partial aggregates merged.
+
+Uses orjson for decoding when it is installed, the standard json module
+otherwise.
+
+Parse modes:
+    full   - decode every line
+    scan   - memory-map the log and only decode lines that can carry usage,
+             a model or a prompt; other lines (mostly huge tool results) are
+             skipped by byte-pattern search, and only the timestamp of the
+             last skipped line is ever looked up
+    verify - run both and warn if the scan result differs from full decoding
+
+Claude logs one entry per streamed content block, each repeating the usage
+of the whole message, and retries can log a message again. Usage is
+counted once per message id / request id pair, tracked in a compact
+seen-set (exact 64-bit hashes, or a fixed-size Bloom filter for huge logs).
+
+Context attribution: a tool result stays in the context of every later
+turn. Its size in tokens is measured at the next turn as the growth of the
+context (input plus cache tokens) over the previous turn, split across the
+results since then by their size in the log, and booked against the tool
+and the file the call named. Scan mode finds tool results by byte search
+without decoding them.
+"""
+
+import base64
+import copy
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import orjson
+    _loads = orjson.loads
+    JSON_DECODER = 'orjson'
+except ImportError:
+    _loads = json.loads
+    JSON_DECODER = 'json'
+
+# Fields that add up when partial aggregates are merged
+SUM_FIELDS = ('input_tokens', 'output_tokens', 'cache_read', 'cache_write', 'messages', 'bytes', 'lines')
+
+# Below this much log data a process pool costs more than it saves
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+
+PARSE_MODES = ('full', 'scan', 'verify')
+DEFAULT_PARSE_MODE = 'scan'
+
+# Message de-duplication: 'exact' hash set, 'bloom' filter or 'off'
+DEDUP_MODES = ('exact', 'bloom', 'off')
+DEFAULT_DEDUP = 'exact'
+
+# Byte patterns that make a line worth decoding in scan mode. Keys inside
+# JSON string values are escaped (\"usage\"), so they never match.
+# Tool results announce themselves near the start of the line; anything
+# shorter than SMALL_LINE is cheaper to decode than to search.
+HEAD_WINDOW = 2048
+SMALL_LINE = 16 * 1024
+_USAGE = b'"usage"'
+_MODEL = b'"model"'
+_USER = b'"user"'
+_TOOL_RESULT = b'"tool_result"'
+_TIMESTAMP_KEY = b'"timestamp"'
+_TIMESTAMP = re.compile(rb'"timestamp"\s*:\s*"([^"]*)"')
+_TOOL_USE_ID_KEY = b'"tool_use_id"'
+_TOOL_USE_ID = re.compile(rb'"tool_use_id"\s*:\s*"([^"]*)"')
+
+# Largest individual tool results kept per log
+TOP_RESULTS = 25
+
+# Token estimate for a result when the context did not grow (e.g. after
+# compaction)
+BYTES_PER_TOKEN = 4
+
+# Tool inputs naming the file a call reads or writes
+FILE_INPUT_KEYS = ('file_path', 'notebook_path', 'path')
+
+# Tools that spawn a subagent
+SPAWN_TOOLS = ('Task', 'Agent')
+
+# The agent a spawn result names: toolUseResult.agentId, or the
+# "agentId: <id>" line the CLI appends to the result text
+_AGENT_ID = re.compile(rb'"agentId"\s*:\s*"([\w-]+)"|agentId: ([\w-]+)')
+
+# Entries the CLI writes when it compacts the conversation
+_COMPACTION = (b'"compact_boundary"', b'"isCompactSummary"')
+
+
+class MessageSeenSet:
+    """
+    Exact set of message keys, stored as 64-bit hashes.
+
+    Serialises to a compact packed form so it can be checkpointed with the
+    aggregate of an incrementally parsed log.
+    """
+
+    mode = 'exact'
+
+    def __init__(self, hashes=()):
+        self._hashes = set(hashes)
+
+    @staticmethod
+    def _hash(key):
+        return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+    def add(self, key):
+        """Add a key; returns True if it was already present."""
+        h = self._hash(key)
+        if h in self._hashes:
+            return True
+        self._hashes.add(h)
+        return False
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def to_state(self):
+        packed = struct.pack(f'<{len(self._hashes)}Q', *sorted(self._hashes))
+        return {'mode': self.mode, 'hashes': base64.b64encode(packed).decode('ascii')}
+
+    @classmethod
+    def from_state(cls, state):
+        packed = base64.b64decode(state['hashes'])
+        return cls(struct.unpack(f'<{len(packed) // 8}Q', packed))
+
+
+class MessageBloomFilter:
+    """
+    Fixed-size Bloom filter of message keys.
+
+    Memory stays constant however long the log grows; a false positive
+    (probability error_rate at capacity) drops one message's usage.
+    """
+
+    mode = 'bloom'
+
+    def __init__(self, capacity=1_000_000, error_rate=1e-6, bits=None, hashes=None, count=0):
+        if bits is None:
+            size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+            bits = bytearray((size + 7) // 8)
+            hashes = max(1, round(size / capacity * math.log(2)))
+        self._bits = bits
+        self._size = len(bits) * 8
+        self._k = hashes
+        self._count = count
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self._size for i in range(self._k)]
+
+    def add(self, key):
+        """Add a key; returns True if it was (probably) already present."""
+        present = True
+        for pos in self._positions(key):
+            byte, bit = divmod(pos, 8)
+            if not self._bits[byte] & (1 << bit):
+                present = False
+                self._bits[byte] |= 1 << bit
+        if not present:
+            self._count += 1
+        return present
+
+    def __len__(self):
+        return self._count
+
+    def to_state(self):
+        return {'mode': self.mode, 'k': self._k, 'count': self._count,
+                'bits': base64.b64encode(bytes(self._bits)).decode('ascii')}
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(bits=bytearray(base64.b64decode(state['bits'])), hashes=state['k'], count=state['count'])
+
+
+DEDUP_SETS = {cls.mode: cls for cls in (MessageSeenSet, MessageBloomFilter)}
+
+
+def new_seen_set(dedup=DEFAULT_DEDUP, state=None):
+    """
+    Create a message seen-set for a de-duplication mode.
+
+    Args:
+        dedup: 'exact', 'bloom' or 'off'
+        state: Serialised set to continue (from to_state())
+
+    Returns:
+        Seen-set, or None when de-duplication is off
+    """
+    if dedup not in DEDUP_MODES:
+        raise ValueError(f"Invalid dedup mode: {dedup}. Must be one of {DEDUP_MODES}")
+    if dedup == 'off':
+        return None
+    if state:
+        return DEDUP_SETS[dedup].from_state(state)
+    return DEDUP_SETS[dedup]()
+
+
+def message_key(entry):
+    """De-duplication key of an entry (message id and request id), or None."""
+    message = entry.get('message')
+    if not isinstance(message, dict) or not message.get('id'):
+        return None
+    return f"{message['id']}:{entry.get('requestId') or ''}"
+
+
+def new_stats():
+    """Create an empty usage aggregate."""
+    return {
+        'input_tokens': 0,
+        'output_tokens': 0,
+        'cache_read': 0,
+        'cache_write': 0,
+        'model': 'unknown',
+        'messages': 0,
+        'start_time': None,
+        'end_time': None,
+        'runs': [],
+        'bytes': 0,
+        'lines': 0,
+        'offset': 0,
+        'seen': None,
+        # Context attribution (see add_tool_calls / add_tool_results)
+        'context': 0,
+        'tools': {},
+        'files': {},
+        'top_results': [],
+        'pending_calls': {},
+        'pending_results': [],
+        # Subagent spawns: tool_use id, agent id, call and result times
+        'agent_id': None,
+        'spawns': []
+    }
+
+
+def _tool_row():
+    # weighted: sum of tokens x turn index, so the tokens carried to the
+    # end of the log are tokens x turns - weighted
+    return {'calls': 0, 'results': 0, 'bytes': 0, 'tokens': 0, 'weighted': 0}
+
+
+def add_tool_calls(stats, message, timestamp=None):
+    """Remember the tool calls of an assistant message until their results arrive."""
+    content = message.get('content')
+    if not isinstance(content, list):
+        return
+    for block in content:
+        if not isinstance(block, dict) or block.get('type') != 'tool_use' or not block.get('id'):
+            continue
+        if block['id'] in stats['pending_calls']:
+            continue
+        name = block.get('name') or 'unknown'
+        tool_input = block.get('input') if isinstance(block.get('input'), dict) else {}
+        path = next((tool_input[k] for k in FILE_INPUT_KEYS if isinstance(tool_input.get(k), str)), None)
+        stats['pending_calls'][block['id']] = [name, path, timestamp or None]
+        stats['tools'].setdefault(name, _tool_row())['calls'] += 1
+        if path:
+            stats['files'].setdefault(path, _tool_row())['calls'] += 1
+
+
+def add_tool_results(stats, tool_use_ids, buf, start, end):
+    """
+    Queue the results on one log line, buf[start:end], for attribution at
+    the next turn.
+
+    The line's size is split evenly when it answers several calls. The
+    result of a spawn tool is searched (as raw bytes, so both parse modes
+    agree) for the id of the agent it started.
+    """
+    if not tool_use_ids:
+        return
+    share = (end - start) // len(tool_use_ids)
+    for tool_use_id in tool_use_ids:
+        name, path, called = stats['pending_calls'].pop(tool_use_id, ('unknown', None, None))
+        stats['pending_results'].append([name, path, tool_use_id, share])
+        if name in SPAWN_TOOLS:
+            stats['spawns'].append({'id': tool_use_id, 'agent': _find_spawned_agent(buf, start, end, stats),
+                                    'start': called, 'end': _find_timestamp(buf, start, end)})
+
+
+def _find_spawned_agent(buf, start, end, stats):
+    """Id of the agent a spawn result names, other than the logging agent itself."""
+    found = None
+    for match in _AGENT_ID.finditer(buf, start, end):
+        agent_id = (match.group(1) or match.group(2)).decode('utf-8', 'replace')
+        if agent_id != stats['agent_id']:
+            found = agent_id
+    return found
+
+
+def _attribute_context(stats, usage, timestamp):
+    """Book the context growth of a new turn against the results queued before it."""
+    context = (usage.get('input_tokens', 0) + usage.get('cache_read_input_tokens', 0) +
+               usage.get('cache_creation_input_tokens', 0))
+    pending = stats['pending_results']
+    if pending:
+        growth = context - stats['context']
+        total_size = sum(r[3] for r in pending) or 1
+        turn = stats['messages']
+        top = stats['top_results']
+        for name, path, tool_use_id, size in pending:
+            tokens = growth * size // total_size if growth > 0 else size // BYTES_PER_TOKEN
+            for key, table in ((name, stats['tools']), (path, stats['files'])):
+                if key is None:
+                    continue
+                row = table.setdefault(key, _tool_row())
+                row['results'] += 1
+                row['bytes'] += size
+                row['tokens'] += tokens
+                row['weighted'] += tokens * turn
+            top.append({'tool': name, 'file': path, 'id': tool_use_id, 'bytes': size, 'tokens': tokens,
+                        'turn': turn, 'timestamp': timestamp or None})
+        if len(top) > 2 * TOP_RESULTS:
+            top.sort(key=lambda r: r['tokens'], reverse=True)
+            del top[TOP_RESULTS:]
+        pending.clear()
+    stats['context'] = context + usage.get('output_tokens', 0)
+
+
+def is_prompt_entry(entry):
+    """
+    Check if a log entry is a user prompt that starts a new run.
+
+    Tool results are also logged as 'user' entries, so only plain-text
+    content from the main thread counts. A resumed session (`claude --resume`)
+    appends each follow-up run to the same log, starting with its prompt.
+    """
+    if entry.get('type') != 'user' or entry.get('isSidechain'):
+        return False
+    content = entry.get('message', {}).get('content')
+    if isinstance(content, str):
+        return True
+    if isinstance(content, list):
+        return not any(isinstance(c, dict) and c.get('type') == 'tool_result' for c in content)
+    return False
+
+
+def add_entry(stats, entry, seen=None):
+    """
+    Fold one decoded log entry into an aggregate.
+
+    With a seen-set, a repeated message (same id and request id) only
+    moves the time range; its usage was already counted.
+    """
+    message = entry.get('message')
+    if not isinstance(message, dict):
+        message = {}
+    usage = message.get('usage') or {}
+    model = message.get('model', '')
+    timestamp = entry.get('timestamp', '')
+
+    if model:
+        stats['model'] = model
+    if timestamp:
+        if not stats['start_time']:
+            stats['start_time'] = timestamp
+        stats['end_time'] = timestamp
+
+    if entry.get('agentId') and not stats['agent_id']:
+        stats['agent_id'] = entry['agentId']
+    add_tool_calls(stats, message, timestamp)
+
+    if seen is not None and (usage or entry.get('type') == 'assistant'):
+        key = message_key(entry)
+        if key and seen.add(key):
+            return
+
+    if usage:
+        _attribute_context(stats, usage, timestamp)
+
+    stats['input_tokens'] += usage.get('input_tokens', 0)
+    stats['output_tokens'] += usage.get('output_tokens', 0)
+    stats['cache_read'] += usage.get('cache_read_input_tokens', 0)
+    stats['cache_write'] += usage.get('cache_creation_input_tokens', 0)
+
+    # Track per-run input so session reuse can be measured
+    runs = stats['runs']
+    if is_prompt_entry(entry) or (not runs and usage):
+        runs.append({'start_time': timestamp or None, 'input_tokens': 0, 'cache_read': 0, 'cache_write': 0})
+    if usage:
+        run = runs[-1]
+        run['input_tokens'] += usage.get('input_tokens', 0)
+        run['cache_read'] += usage.get('cache_read_input_tokens', 0)
+        run['cache_write'] += usage.get('cache_creation_input_tokens', 0)
+
+    if entry.get('type') == 'assistant':
+        stats['messages'] += 1
+
+
+def add_line(stats, line, seen=None):
+    """
+    Decode one raw JSONL line (bytes) and fold it into an aggregate.
+
+    Returns:
+        The decoded entry, or None if the line is not a JSON object
+    """
+    stats['bytes'] += len(line)
+    stats['lines'] += 1
+    try:
+        entry = _loads(line)
+    except ValueError:
+        # json.JSONDecodeError and orjson.JSONDecodeError are both ValueErrors
+        return
+    if isinstance(entry, dict):
+        add_entry(stats, entry, seen)
+        content = entry.get('message', {}).get('content') if isinstance(entry.get('message'), dict) else None
+        if isinstance(content, list):
+            add_tool_results(stats, [c['tool_use_id'] for c in content if isinstance(c, dict) and
+                                     c.get('type') == 'tool_result' and c.get('tool_use_id')], line, 0, len(line))
+        return entry
+    return None
+
+
+def merge_stats(into, other):
+    """
+    Merge a partial aggregate into another.
+
+    Token counts add up, the time range widens, and the model of the
+    aggregate being merged in wins when it is known. Per-run breakdowns
+    belong to a single log and are not merged.
+
+    Returns:
+        The updated `into` aggregate
+    """
+    for field in SUM_FIELDS:
+        into[field] += other.get(field, 0)
+    if other.get('model', 'unknown') != 'unknown':
+        into['model'] = other['model']
+    if other.get('start_time') and (not into['start_time'] or other['start_time'] < into['start_time']):
+        into['start_time'] = other['start_time']
+    if other.get('end_time') and (not into['end_time'] or other['end_time'] > into['end_time']):
+        into['end_time'] = other['end_time']
+    return into
+
+
+def _is_complete(line):
+    """
+    Check whether a line without a trailing newline is a finished record.
+
+    Logs are append-only, so an unterminated last line is usually still
+    being written and must be left for the next pass.
+    """
+    try:
+        _loads(line)
+        return True
+    except ValueError:
+        return False
+
+
+def _parse_full(filepath, offset, stats, seen):
+    """Decode every line from offset on; returns the new offset."""
+    with open(filepath, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b'\n') and not _is_complete(line):
+                break
+            add_line(stats, line, seen)
+            offset += len(line)
+    return offset
+
+
+def _is_tool_result(mm, start, end):
+    """Check whether the line mm[start:end] is a tool result."""
+    return mm.find(_TOOL_RESULT, start, min(end, start + HEAD_WINDOW)) >= 0
+
+
+def _find_tool_use_ids(mm, start, end):
+    """
+    Ids of the calls a tool-result line answers, by byte search.
+
+    The CLI logs one result per line, so only the head of a large line is
+    searched rather than the whole tool output.
+    """
+    ids = []
+    search_end = end if end - start <= SMALL_LINE else start + HEAD_WINDOW
+    pos = mm.find(_TOOL_USE_ID_KEY, start, search_end)
+    while pos >= 0:
+        match = _TOOL_USE_ID.match(mm[pos:min(end, pos + 256)])
+        if match:
+            ids.append(match.group(1).decode('utf-8', 'replace'))
+        pos = mm.find(_TOOL_USE_ID_KEY, pos + len(_TOOL_USE_ID_KEY), search_end)
+    return ids
+
+
+def _is_candidate(mm, start, end):
+    """Check whether a line that is not a tool result may carry usage, a model or a prompt."""
+    if end - start <= SMALL_LINE:
+        return True
+    return (mm.find(_USAGE, start, end) >= 0 or mm.find(_MODEL, start, end) >= 0 or
+            mm.find(_USER, start, end) >= 0)
+
+
+def _find_timestamp(mm, start, end):
+    """Extract the top-level timestamp of a line by byte search."""
+    pos = mm.rfind(_TIMESTAMP_KEY, start, end)
+    if pos < 0:
+        return None
+    match = _TIMESTAMP.match(mm[pos:min(end, pos + 128)])
+    if match and match.group(1):
+        return match.group(1).decode('utf-8', 'replace')
+    return None
+
+
+def _parse_scan(filepath, offset, stats, seen):
+    """Memory-map the log and prefilter lines by byte pattern; returns the new offset."""
+    with open(filepath, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= offset:
+            return offset
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Skipped lines since the last timestamped entry; only the last
+            # of them can still move end_time
+            skipped = []
+            while offset < size:
+                newline = mm.find(b'\n', offset)
+                if newline < 0:
+                    if not _is_complete(mm[offset:size]):
+                        break
+                    end = size
+                else:
+                    end = newline + 1
+
+                tool_result = _is_tool_result(mm, offset, end)
+                if not tool_result and _is_candidate(mm, offset, end):
+                    entry = add_line(stats, mm[offset:end], seen)
+                    if entry and entry.get('timestamp'):
+                        skipped.clear()
+                else:
+                    if tool_result:
+                        add_tool_results(stats, _find_tool_use_ids(mm, offset, end), mm, offset, end)
+                    stats['bytes'] += end - offset
+                    stats['lines'] += 1
+                    if stats['start_time']:
+                        skipped.append((offset, end))
+                    else:
+                        timestamp = _find_timestamp(mm, offset, end)
+                        if timestamp:
+                            stats['start_time'] = stats['end_time'] = timestamp
+                offset = end
+
+            for start, end in reversed(skipped):
+                timestamp = _find_timestamp(mm, start, end)
+                if timestamp:
+                    stats['end_time'] = timestamp
+                    break
+    return offset
+
+
+def _differences(a, b):
+    """Fields where two aggregates disagree."""
+    return sorted(k for k in set(a) | set(b) if a.get(k) != b.get(k))
+
+
+def parse_file(filepath, offset=0, stats=None, mode=DEFAULT_PARSE_MODE, dedup=DEFAULT_DEDUP):
+    """
+    Parse one session log into a usage aggregate.
+
+    Only the current line (full mode) or the candidate lines (scan mode)
+    are copied into memory. A missing file yields an empty aggregate.
+
+    Args:
+        filepath: Log file path
+        offset: Byte offset to resume from (start of a line)
+        stats: Aggregate of the bytes before offset to continue
+        mode: 'full', 'scan' or 'verify' (see module docstring)
+        dedup: Message de-duplication: 'exact', 'bloom' or 'off'
+
+    Returns:
+        Aggregate whose 'offset' is the byte position after the last
+        complete line consumed, and whose 'seen' is the serialised
+        message seen-set
+    """
+    if mode not in PARSE_MODES:
+        raise ValueError(f"Invalid parse mode: {mode}. Must be one of {PARSE_MODES}")
+
+    stats = stats if stats is not None else new_stats()
+    if offset and (stats.get('seen') or {}).get('mode', 'off') != dedup:
+        # Counted under another de-duplication mode - start over
+        stats, offset = new_stats(), 0
+    seen = new_seen_set(dedup, stats.get('seen'))
+
+    start_offset = offset
+    baseline = copy.deepcopy(stats) if mode == 'verify' else None
+    try:
+        if mode == 'full':
+            offset = _parse_full(filepath, offset, stats, seen)
+        else:
+            offset = _parse_scan(filepath, offset, stats, seen)
+    except FileNotFoundError:
+        pass
+    stats['offset'] = offset
+    stats['seen'] = seen.to_state() if seen is not None else None
+
+    if mode == 'verify':
+        full = parse_file(filepath, start_offset, baseline, mode='full', dedup=dedup)
+        mismatched = _differences(stats, full)
+        if mismatched:
+            warnings.warn(f"Scan mode disagrees with full decoding for {filepath}: {mismatched}")
+        return full
+    return stats
+
+
+def usage_record(entry):
+    """
+    Reduce a decoded log entry to its usage record.
+
+    Returns:
+        Dict with timestamp, model, message/request/session ids, cwd and
+        token counts, or None if the entry carries no usage
+    """
+    message = entry.get('message')
+    if not isinstance(message, dict) or not message.get('usage'):
+        return None
+    usage = message['usage']
+    return {
+        'timestamp': entry.get('timestamp'),
+        'model': message.get('model') or 'unknown',
+        'message_id': message.get('id'),
+        'request_id': entry.get('requestId'),
+        'session_id': entry.get('sessionId'),
+        'cwd': entry.get('cwd'),
+        'input_tokens': usage.get('input_tokens', 0),
+        'output_tokens': usage.get('output_tokens', 0),
+        'cache_read': usage.get('cache_read_input_tokens', 0),
+        'cache_write': usage.get('cache_creation_input_tokens', 0)
+    }
+
+
+def read_usage(filepath, offset=0, seen=None):
+    """
+    Read the usage records of a log from a byte offset.
+
+    Lines that cannot carry usage (tool results, lines without a "usage"
+    key) are skipped by byte-pattern search without being decoded. With a
+    seen-set (see new_seen_set), repeated messages are dropped.
+
+    Returns:
+        Tuple of (list of usage records, offset after the last complete line)
+    """
+    records = []
+    try:
+        with open(filepath, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size <= offset:
+                return records, offset
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                while offset < size:
+                    newline = mm.find(b'\n', offset)
+                    if newline < 0:
+                        if not _is_complete(mm[offset:size]):
+                            break
+                        end = size
+                    else:
+                        end = newline + 1
+
+                    if (mm.find(_TOOL_RESULT, offset, min(end, offset + HEAD_WINDOW)) < 0 and
+                            mm.find(_USAGE, offset, end) >= 0):
+                        try:
+                            entry = _loads(mm[offset:end])
+                        except ValueError:
+                            entry = None
+                        record = usage_record(entry) if isinstance(entry, dict) else None
+                        if record:
+                            key = message_key(entry) if seen is not None else None
+                            if not (key and seen.add(key)):
+                                records.append(record)
+                    offset = end
+    except FileNotFoundError:
+        pass
+    return records, offset
+
+
+def read_turns(filepath):
+    """
+    Read a log turn by turn for cache timeline analysis.
+
+    Like read_usage, only lines that can carry usage are decoded; the
+    lines of a message logged several times make one turn.
+
+    Returns:
+        List of turns: timestamp, model, token counts, spawned (subagents
+        started by the turn's tool calls) and compacted (the conversation
+        was compacted since the previous turn)
+    """
+    turns = []
+    seen = new_seen_set('exact')
+    last_key = None
+    compacted = False
+    try:
+        with open(filepath, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                return turns
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                offset = 0
+                while offset < size:
+                    newline = mm.find(b'\n', offset)
+                    end = newline + 1 if newline >= 0 else size
+                    line_start, offset = offset, end
+                    if mm.find(_TOOL_RESULT, line_start, min(end, line_start + HEAD_WINDOW)) >= 0:
+                        continue
+                    if mm.find(_USAGE, line_start, end) < 0:
+                        if any(mm.find(marker, line_start, end) >= 0 for marker in _COMPACTION):
+                            compacted = True
+                        continue
+                    try:
+                        entry = _loads(mm[line_start:end])
+                    except ValueError:
+                        continue
+                    record = usage_record(entry) if isinstance(entry, dict) else None
+                    if not record:
+                        continue
+
+                    content = entry['message'].get('content')
+                    spawned = sum(1 for c in content if isinstance(c, dict) and c.get('type') == 'tool_use' and
+                                  c.get('name') in SPAWN_TOOLS) if isinstance(content, list) else 0
+                    key = message_key(entry)
+                    if key and seen.add(key):
+                        if key == last_key:
+                            turns[-1]['spawned'] += spawned
+                        continue
+                    last_key = key
+                    turns.append({
+                        'timestamp': record['timestamp'],
+                        'model': record['model'],
+                        'input_tokens': record['input_tokens'],
+                        'output_tokens': record['output_tokens'],
+                        'cache_read': record['cache_read'],
+                        'cache_write': record['cache_write'],
+                        'spawned': spawned,
+                        'compacted': compacted
+                    })
+                    compacted = False
+    except FileNotFoundError:
+        pass
+    return turns
+
+
+def log_time_range(filepath, window=64 * 1024):
+    """
+    First and last timestamp of a log, read from its head and tail only.
+
+    The search window doubles until a timestamp is found, so a huge first
+    or last line costs at most a few reads.
+
+    Returns:
+        Tuple of (first timestamp, last timestamp); None for either when
+        the log has none
+    """
+    first = last = None
+    try:
+        with open(filepath, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            length = window
+            while first is None:
+                f.seek(0)
+                match = _TIMESTAMP.search(f.read(length))
+                if match:
+                    first = match.group(1).decode('utf-8', 'replace')
+                elif length >= size:
+                    return None, None
+                length *= 2
+
+            length = window
+            while last is None:
+                start = max(0, size - length)
+                f.seek(start)
+                matches = _TIMESTAMP.findall(f.read(size - start))
+                if matches:
+                    last = matches[-1].decode('utf-8', 'replace')
+                length *= 2
+    except FileNotFoundError:
+        return None, None
+    return first, last
+
+
+def _parse_job(job):
+    """Process-pool entry point: job is (filepath, offset, stats, mode, dedup)."""
+    return parse_file(*job)
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def parse_files(paths, workers=None, resume=None, mode=DEFAULT_PARSE_MODE, progress=None, dedup=DEFAULT_DEDUP):
+    """
+    Parse several session logs concurrently.
+
+    Small inputs are parsed in-process; otherwise files are spread across a
+    process pool, largest first so one big log does not finish last.
+
+    Args:
+        paths: Log file paths
+        workers: Process count (default: one per CPU, capped at file count)
+        resume: Optional list parallel to paths of (offset, stats)
+            checkpoints to continue from, or None to parse from the start
+        mode: Parse mode for every file ('full', 'scan' or 'verify')
+        progress: Optional callback(files_done, files_total)
+        dedup: Message de-duplication for every file ('exact', 'bloom' or 'off')
+
+    Returns:
+        Tuple of (aggregates in the same order as paths, throughput dict
+        with files, bytes, seconds, mb_per_s, workers, decoder, mode and
+        dedup).
+        Throughput only counts bytes read in this call.
+    """
+    paths = list(paths)
+    started = time.perf_counter()
+
+    resume = resume or [None] * len(paths)
+    jobs = [(p, *(checkpoint or (0, None)), mode, dedup) for p, checkpoint in zip(paths, resume)]
+    pending = [max(0, _file_size(job[0]) - job[1]) for job in jobs]
+    if workers is None:
+        workers = min(len(paths), os.cpu_count() or 1)
+    if sum(pending) < PARALLEL_MIN_BYTES:
+        workers = 1
+
+    results = [None] * len(jobs)
+    if workers <= 1 or len(paths) <= 1:
+        workers = 1
+        for i, job in enumerate(jobs):
+            results[i] = _parse_job(job)
+            if progress:
+                progress(i + 1, len(jobs))
+    else:
+        order = sorted(range(len(jobs)), key=lambda i: pending[i], reverse=True)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = pool.map(_parse_job, [jobs[i] for i in order])
+            for done, (i, stats) in enumerate(zip(order, parsed), 1):
+                results[i] = stats
+                if progress:
+                    progress(done, len(jobs))
+
+    seconds = time.perf_counter() - started
+    total_bytes = sum(r['offset'] - job[1] for r, job in zip(results, jobs))
+    throughput = {
+        'files': len(paths),
+        'bytes': total_bytes,
+        'seconds': seconds,
+        'mb_per_s': (total_bytes / 1_000_000 / seconds) if seconds > 0 else 0,
+        'workers': workers,
+        'decoder': JSON_DECODER,
+        'mode': mode,
+        'dedup': dedup
+    }
+    return results, throughput
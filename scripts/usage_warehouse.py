@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+"""
+Usage Warehouse for Simple Claude Conductor
+
+Loads the usage records of every Claude Code session log under
+~/.claude/projects (or $CLAUDE_CONFIG_DIR/projects) into a SQLite database,
+so listing sessions and aggregating cost across thousands of them is a query
+instead of a rescan of gigabytes of logs.
+
+Ingest is incremental: each log's byte offset and identity are checkpointed
+like the cost index, so a run only reads what was appended since the last
+one. Rows outlive their logs, so history accumulates across archived and
+cleaned-up projects. A message the CLI logged more than once (one line per
+streamed content block) is stored once per log: rows are unique on
+(file, message id, request id).
+
+Usage:
+    python scripts/usage_warehouse.py ingest
+    python scripts/usage_warehouse.py sessions --limit 20
+    python scripts/usage_warehouse.py daily --since 2026-01-01
+    python scripts/usage_warehouse.py models
+    python scripts/usage_warehouse.py projects
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+if __package__ in (None, ''):
+    # Run as a file: make the scripts package importable, so siblings load
+    # as scripts.<name> here too, never as top-level modules
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.session_parser import PARALLEL_MIN_BYTES, new_seen_set, read_usage
+from scripts.cost_index import HEAD_BYTES, head_checksum
+from scripts.pricing import row_costs
+from scripts.session_discovery import claude_projects_dir
+
+# Default database, next to the other conductor caches
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.conductor', 'usage.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    project_dir TEXT NOT NULL,
+    session_id TEXT,
+    agent_id TEXT NOT NULL,
+    device INTEGER,
+    inode INTEGER,
+    size INTEGER NOT NULL DEFAULT 0,
+    offset INTEGER NOT NULL DEFAULT 0,
+    head_length INTEGER NOT NULL DEFAULT 0,
+    head INTEGER,
+    ingested_at TEXT
+);
+CREATE TABLE IF NOT EXISTS usage (
+    id INTEGER PRIMARY KEY,
+    file_path TEXT NOT NULL,
+    session_id TEXT,
+    agent_id TEXT NOT NULL,
+    project TEXT NOT NULL,
+    model TEXT NOT NULL,
+    timestamp TEXT,
+    day TEXT,
+    message_id TEXT,
+    request_id TEXT,
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    cache_read INTEGER NOT NULL DEFAULT 0,
+    cache_write INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_usage_session ON usage (session_id, agent_id);
+CREATE INDEX IF NOT EXISTS idx_usage_session_time ON usage (session_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_usage_day ON usage (day, model);
+CREATE INDEX IF NOT EXISTS idx_usage_model ON usage (model);
+CREATE INDEX IF NOT EXISTS idx_usage_project ON usage (project, day);
+CREATE INDEX IF NOT EXISTS idx_usage_file ON usage (file_path);
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    project TEXT,
+    project_dir TEXT,
+    file_path TEXT,
+    model TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    messages INTEGER NOT NULL DEFAULT 0,
+    agents INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_project ON sessions (project_dir, start_time);
+CREATE INDEX IF NOT EXISTS idx_sessions_start ON sessions (start_time);
+"""
+
+# Bumped (PRAGMA user_version) when existing databases need migrating:
+# 1: one row per message - duplicates removed, unique message index added
+SCHEMA_VERSION = 1
+
+MESSAGE_INDEX = ("CREATE UNIQUE INDEX IF NOT EXISTS idx_usage_message "
+                 "ON usage (file_path, message_id, COALESCE(request_id, '')) WHERE message_id IS NOT NULL")
+
+TOKEN_COLUMNS = ('input_tokens', 'output_tokens', 'cache_read', 'cache_write')
+
+# Aggregation keys accepted by UsageWarehouse.costs()
+GROUP_COLUMNS = {
+    'day': 'day',
+    'model': 'model',
+    'project': 'project',
+    'session': 'session_id',
+}
+
+
+def subagent_id(path, subagent_dir):
+    """
+    Agent id of a subagent log: its path under the session's subagents
+    folder, without '.jsonl' and the leading 'agent-'.
+
+    Nested logs keep their folders in the id, so two that share a file
+    name stay distinct.
+    """
+    agent_id = Path(path).relative_to(subagent_dir).with_suffix('').as_posix()
+    # Not str.removeprefix: Python 3.8 is still supported
+    return agent_id[len('agent-'):] if agent_id.startswith('agent-') else agent_id
+
+
+def classify_log(path, root):
+    """
+    Work out which project, session and agent a log belongs to.
+
+    Layouts:
+        <project>/<session>.jsonl                          main session
+        <project>/<session>/subagents/agent-<id>.jsonl     subagent
+        <project>/<session>/subagents/.../agent-<id>.jsonl nested subagent
+        <project>/agent-<id>.jsonl                         subagent (older CLI)
+
+    Returns:
+        Tuple of (project_dir, session_id or None, agent_id)
+    """
+    parts = Path(path).relative_to(root).parts
+    stem = Path(path).stem
+    if len(parts) == 2:
+        if stem.startswith('agent-'):
+            return parts[0], None, stem[len('agent-'):]
+        return parts[0], stem, 'main'
+    subagent_dir = Path(root, *parts[:3]) if parts[2] == 'subagents' else Path(root, *parts[:2])
+    return parts[0], parts[1], subagent_id(path, subagent_dir)
+
+
+def _read_job(job):
+    """Process-pool entry point: job is (path, offset)."""
+    path, offset = job
+    return read_usage(path, offset, new_seen_set('exact'))
+
+
+class UsageWarehouse:
+    """SQLite store of usage records from all Claude session logs."""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, projects_dir=None):
+        """
+        Initialize UsageWarehouse.
+
+        Args:
+            db_path: SQLite database path (created on first use)
+            projects_dir: Claude projects directory (default: claude_projects_dir())
+        """
+        self.db_path = str(db_path)
+        self.projects_dir = Path(projects_dir) if projects_dir else claude_projects_dir()
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self._migrate(conn)
+        return conn
+
+    def _migrate(self, conn):
+        """Drop rows double-counted by earlier versions and enforce one row per message."""
+        with conn:
+            deleted = conn.execute(
+                "DELETE FROM usage WHERE message_id IS NOT NULL AND id NOT IN ("
+                "SELECT MIN(id) FROM usage WHERE message_id IS NOT NULL "
+                "GROUP BY file_path, message_id, COALESCE(request_id, ''))"
+            ).rowcount
+            conn.execute(MESSAGE_INDEX)
+            if deleted:
+                sessions = conn.execute("SELECT DISTINCT session_id FROM usage WHERE session_id IS NOT NULL")
+                self._refresh_sessions(conn, [row[0] for row in sessions.fetchall()])
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def discover(self, project_dir=None):
+        """
+        List session logs under the projects directory.
+
+        Args:
+            project_dir: Only this project directory (name under projects/)
+        """
+        root = self.projects_dir / project_dir if project_dir else self.projects_dir
+        if not root.is_dir():
+            return []
+        # Subagents of subagents nest further down
+        if project_dir:
+            patterns = ('*.jsonl', '*/subagents/**/*.jsonl')
+        else:
+            patterns = ('*/*.jsonl', '*/*/subagents/**/*.jsonl')
+        return sorted(p for pattern in patterns for p in root.glob(pattern))
+
+    def _checkpoint(self, conn, path, st):
+        """Offset to resume a log from; drops its rows if it was rotated or rewritten."""
+        row = conn.execute("SELECT * FROM files WHERE path = ?", (str(path),)).fetchone()
+        if row is None:
+            return 0
+        if (st.st_ino == row['inode'] and st.st_dev == row['device'] and st.st_size >= row['offset'] and
+                head_checksum(path, row['head_length']) == row['head']):
+            return row['offset']
+        conn.execute("DELETE FROM usage WHERE file_path = ?", (str(path),))
+        return 0
+
+    def ingest(self, paths=None, workers=None, progress=None):
+        """
+        Load new usage records into the warehouse.
+
+        Args:
+            paths: Log files to ingest (default: every log under projects_dir)
+            workers: Reader processes (default: one per CPU)
+            progress: Optional callback(files_done, files_total)
+
+        Returns:
+            Dictionary with files, changed, records and seconds
+        """
+        started = datetime.now()
+        paths = [Path(p) for p in (paths if paths is not None else self.discover())]
+        conn = self._connect()
+        try:
+            jobs = []
+            with conn:
+                for path in paths:
+                    try:
+                        st = path.stat()
+                    except OSError:
+                        continue
+                    offset = self._checkpoint(conn, path, st)
+                    if st.st_size > offset:
+                        jobs.append((path, offset, st))
+
+            pending = sum(st.st_size - offset for _, offset, st in jobs)
+            if workers is None:
+                workers = min(len(jobs), os.cpu_count() or 1)
+            if workers <= 1 or pending < PARALLEL_MIN_BYTES:
+                results = (_read_job((str(p), o)) for p, o, _ in jobs)
+                pool = None
+            else:
+                pool = ProcessPoolExecutor(max_workers=workers)
+                results = pool.map(_read_job, [(str(p), o) for p, o, _ in jobs])
+
+            records_total = 0
+            touched = set()
+            try:
+                for done, ((path, _, st), (records, offset)) in enumerate(zip(jobs, results), 1):
+                    touched.update(self._store(conn, path, st, records, offset))
+                    records_total += len(records)
+                    if progress:
+                        progress(done, len(jobs))
+            finally:
+                if pool:
+                    pool.shutdown()
+
+            with conn:
+                self._refresh_sessions(conn, touched)
+        finally:
+            conn.close()
+
+        return {
+            'files': len(paths),
+            'changed': len(jobs),
+            'records': records_total,
+            'seconds': (datetime.now() - started).total_seconds()
+        }
+
+    def _store(self, conn, path, st, records, offset):
+        """
+        Insert one log's new records and move its checkpoint; returns touched session ids.
+
+        Records of a message already stored for the log are ignored.
+        """
+        project_dir, session_id, agent_id = classify_log(path, self.projects_dir)
+        session_id = session_id or next((r['session_id'] for r in records if r['session_id']), None)
+
+        # A session's project is the working directory Claude ran in
+        project = next((r['cwd'] for r in records if r['cwd']), None)
+        if project is None and session_id:
+            row = conn.execute("SELECT project FROM usage WHERE session_id = ? LIMIT 1", (session_id,)).fetchone()
+            project = row['project'] if row else None
+        project = project or project_dir
+
+        head_length = min(offset, HEAD_BYTES)
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO usage (file_path, session_id, agent_id, project, model, timestamp, day, message_id, "
+                "request_id, input_tokens, output_tokens, cache_read, cache_write) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(str(path), session_id, agent_id, project, r['model'], r['timestamp'],
+                  r['timestamp'][:10] if r['timestamp'] else None, r['message_id'], r['request_id'],
+                  r['input_tokens'], r['output_tokens'], r['cache_read'], r['cache_write'])
+                 for r in records]
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO files (path, project_dir, session_id, agent_id, device, inode, size, "
+                "offset, head_length, head, ingested_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (str(path), project_dir, session_id, agent_id, st.st_dev, st.st_ino, st.st_size, offset,
+                 head_length, head_checksum(path, head_length), datetime.now().isoformat())
+            )
+        return {session_id} if session_id else set()
+
+    def _refresh_sessions(self, conn, session_ids):
+        """Recompute the summary rows of sessions that received records."""
+        for session_id in session_ids:
+            main = conn.execute(
+                "SELECT project_dir, path FROM files WHERE session_id = ? AND agent_id = 'main'", (session_id,)
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, project, project_dir, file_path, model, start_time, "
+                "end_time, messages, agents) "
+                "SELECT session_id, MAX(project), ?, ?, "
+                "(SELECT model FROM usage WHERE session_id = ? AND agent_id = 'main' "
+                " ORDER BY timestamp DESC LIMIT 1), "
+                "MIN(timestamp), MAX(timestamp), SUM(agent_id = 'main'), COUNT(DISTINCT agent_id) "
+                "FROM usage WHERE session_id = ? GROUP BY session_id",
+                (main['project_dir'] if main else None, main['path'] if main else None, session_id, session_id)
+            )
+
+    def _where(self, since=None, until=None, project=None):
+        clauses, params = [], []
+        if since:
+            clauses.append("day >= ?")
+            params.append(since)
+        if until:
+            clauses.append("day <= ?")
+            params.append(until)
+        if project:
+            clauses.append("project = ?")
+            params.append(project)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def costs(self, group_by='day', since=None, until=None, project=None):
+        """
+        Aggregate tokens and estimated cost.
+
+        Args:
+            group_by: 'day', 'model', 'project' or 'session'
+            since: First day to include (YYYY-MM-DD)
+            until: Last day to include (YYYY-MM-DD)
+            project: Only this project (working directory)
+
+        Returns:
+            List of dicts with key, token totals, messages and cost,
+            ordered by key
+        """
+        if group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Invalid grouping: {group_by}. Must be one of {sorted(GROUP_COLUMNS)}")
+        column = GROUP_COLUMNS[group_by]
+        where, params = self._where(since, until, project)
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT {column} AS key, model, day, COUNT(*) AS messages, "
+                f"{', '.join(f'SUM({c}) AS {c}' for c in TOKEN_COLUMNS)} "
+                f"FROM usage{where} GROUP BY {column}, model, day",
+                params
+            ).fetchall()
+        finally:
+            conn.close()
+
+        # Pricing is per model and day, so cost is folded in after grouping by both
+        groups = {}
+        for row, costs in zip(rows, row_costs(rows, 'day')):
+            group = groups.setdefault(row['key'], {'key': row['key'], 'messages': 0, 'cost': 0.0,
+                                                   **{c: 0 for c in TOKEN_COLUMNS}})
+            group['messages'] += row['messages']
+            for c in TOKEN_COLUMNS:
+                group[c] += row[c]
+            group['cost'] += sum(costs)
+
+        result = sorted(groups.values(), key=lambda g: g['key'] or '')
+        for group in result:
+            group['cost'] = round(group['cost'], 4)
+        return result
+
+    def records(self, session_id):
+        """
+        Stream the usage records of a session (all agents) in timestamp order.
+
+        Yields:
+            Dicts with agent_id, model, timestamp and token counts
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                f"SELECT agent_id, model, timestamp, {', '.join(TOKEN_COLUMNS)} FROM usage "
+                f"WHERE session_id = ? AND timestamp IS NOT NULL ORDER BY timestamp",
+                (session_id,)
+            )
+            for row in cursor:
+                yield dict(row)
+        finally:
+            conn.close()
+
+    def sessions(self, project_dir=None, project=None, offset=0, limit=None):
+        """
+        List sessions, newest first.
+
+        Args:
+            project_dir: Only sessions logged under this projects/ directory
+            project: Only sessions run in this working directory
+            offset: Sessions to skip
+            limit: Maximum sessions to return (None for all)
+
+        Returns:
+            Tuple of (list of session dicts with id, project, file, model,
+            start, end, messages, agents and cost; total count)
+        """
+        clauses, params = [], []
+        if project_dir:
+            clauses.append("project_dir = ?")
+            params.append(project_dir)
+        if project:
+            clauses.append("project = ?")
+            params.append(project)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+
+        conn = self._connect()
+        try:
+            total = conn.execute(f"SELECT COUNT(*) FROM sessions{where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT * FROM sessions{where} ORDER BY start_time DESC LIMIT ? OFFSET ?",
+                params + [limit if limit is not None else -1, offset]
+            ).fetchall()
+
+            costs = {}
+            ids = [r['session_id'] for r in rows]
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                groups = conn.execute(
+                    f"SELECT session_id, model, day, {', '.join(f'SUM({c}) AS {c}' for c in TOKEN_COLUMNS)} "
+                    f"FROM usage WHERE session_id IN ({', '.join('?' * len(chunk))}) "
+                    f"GROUP BY session_id, model, day",
+                    chunk
+                ).fetchall()
+                for group, group_costs in zip(groups, row_costs(groups, 'day')):
+                    costs[group['session_id']] = costs.get(group['session_id'], 0) + sum(group_costs)
+        finally:
+            conn.close()
+
+        sessions = [{
+            'id': r['session_id'],
+            'project': r['project'],
+            'projectDir': r['project_dir'],
+            'file': r['file_path'],
+            'model': r['model'],
+            'start': r['start_time'],
+            'end': r['end_time'],
+            'messages': r['messages'],
+            'agents': r['agents'],
+            'cost': round(costs.get(r['session_id'], 0), 4)
+        } for r in rows]
+        return sessions, total
+
+
+def print_costs(rows, label):
+    print(f"{label:<40} {'Messages':>9} {'Input':>12} {'Output':>12} {'Cache Read':>14} {'Cost':>10}")
+    print("-" * 102)
+    for row in rows:
+        print(f"{str(row['key'])[:40]:<40} {row['messages']:>9,} {row['input_tokens']:>12,} "
+              f"{row['output_tokens']:>12,} {row['cache_read']:>14,} {'$' + format(row['cost'], ',.2f'):>10}")
+    print("-" * 102)
+    print(f"{'Total':<40} {sum(r['messages'] for r in rows):>9,} {'':>12} {'':>12} {'':>14} "
+          f"{'$' + format(sum(r['cost'] for r in rows), ',.2f'):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cross-project usage warehouse for Claude sessions')
+    parser.add_argument('command', choices=('ingest', 'sessions', 'daily', 'models', 'projects'))
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='Warehouse database path')
+    parser.add_argument('--projects-dir', help='Claude projects directory (default: ~/.claude/projects)')
+    parser.add_argument('--since', help='First day to include (YYYY-MM-DD)')
+    parser.add_argument('--until', help='Last day to include (YYYY-MM-DD)')
+    parser.add_argument('--project', help='Only this project (working directory)')
+    parser.add_argument('--limit', type=int, default=50, help='Sessions to list')
+    parser.add_argument('--no-ingest', action='store_true', help='Query without ingesting new logs first')
+    parser.add_argument('--workers', '-w', type=int, default=None, help='Reader processes (default: one per CPU)')
+    args = parser.parse_args()
+
+    warehouse = UsageWarehouse(args.db, args.projects_dir)
+    if args.command == 'ingest' or not args.no_ingest:
+        result = warehouse.ingest(workers=args.workers)
+        if args.command == 'ingest':
+            print(f"Ingested {result['records']:,} usage records from {result['changed']} changed "
+                  f"of {result['files']} log(s) in {result['seconds']:.2f}s")
+            return
+
+    if args.command == 'sessions':
+        sessions, total = warehouse.sessions(project=args.project, limit=args.limit)
+        print(f"{'Session ID':<38} {'Start Time':<20} {'Messages':>9} {'Agents':>7} {'Cost':>10}  Project")
+        print("-" * 110)
+        for s in sessions:
+            start = s['start'][:19] if s['start'] else 'N/A'
+            print(f"{s['id']:<38} {start:<20} {s['messages']:>9,} {s['agents']:>7} "
+                  f"{'$' + format(s['cost'], ',.2f'):>10}  {s['project']}")
+        print(f"\n{len(sessions)} of {total} session(s)")
+        return
+
+    group_by, label = {'daily': ('day', 'Day'), 'models': ('model', 'Model'),
+                       'projects': ('project', 'Project')}[args.command]
+    print_costs(warehouse.costs(group_by, since=args.since, until=args.until, project=args.project), label)
+
+
+if __name__ == '__main__':
+    main()
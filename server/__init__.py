@@ -6,6 +6,7 @@ Provides the Flask web server for the conductor UI.
 
 from .state_manager import StateManager, get_state_manager
 from .process_manager import ProcessManager, get_process_manager, TimeoutMonitor
+from .executors import Executor, ClaudeCLIExecutor, SimulatorExecutor, create_executor
 
 __all__ = [
     'StateManager',
@@ -13,4 +14,8 @@ __all__ = [
     'ProcessManager',
     'get_process_manager',
     'TimeoutMonitor',
+    'Executor',
+    'ClaudeCLIExecutor',
+    'SimulatorExecutor',
+    'create_executor',
 ]
@@ -7,7 +7,8 @@ Designed for non-technical users who need a GUI instead of terminal commands.
 v2.0 - Rebuilt with StateManager, ProcessManager, and SSE support.
 """
 
-from flask import Flask, render_template, jsonify, request, Response
+from flask import Flask, render_template, jsonify, request, Response, send_file
+from werkzeug.formparser import FormDataParser
 import subprocess
 import os
 import sys
@@ -15,6 +16,7 @@ import json
 import re
 import signal
 import shutil
+import threading
 import time
 from datetime import datetime
 
@@ -26,6 +28,20 @@ os.chdir(PROJECT_ROOT)
 # Import managers (after adding project root to path)
 from server.state_manager import get_state_manager, StateManager
 from server.process_manager import get_process_manager, ProcessManager, TimeoutMonitor
+from server.executors import create_executor
+from server.job_manager import get_job_manager, JobConflict
+from server.cost_meter import get_cost_meter, log_offsets
+from server.questions import get_questions_file
+from server.plan_index import get_plan_index
+from server.reference_store import get_reference_store, UploadError
+from server.reference_index import get_reference_index
+from server.reference_archives import archive_suffix, extract_archive
+from server.archive_engine import get_archive_engine, remove_file
+from server.archive_bundle import stream_directory
+from scripts import generate_cost_report as cost_report
+from scripts.cost_store import CostStore
+from scripts.usage_warehouse import UsageWarehouse
+from scripts.session_discovery import expected_log_dir
 
 app = Flask(__name__,
             template_folder='templates',
@@ -35,6 +51,15 @@ app = Flask(__name__,
 state_manager = get_state_manager(PROJECT_ROOT)
 process_manager = get_process_manager()
 timeout_monitor = TimeoutMonitor(os.path.join(PROJECT_ROOT, 'STATUS.md'))
+job_manager = get_job_manager()
+cost_meter = get_cost_meter()
+cost_store = CostStore(os.path.join(PROJECT_ROOT, '.conductor'))
+usage_warehouse = UsageWarehouse(os.path.join(PROJECT_ROOT, '.conductor', 'usage.db'))
+questions_file = get_questions_file(os.path.join(PROJECT_ROOT, 'Questions_For_You.md'))
+plan_index = get_plan_index(os.path.join(PROJECT_ROOT, 'docs', 'planning', 'task-plan.md'))
+reference_store = get_reference_store(PROJECT_ROOT)
+reference_index = get_reference_index(PROJECT_ROOT)
+archive_engine = get_archive_engine(PROJECT_ROOT)
 
 
 # ============ Error Handlers ============
@@ -80,9 +105,11 @@ def events():
     """
     Server-Sent Events endpoint for real-time state updates.
 
-    Sends state updates every second for reactive UI updates.
+    Sends state updates every second for reactive UI updates, and a `plan`
+    event with the changed phases whenever task-plan.md changes.
     """
     def generate():
+        plan_etag = None
         while True:
             try:
                 # Get current state
@@ -97,9 +124,24 @@ def events():
                 state['stalled'] = timeout_info.get('stalled', False)
                 state['timedOut'] = timeout_info.get('timed_out', False)
 
+                # Add background job progress
+                state['jobs'] = job_manager.snapshot()
+
+                # Add running cost of the current (or last) Claude run
+                state['liveCost'] = cost_meter.snapshot()
+
+                # Add question counts; clients re-fetch when the fingerprint changes
+                state['questions'] = questions_file.summary()
+
                 # Send state as SSE event
                 yield f"data: {json.dumps(state)}\n\n"
 
+                # Push plan changes (the first event carries the whole plan)
+                plan = plan_index.load()
+                if plan['etag'] != plan_etag:
+                    yield f"event: plan\ndata: {json.dumps(plan_index.delta(plan_etag))}\n\n"
+                    plan_etag = plan['etag']
+
             except Exception as e:
                 # Send error state
                 yield f"data: {json.dumps({'error': str(e)})}\n\n"
@@ -169,29 +211,58 @@ def detect_plan_phases():
     """
     Detect phases from task-plan.md.
 
-    Returns tuple of (phase_count, phase_names) by parsing the markdown.
+    Returns tuple of (phase_count, phase_names) from the cached plan index.
     """
-    task_plan_path = os.path.join(PROJECT_ROOT, 'docs', 'planning', 'task-plan.md')
+    phases = plan_index.load()['phases']
+    return len(phases), [phase['title'] for phase in phases]
 
-    if not os.path.exists(task_plan_path):
-        return 0, []
 
-    try:
-        with open(task_plan_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+# Seconds between STATUS.md checks while Claude executes the plan
+PHASE_WATCH_INTERVAL = 2
 
-        # Look for phase headers like "## Phase 1:" or "### Phase 1 -" (2 or 3 hashes)
-        phase_pattern = r'##[#]?\s+Phase\s+(\d+)[:\s-]+(.+?)(?=\n|$)'
-        matches = re.findall(phase_pattern, content)
 
-        if matches:
-            phase_count = len(matches)
-            phase_names = [name.strip() for _, name in matches]
-            return phase_count, phase_names
+def parse_phases_completed(content):
+    """
+    Read the "Phases Completed | n / m" row Claude maintains in STATUS.md.
 
-        return 0, []
-    except Exception:
-        return 0, []
+    Returns tuple of (completed, total), or None if the row is missing.
+    """
+    match = re.search(r'Phases Completed\s*\|\s*(\d+)\s*/\s*(\d+)', content)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    return None
+
+
+def watch_phase_progress():
+    """
+    Journal phase boundaries while Claude executes the plan.
+
+    Claude ticks off phases in the STATUS.md body during a single run; each
+    change is recorded in the phase journal so the cost report can
+    attribute usage to phases. Stops when the Claude process exits.
+    """
+    status_path = os.path.join(PROJECT_ROOT, 'STATUS.md')
+
+    def watch():
+        last_mtime = None
+        while process_manager.is_running():
+            try:
+                mtime = os.path.getmtime(status_path)
+                if mtime != last_mtime:
+                    last_mtime = mtime
+                    with open(status_path, 'r', encoding='utf-8') as f:
+                        progress = parse_phases_completed(f.read())
+                    if progress and progress[1] > 0:
+                        completed, total = progress
+                        phase = min(completed + 1, total)
+                        _, phase_names = detect_plan_phases()
+                        name = phase_names[phase - 1] if phase <= len(phase_names) else None
+                        state_manager.record_phase_progress(phase, total, name)
+            except OSError:
+                pass
+            time.sleep(PHASE_WATCH_INTERVAL)
+
+    threading.Thread(target=watch, name='phase-watcher', daemon=True).start()
 
 
 def detect_plan_completion():
@@ -205,13 +276,11 @@ def detect_plan_completion():
             content = f.read()
 
         # Look for completion indicators
-        if 'Phases Completed' in content:
-            match = re.search(r'Phases Completed\s*\|\s*(\d+)\s*/\s*(\d+)', content)
-            if match:
-                completed = int(match.group(1))
-                total = int(match.group(2))
-                if completed >= total and total > 0:
-                    return True
+        progress = parse_phases_completed(content)
+        if progress:
+            completed, total = progress
+            if completed >= total and total > 0:
+                return True
 
         # Also check for "Complete" in status
         if 'Current Phase | Complete' in content or 'Phase | Complete' in content:
@@ -232,7 +301,11 @@ def load_config():
         'projectName': '',
         'projectDescription': '',
         'defaultModel': 'sonnet',
-        'allowPlanningQuestions': True
+        'allowPlanningQuestions': True,
+        'sessionReuse': 'never',
+        'executor': 'claude',
+        'simulator': {},
+        'maxUploadMB': 10240
     }
 
     if not os.path.exists(config_path):
@@ -255,23 +328,102 @@ def detect_planning_questions():
     Returns True if the file exists and has questions with blank answers.
     Questions are identified by the format: **Your Answer:** _____
     """
-    questions_path = os.path.join(PROJECT_ROOT, 'Questions_For_You.md')
+    return questions_file.load()['unanswered'] > 0
 
-    if not os.path.exists(questions_path):
-        return False
 
-    try:
-        with open(questions_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+def check_for_questions(questions=None):
+    """
+    Move an executing run to the questions state if Claude left unanswered questions.
 
-        # Look for unanswered questions (format: **Your Answer:** _____)
-        # Pattern matches "Your Answer:" followed by optional whitespace and underscores
-        unanswered_pattern = r'\*\*Your Answer:\*\*\s*_{3,}'
+    Args:
+        questions: Parsed questions file (default: load it)
 
-        matches = re.findall(unanswered_pattern, content)
-        return len(matches) > 0
-    except Exception:
-        return False
+    Returns:
+        True if the state is (now) 'questions'
+    """
+    questions = questions or questions_file.load()
+    state = state_manager.get_state().get('state')
+    if state == 'executing' and questions['unanswered']:
+        try:
+            state_manager.transition('questions_detected', activity='Claude has questions for you')
+            state = 'questions'
+        except ValueError:
+            # Raced with another transition
+            state = state_manager.get_state().get('state')
+    return state == 'questions'
+
+
+def watch_questions():
+    """Watch Questions_For_You.md while Claude runs and publish new questions as a state transition."""
+    questions_file.watch(process_manager.is_running, check_for_questions)
+
+
+# Actions that continue an earlier run rather than starting new work.
+# 'followups' resumes only these; 'always' also resumes the planning
+# session when execution starts.
+FOLLOWUP_ACTIONS = {'refine-plan', 'continue'}
+SESSION_REUSE_POLICIES = {'never', 'followups', 'always'}
+
+
+def resolve_resume_session(action):
+    """
+    Decide whether an action should resume the previous Claude session.
+
+    Governed by the 'sessionReuse' setting in project-config.json:
+    'never' always starts cold, 'followups' resumes for refine/continue,
+    'always' resumes for every action except generating a new plan.
+
+    Returns the session id to resume, or None to start a fresh session.
+    """
+    policy = load_config().get('sessionReuse', 'never')
+    if policy not in SESSION_REUSE_POLICIES or policy == 'never':
+        return None
+    if action == 'generate-plan':
+        return None
+    if policy == 'followups' and action not in FOLLOWUP_ACTIONS:
+        return None
+    return state_manager.get_state().get('session_id')
+
+
+def with_reference_index(prompt):
+    """
+    Point Claude at the reference index, so it reads only the files it needs.
+
+    The index is rewritten from cached analyses; files still being indexed
+    are listed without an outline.
+    """
+    if reference_index.pending():
+        schedule_reference_index()
+    index_path = reference_index.write_index()
+    if index_path is None:
+        return prompt
+    return (f'{prompt}\n\nReference files are summarized in {index_path} (size in tokens, outline, '
+            f'extracted text). Read only the ones relevant to the task.')
+
+
+def start_claude_for(action, prompt):
+    """
+    Start Claude for an action, resuming the last session if policy allows.
+
+    Uses the executor backend named by the 'executor' setting
+    ('claude' or 'simulator', with 'simulator' options). The run's spend
+    is metered live for the SSE stream.
+
+    Returns tuple of (pid, session_id, resumed).
+    """
+    config = load_config()
+    executor = create_executor(config.get('executor', 'claude'), config.get('simulator'))
+    process_manager.set_executor(executor)
+
+    resume_id = resolve_resume_session(action)
+    log_dir = expected_log_dir(PROJECT_ROOT, executor.projects_dir())
+    # Taken before the process starts, so none of this run's usage is skipped
+    offsets = log_offsets(log_dir, resume_id) if resume_id else None
+    pid = process_manager.start_claude(with_reference_index(prompt), PROJECT_ROOT, resume_session_id=resume_id)
+    session_id = process_manager.get_session_id()
+    state_manager.set_process(pid, session_id=session_id)
+    cost_meter.start(log_dir, session_id, process_manager.is_running, offsets)
+    return pid, session_id, resume_id is not None
 
 
 # ============ Action API ============
@@ -292,8 +444,7 @@ def action_generate_plan():
         timeout_monitor.start()
 
         # Start Claude process
-        pid = process_manager.start_claude('Generate a plan', PROJECT_ROOT)
-        state_manager.set_process(pid)
+        pid, session_id, resumed = start_claude_for('generate-plan', 'Generate a plan')
 
         # Set up exit callback to detect completion
         def on_exit(return_code):
@@ -334,7 +485,9 @@ def action_generate_plan():
         return jsonify({
             'success': True,
             'message': 'Plan generation started',
-            'pid': pid
+            'pid': pid,
+            'sessionId': session_id,
+            'resumed': resumed
         })
     except Exception as e:
         state_manager.set_error(str(e))
@@ -367,8 +520,7 @@ def action_refine_plan():
         timeout_monitor.start()
 
         # Start Claude process
-        pid = process_manager.start_claude(prompt, PROJECT_ROOT)
-        state_manager.set_process(pid)
+        pid, session_id, resumed = start_claude_for('refine-plan', prompt)
 
         # Set up exit callback
         def on_exit(return_code):
@@ -395,7 +547,9 @@ def action_refine_plan():
         return jsonify({
             'success': True,
             'message': 'Plan refinement started',
-            'pid': pid
+            'pid': pid,
+            'sessionId': session_id,
+            'resumed': resumed
         })
     except Exception as e:
         state_manager.set_error(str(e))
@@ -418,14 +572,18 @@ def action_execute_plan():
         timeout_monitor.start()
 
         # Start Claude process
-        pid = process_manager.start_claude('Execute the plan', PROJECT_ROOT)
-        state_manager.set_process(pid)
+        pid, session_id, resumed = start_claude_for('execute', 'Execute the plan')
+        watch_phase_progress()
+        watch_questions()
 
         # Set up exit callback
         def on_exit(return_code):
             if return_code == 0:
+                if check_for_questions():
+                    # Claude stopped to ask; wait for answers
+                    pass
                 # Check if execution completed
-                if detect_plan_completion():
+                elif detect_plan_completion():
                     state_manager.set_state('complete',
                                            activity='Project complete! Click "Open Output" to review your deliverables.')
                 else:
@@ -443,7 +601,9 @@ def action_execute_plan():
         return jsonify({
             'success': True,
             'message': 'Plan execution started',
-            'pid': pid
+            'pid': pid,
+            'sessionId': session_id,
+            'resumed': resumed
         })
     except Exception as e:
         state_manager.set_error(str(e))
@@ -465,14 +625,18 @@ def action_continue():
         timeout_monitor.start()
 
         # Start Claude process
-        pid = process_manager.start_claude('Continue', PROJECT_ROOT)
-        state_manager.set_process(pid)
+        pid, session_id, resumed = start_claude_for('continue', 'Continue')
+        watch_phase_progress()
+        watch_questions()
 
         # Set up exit callback
         def on_exit(return_code):
             if return_code == 0:
                 state = state_manager.get_state()
-                if state.get('phase', 0) >= state.get('total_phases', 0):
+                if check_for_questions():
+                    # Claude stopped to ask; wait for answers
+                    pass
+                elif state.get('phase', 0) >= state.get('total_phases', 0):
                     state_manager.set_state('complete', activity='Execution complete!')
             else:
                 state_manager.set_error(f'Claude exited with code {return_code}')
@@ -485,7 +649,9 @@ def action_continue():
         return jsonify({
             'success': True,
             'message': 'Continuing execution',
-            'pid': pid
+            'pid': pid,
+            'sessionId': session_id,
+            'resumed': resumed
         })
     except Exception as e:
         state_manager.set_error(str(e))
@@ -565,6 +731,7 @@ def action_reset():
                                phase=0,
                                total_phases=0,
                                phase_name=None,
+                               session_id=None,
                                error=None,
                                activity='Ready to start')
 
@@ -653,23 +820,79 @@ def review_prompt():
 
 # ============ Reference Files API ============
 
+def schedule_reference_index():
+    """Analyse new and changed reference files in the background."""
+    return job_manager.submit('reference_index', reference_index.refresh, key='references')
+
+
+def process_reference_upload(name):
+    """
+    Follow up a finished reference upload in the background.
+
+    Archives are unpacked into a folder of the same name (replacing the
+    archive) before indexing; other files are indexed as they are.
+
+    Returns the extraction job, or None for other files.
+    """
+    if archive_suffix(name) is None:
+        schedule_reference_index()
+        return None
+
+    def run(progress):
+        path = os.path.join(PROJECT_ROOT, 'File_References_For_Your_Project', name)
+        result = extract_archive(path, max_upload_bytes(), progress)
+        remove_file(path)
+        schedule_reference_index()
+        return result
+
+    return job_manager.submit('reference_extract', run, key=name)
+
+
 @app.route('/api/references')
 def list_references():
-    """List files in reference folder"""
+    """List files in reference folder, with their token estimates"""
     ref_dir = os.path.join(PROJECT_ROOT, 'File_References_For_Your_Project')
+    entries = reference_index.entries()
     files = []
     if os.path.exists(ref_dir):
         for f in os.listdir(ref_dir):
             if not f.startswith('.'):
                 path = os.path.join(ref_dir, f)
+                if os.path.isdir(path):
+                    # Folders (e.g. extracted archives) add up the files inside
+                    inside = [e for name, e in entries.items() if name.startswith(f + '/')]
+                    known = [e['tokens'] for e in inside if e['tokens'] is not None]
+                    entry = {'indexed': all(e['indexed'] for e in inside), 'kind': 'folder',
+                             'tokens': sum(known) if known else None}
+                else:
+                    entry = entries.get(f, {})
                 files.append({
                     'name': f,
                     'size': os.path.getsize(path) if os.path.isfile(path) else 0,
-                    'isDir': os.path.isdir(path)
+                    'isDir': os.path.isdir(path),
+                    'indexed': entry.get('indexed', False),
+                    'kind': entry.get('kind'),
+                    'tokens': entry.get('tokens')
                 })
+    if any(not e['indexed'] for e in entries.values()):
+        schedule_reference_index()
     return jsonify(files)
 
 
+@app.route('/api/references/index')
+def get_reference_index_summary():
+    """Token budget, outline and extracted text location of each reference file"""
+    entries = reference_index.entries()
+    job = None
+    if any(not e['indexed'] for e in entries.values()):
+        job = schedule_reference_index().to_dict()
+    return jsonify({
+        **reference_index.summary(),
+        'entries': entries,
+        'job': job
+    })
+
+
 @app.route('/api/references/open')
 def open_references_folder():
     """Open the reference files folder in Explorer"""
@@ -686,29 +909,129 @@ def open_references_folder():
     return jsonify({'success': True})
 
 
+def max_upload_bytes():
+    """Largest reference file accepted, from maxUploadMB in project-config.json."""
+    return int(load_config()['maxUploadMB'] * 1024 * 1024)
+
+
+def upload_error(e):
+    """JSON response for a rejected upload."""
+    return jsonify({'success': False, 'error': str(e), **e.details}), e.status
+
+
 @app.route('/api/references/upload', methods=['POST'])
 def upload_references():
-    """Handle file uploads to reference folder"""
-    ref_dir = os.path.join(PROJECT_ROOT, 'File_References_For_Your_Project')
-    os.makedirs(ref_dir, exist_ok=True)
+    """
+    Handle multipart file uploads to reference folder.
+
+    The form is parsed with a stream factory that writes each file part
+    straight into the reference store (hashed on the fly), so the body is
+    never spooled elsewhere first. Every file is then stored and linked on
+    its own; the response reports each file's outcome. Large files should
+    use the resumable upload API.
+    """
+    max_bytes = max_upload_bytes()
+    if request.content_length and request.content_length > max_bytes + 1024 * 1024:
+        # Reject before the form is parsed; the allowance covers multipart headers
+        return jsonify({'success': False, 'error': f'Upload is over the {max_bytes:,} byte limit',
+                        'maxBytes': max_bytes}), 413
+
+    incoming = []
+
+    def stream_factory(total_content_length, content_type, filename, content_length=None):
+        sink = reference_store.incoming(filename, max_bytes)
+        incoming.append(sink)
+        return sink
+
+    parser = FormDataParser(stream_factory=stream_factory, max_form_memory_size=request.max_form_memory_size,
+                            max_form_parts=request.max_form_parts, silent=False)
+    try:
+        try:
+            _, _, files = parser.parse(request.stream, request.mimetype, request.content_length,
+                                       request.mimetype_params)
+        except UploadError as e:
+            return upload_error(e)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': f'Malformed upload: {e}'}), 400
+
+        files = [file for file in files.getlist('files') if file.filename]
+        if not files:
+            return jsonify({'success': False, 'error': 'No files provided'}), 400
+
+        results = []
+        for file in files:
+            try:
+                result = reference_store.add_incoming(file.stream, file.filename)
+            except (UploadError, OSError) as e:
+                results.append({'file': file.filename, 'success': False, 'error': str(e)})
+                continue
+            job = process_reference_upload(result['file'])
+            results.append({'file': result['file'], 'success': True, 'deduplicated': result['deduplicated'],
+                            'jobId': job.id if job else None})
+    finally:
+        for sink in incoming:
+            sink.discard()
+
+    stored = [r for r in results if r['success']]
+    failed = [{'file': r['file'], 'error': r['error']} for r in results if not r['success']]
+    response = {
+        'success': not failed,
+        'results': results,
+        'files': [r['file'] for r in stored],
+        'deduplicated': [r['file'] for r in stored if r['deduplicated']],
+        'extracting': [{'file': r['file'], 'jobId': r['jobId']} for r in stored if r['jobId']],
+        'failed': failed
+    }
+    if failed:
+        response['error'] = f'{len(failed)} of {len(results)} file(s) could not be stored'
+    return jsonify(response), 200 if stored else 400
 
-    if 'files' not in request.files:
-        return jsonify({'success': False, 'error': 'No files provided'}), 400
 
-    files = request.files.getlist('files')
-    uploaded = []
+@app.route('/api/references/uploads', methods=['POST'])
+def create_reference_upload():
+    """Start a resumable upload; body is {name, size}"""
+    data = request.get_json(silent=True) or {}
+    try:
+        upload = reference_store.create_upload(data.get('name', ''), data.get('size'), max_upload_bytes())
+    except UploadError as e:
+        return upload_error(e)
+    return jsonify({'success': True, **upload}), 201
 
-    for file in files:
-        if file.filename:
-            # Sanitize filename
-            filename = os.path.basename(file.filename)
-            filepath = os.path.join(ref_dir, filename)
 
-            # Save file
-            file.save(filepath)
-            uploaded.append(filename)
+@app.route('/api/references/uploads/<upload_id>', methods=['GET'])
+def get_reference_upload(upload_id):
+    """Progress of a resumable upload (the offset to send the next chunk from)"""
+    try:
+        return jsonify({'success': True, **reference_store.status(upload_id)})
+    except UploadError as e:
+        return upload_error(e)
 
-    return jsonify({'success': True, 'files': uploaded})
+
+@app.route('/api/references/uploads/<upload_id>', methods=['PUT'])
+def put_reference_upload_chunk(upload_id):
+    """Append the raw request body to a resumable upload at ?offset="""
+    offset = request.args.get('offset', type=int)
+    if offset is None:
+        return jsonify({'success': False, 'error': 'offset is required'}), 400
+    try:
+        upload = reference_store.write_chunk(upload_id, offset, request.stream, request.content_length)
+    except UploadError as e:
+        return upload_error(e)
+    if upload.get('complete'):
+        job = process_reference_upload(upload['file'])
+        if job:
+            upload['jobId'] = job.id
+    return jsonify({'success': True, **upload})
+
+
+@app.route('/api/references/uploads/<upload_id>', methods=['DELETE'])
+def cancel_reference_upload(upload_id):
+    """Discard an unfinished resumable upload"""
+    try:
+        reference_store.cancel(upload_id)
+    except UploadError as e:
+        return upload_error(e)
+    return jsonify({'success': True})
 
 
 @app.route('/api/references/archive', methods=['POST'])
@@ -740,6 +1063,7 @@ def archive_references():
         else:
             shutil.move(src, dest)
         archived.append(f)
+    reference_index.write_index()
 
     return jsonify({
         'success': True,
@@ -752,93 +1076,51 @@ def archive_references():
 
 @app.route('/api/questions')
 def get_questions():
-    """Parse Questions_For_You.md and return questions as JSON"""
-    questions_path = os.path.join(PROJECT_ROOT, 'Questions_For_You.md')
-    questions = []
-    has_questions = False
-
-    if os.path.exists(questions_path):
-        with open(questions_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Check if there are actual questions (not just the empty template)
-        if '### Question' in content:
-            has_questions = True
-
-            # Parse questions using regex
-            pattern = r'### Question (\d+):\s*(.+?)\n(.+?)\n\n\*\*Your Answer:\*\*\s*(.*?)(?=\n### Question|\n---|\Z)'
-            matches = re.findall(pattern, content, re.DOTALL)
-
-            for match in matches:
-                num, topic, question_text, answer = match
-                answer = answer.strip()
-                if answer == '_____' or answer == '___':
-                    answer = ''
-
-                questions.append({
-                    'number': int(num),
-                    'topic': topic.strip(),
-                    'question': question_text.strip(),
-                    'answer': answer
-                })
-
-    # Update state if questions detected
-    if has_questions and not any(q.get('answer') for q in questions):
-        state = state_manager.get_state()
-        if state.get('state') == 'executing':
-            state_manager.set_state('questions', activity='Claude has questions for you')
+    """
+    Return the questions of Questions_For_You.md as JSON.
 
+    Read-only: new questions move the state machine via the file watcher,
+    not via this endpoint.
+    """
+    questions = questions_file.load()
     return jsonify({
-        'hasQuestions': has_questions,
-        'questions': questions,
-        'count': len(questions)
+        'hasQuestions': questions['count'] > 0,
+        'questions': questions['questions'],
+        'count': questions['count'],
+        'unanswered': questions['unanswered'],
+        'fingerprint': questions['fingerprint']
     })
 
 
 @app.route('/api/questions/answer', methods=['POST'])
 def answer_questions():
-    """Write answers back to Questions_For_You.md"""
-    answers = request.json.get('answers', {})
+    """
+    Write answers back to Questions_For_You.md.
 
-    questions_path = os.path.join(PROJECT_ROOT, 'Questions_For_You.md')
+    Accepts any subset of the questions, so the UI also uses it to save
+    drafts as the user types; a blank answer restores the placeholder.
+    """
+    answers = (request.json or {}).get('answers', {})
+    if not isinstance(answers, dict):
+        return jsonify({'success': False, 'error': 'answers must map question numbers to text'}), 400
 
-    if not os.path.exists(questions_path):
+    try:
+        result = questions_file.save_answers(answers)
+    except FileNotFoundError:
         return jsonify({'success': False, 'error': 'Questions file not found'})
 
-    with open(questions_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # Replace each answer placeholder with the actual answer
-    for num, answer in answers.items():
-        pattern = rf'(### Question {num}:.+?\n\*\*Your Answer:\*\*)\s*.*?(?=\n### Question|\n---|\Z)'
-        replacement = rf'\1 {answer}'
-        content = re.sub(pattern, replacement, content, flags=re.DOTALL)
-
-    with open(questions_path, 'w', encoding='utf-8') as f:
-        f.write(content)
-
-    return jsonify({'success': True})
+    return jsonify({'success': True, **result})
 
 
 @app.route('/api/questions/skip', methods=['POST'])
 def skip_questions():
-    """Mark questions as skipped (let Claude decide)"""
-    questions_path = os.path.join(PROJECT_ROOT, 'Questions_For_You.md')
-
-    if not os.path.exists(questions_path):
+    """Mark unanswered questions as skipped (let Claude decide)"""
+    try:
+        result = questions_file.skip_unanswered()
+    except FileNotFoundError:
         return jsonify({'success': False, 'error': 'Questions file not found'})
 
-    with open(questions_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # Replace all answer placeholders with "(Skipped - Claude will decide)"
-    pattern = r'(\*\*Your Answer:\*\*)\s*_*'
-    content = re.sub(pattern, r'\1 (Skipped - Claude will decide)', content)
-
-    with open(questions_path, 'w', encoding='utf-8') as f:
-        f.write(content)
-
-    return jsonify({'success': True})
+    return jsonify({'success': True, **result})
 
 
 # ============ Claude Control API ============
@@ -891,6 +1173,25 @@ def login_claude():
         return jsonify({'success': False, 'error': str(e)})
 
 
+@app.route('/api/plan')
+def get_plan():
+    """
+    Structured phases of task-plan.md.
+
+    Supports If-None-Match (304 while the plan is unchanged); ?since=<etag>
+    returns only the phases changed since that version when it is the one
+    before the latest change.
+    """
+    since = request.args.get('since')
+    if since:
+        return jsonify(plan_index.delta(since))
+
+    plan = plan_index.load()
+    response = jsonify(plan)
+    response.set_etag(plan['etag'])
+    return response.make_conditional(request)
+
+
 @app.route('/api/plan/open')
 def open_plan():
     """Open task-plan.md in default editor/viewer"""
@@ -956,112 +1257,333 @@ def continue_claude():
 
 @app.route('/api/cost')
 def get_cost_report():
-    """Get cost report data if available"""
-    cost_report_path = os.path.join(PROJECT_ROOT, 'output', 'cost_report.md')
+    """
+    Get the stored cost metrics, if a report has been generated.
 
-    if not os.path.exists(cost_report_path):
+    Includes the first page of subagents (most expensive first); use
+    ?offset=&limit= to page, or /api/cost/agents for the full listing.
+    """
+    document = cost_store.load()
+    if not document:
         return jsonify({
             'available': False,
             'message': 'No cost report generated yet'
         })
 
-    with open(cost_report_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    offset, limit = page_args(default_limit=20)
+    subagents, total = cost_store.agents(document['sessionId'], kind='subagent', offset=offset, limit=limit)
 
-    # Parse key metrics from the report
-    metrics = {}
+    return jsonify({
+        'available': True,
+        'sessionId': document['sessionId'],
+        'generatedAt': document.get('generatedAt'),
+        'metrics': document.get('metrics', {}),
+        'main': document.get('main'),
+        'phases': document.get('phases', []),
+        'context': document.get('context'),
+        'cache': document.get('cache'),
+        'subagents': {
+            'items': subagents,
+            'total': total,
+            'offset': offset,
+            'limit': limit
+        }
+    })
 
-    cost_match = re.search(r'Total Estimated Cost \| \*\*\$([0-9.]+)\*\*', content)
-    if cost_match:
-        metrics['totalCost'] = float(cost_match.group(1))
 
-    cache_match = re.search(r'Cache Efficiency \| ([0-9.]+)%', content)
-    if cache_match:
-        metrics['cacheEfficiency'] = float(cache_match.group(1))
+@app.route('/api/cost/agents')
+def get_cost_agents():
+    """Page through the per-agent costs of the stored report"""
+    document = cost_store.load()
+    if not document:
+        return jsonify({'success': False, 'error': 'No cost report generated yet'}), 404
 
-    subagent_match = re.search(r'Subagents Spawned \| (\d+)', content)
-    if subagent_match:
-        metrics['subagentCount'] = int(subagent_match.group(1))
+    offset, limit = page_args(default_limit=50)
+    order = request.args.get('order', 'cost')
+    try:
+        items, total = cost_store.agents(document['sessionId'], kind=request.args.get('kind'),
+                                         offset=offset, limit=limit, order=order)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
 
-    delegation_match = re.search(r'Delegation Ratio \| ([0-9.]+)%', content)
-    if delegation_match:
-        metrics['delegationRatio'] = float(delegation_match.group(1))
+    return jsonify({
+        'success': True,
+        'sessionId': document['sessionId'],
+        'items': items,
+        'total': total,
+        'offset': offset,
+        'limit': limit
+    })
 
-    model_match = re.search(r'Model Used \| (.+)', content)
-    if model_match:
-        metrics['model'] = model_match.group(1).strip()
 
+@app.route('/api/cost/report')
+def get_cost_report_markdown():
+    """Render the stored cost figures as markdown (also saved to output/cost_report.md)"""
+    content = cost_report.render_stored_report(PROJECT_ROOT, cost_store)
+    if content is None:
+        return jsonify({
+            'available': False,
+            'message': 'No cost report generated yet'
+        })
     return jsonify({
         'available': True,
-        'metrics': metrics,
         'rawContent': content
     })
 
 
+@app.route('/api/cost/cache')
+def get_cost_cache_timeline():
+    """
+    Per-turn cache usage and cache breaks of the stored report.
+
+    ?agent= limits the timeline to one agent ('main' or a subagent id).
+    """
+    timeline = cost_store.load_timeline()
+    if timeline is None:
+        return jsonify({
+            'available': False,
+            'message': 'No cost report generated yet'
+        })
+
+    agents = timeline['agents']
+    agent = request.args.get('agent')
+    if agent:
+        agents = [a for a in agents if a['agent'] == agent]
+        if not agents:
+            return jsonify({'success': False, 'error': f'Unknown agent: {agent}'}), 404
+    return jsonify({
+        'available': True,
+        'sessionId': timeline['sessionId'],
+        'agents': agents
+    })
+
+
+@app.route('/api/cost/tree')
+def get_cost_tree():
+    """Subagent spawn tree of the stored report, with per-subtree cost and time roll-ups"""
+    document = cost_store.load()
+    if not document or not document.get('tree'):
+        return jsonify({
+            'available': False,
+            'message': 'No cost report generated yet'
+        })
+    return jsonify({
+        'available': True,
+        'sessionId': document['sessionId'],
+        'tree': document['tree']
+    })
+
+
+def page_args(default_limit):
+    """Read ?offset=&limit= pagination arguments, clamped to sane bounds."""
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = min(500, max(1, request.args.get('limit', default_limit, type=int)))
+    return offset, limit
+
+
+@app.route('/api/cost/live')
+def get_live_cost():
+    """Running token and cost totals of the current (or last) Claude run"""
+    snapshot = cost_meter.snapshot()
+    if snapshot is None:
+        return jsonify({
+            'available': False,
+            'message': 'No Claude run metered yet'
+        })
+    return jsonify({'available': True, **snapshot})
+
+
 @app.route('/api/cost/generate', methods=['POST'])
 def generate_cost_report():
-    """Generate a new cost report"""
-    script_path = os.path.join(PROJECT_ROOT, 'scripts', 'generate_cost_report.py')
+    """
+    Generate a new cost report in the background.
 
-    if not os.path.exists(script_path):
-        return jsonify({'success': False, 'error': 'Cost report script not found'})
+    Returns immediately: with the cached metrics when the session logs are
+    unchanged since the last report, otherwise with the id of a background
+    job whose progress is published on /api/events.
+    """
+    data = request.get_json(silent=True) or {}
+    session_id = data.get('session')
+    force = data.get('force', False)
+
+    def run(progress):
+        result = cost_report.build_report(PROJECT_ROOT, session_id=session_id, use_cache=not force,
+                                          render=False, progress=progress)
+        return {key: result[key] for key in ('sessionId', 'generatedAt', 'cached', 'metrics')}
 
     try:
-        result = subprocess.run(
-            [sys.executable, script_path, PROJECT_ROOT],
-            capture_output=True, text=True, timeout=30
-        )
+        if not force:
+            session_file, subagent_dir = cost_report.locate_session(PROJECT_ROOT, session_id)
+            if not session_file:
+                return jsonify({'success': False, 'error': 'Could not find session logs'})
+
+            cached = cost_report.cached_report(cost_store, session_file, subagent_dir)
+            if cached:
+                return jsonify({
+                    'success': True,
+                    'cached': True,
+                    'message': 'Session logs and pricing unchanged - cost report is up to date',
+                    'metrics': cached.get('metrics', {})
+                })
 
-        if result.returncode == 0:
-            return jsonify({'success': True, 'message': 'Cost report generated'})
-        else:
-            return jsonify({'success': False, 'error': result.stderr or 'Failed to generate report'})
+        job = job_manager.submit('cost_report', run, key=session_id)
+        return jsonify({
+            'success': True,
+            'cached': False,
+            'message': 'Cost report generation started',
+            'jobId': job.id
+        })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
 
+# ============ Usage Warehouse API ============
+
+@app.route('/api/usage')
+def get_usage():
+    """
+    Cost and tokens across all Claude sessions, grouped by day, model,
+    project or session (?group=). Filters: ?since=&until=&project=
+    """
+    try:
+        rows = usage_warehouse.costs(request.args.get('group', 'day'), since=request.args.get('since'),
+                                     until=request.args.get('until'), project=request.args.get('project'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({
+        'success': True,
+        'rows': rows,
+        'totalCost': round(sum(r['cost'] for r in rows), 4)
+    })
+
+
+@app.route('/api/usage/sessions')
+def get_usage_sessions():
+    """List warehoused sessions, newest first (?project=&offset=&limit=)"""
+    offset, limit = page_args(default_limit=50)
+    sessions, total = usage_warehouse.sessions(project=request.args.get('project'), offset=offset, limit=limit)
+    return jsonify({
+        'success': True,
+        'items': sessions,
+        'total': total,
+        'offset': offset,
+        'limit': limit
+    })
+
+
+@app.route('/api/usage/ingest', methods=['POST'])
+def ingest_usage():
+    """Load new session-log records into the usage warehouse in the background"""
+    def run(progress):
+        def file_progress(done, total):
+            progress(100 * done / total, f'Ingested {done}/{total} changed log(s)')
+        return usage_warehouse.ingest(progress=file_progress)
+
+    job = job_manager.submit('usage_ingest', run)
+    return jsonify({
+        'success': True,
+        'message': 'Usage ingest started',
+        'jobId': job.id
+    })
+
+
+# ============ Jobs API ============
+
+@app.route('/api/jobs')
+def list_jobs():
+    """List background jobs, newest first"""
+    return jsonify(job_manager.list(request.args.get('kind')))
+
+
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """Get status, progress and result of a background job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+
 # ============ Archive API ============
 
-@app.route('/api/archive', methods=['POST'])
-def archive_project():
-    """Archive current project to timestamped folder"""
+# Working files kept when a project is archived
+ARCHIVE_ITEMS = [
+    'docs/planning',
+    'output',
+    'STATUS.md',
+    'Questions_For_You.md',
+    'config/project-config.json'
+]
+
+
+def archive_options(data):
+    """
+    Archive name and engine options from an archive or reset request.
+
+    Body fields: projectName, bundle (one compressed tar instead of a
+    folder tree) and incremental (skip files unchanged since the project's
+    previous archive).
+    """
+    project = (data.get('projectName') or 'project').replace(' ', '_')
     timestamp = datetime.now().strftime('%Y-%m-%d_%H%M')
-    project_name = request.json.get('projectName', 'project').replace(' ', '_')
-    archive_name = f"{timestamp}_{project_name}"
-    archive_path = os.path.join(PROJECT_ROOT, 'archive', archive_name)
+    return f"{timestamp}_{project}", {
+        'project': project,
+        'bundle': bool(data.get('bundle')),
+        'incremental': bool(data.get('incremental'))
+    }
 
-    os.makedirs(archive_path, exist_ok=True)
 
-    items_to_archive = [
-        'docs/planning',
-        'output',
-        'STATUS.md',
-        'Questions_For_You.md',
-        'config/project-config.json'
-    ]
+# Job key shared by jobs that read or clear the project's working files,
+# so an archive and a reset never run at the same time
+PROJECT_FILES_JOB = 'project'
 
-    archived = []
-    for item in items_to_archive:
-        src = os.path.join(PROJECT_ROOT, item)
-        if os.path.exists(src):
-            dest = os.path.join(archive_path, item)
-            os.makedirs(os.path.dirname(dest), exist_ok=True)
-            if os.path.isdir(src):
-                shutil.copytree(src, dest)
-            else:
-                shutil.copy2(src, dest)
-            archived.append(item)
 
+def project_files_busy(e):
+    """409 for an archive or reset requested while the same kind of job is active."""
+    return jsonify({'success': False, 'error': f'{e} - wait for it to finish', 'jobId': e.job.id}), 409
+
+
+@app.route('/api/archive', methods=['POST'])
+def archive_project():
+    """Archive current project to timestamped folder, as a background job"""
+    name, options = archive_options(request.get_json(silent=True) or {})
+
+    def run(progress):
+        return archive_engine.archive(name, ARCHIVE_ITEMS, progress, **options)
+
+    try:
+        job = job_manager.submit('archive', run, key=PROJECT_FILES_JOB, reuse=False)
+    except JobConflict as e:
+        return project_files_busy(e)
     return jsonify({
         'success': True,
-        'archivePath': archive_path,
-        'archived': archived
-    })
+        'jobId': job.id,
+        'archiveName': name
+    }), 202
 
 
 @app.route('/api/reset', methods=['POST'])
 def reset_project():
-    """Archive current project and reset to fresh state"""
+    """Archive current project and reset to fresh state, as a background job"""
+    name, options = archive_options(request.get_json(silent=True) or {})
+    try:
+        job = job_manager.submit('reset', reset_project_files, name, options, key=PROJECT_FILES_JOB,
+                                 reuse=False)
+    except JobConflict as e:
+        return project_files_busy(e)
+    return jsonify({
+        'success': True,
+        'jobId': job.id,
+        'archiveName': name
+    }), 202
+
+
+def reset_project_files(progress, name, options):
+    """
+    Archive the project's working files (if any), then clear them.
+
+    Job function; progress covers archiving up to 90%.
+    """
     # First, archive if there's anything to archive
     has_content = any([
         os.path.exists(os.path.join(PROJECT_ROOT, 'docs/planning/task-plan.md')),
@@ -1071,31 +1593,15 @@ def reset_project():
     ])
 
     archive_path = None
+    stats = None
     if has_content:
-        timestamp = datetime.now().strftime('%Y-%m-%d_%H%M')
-        project_name = request.json.get('projectName', 'project').replace(' ', '_')
-        archive_name = f"{timestamp}_{project_name}"
-        archive_path = os.path.join(PROJECT_ROOT, 'archive', archive_name)
-
-        os.makedirs(archive_path, exist_ok=True)
-
-        items_to_archive = [
-            'docs/planning',
-            'output',
-            'STATUS.md',
-            'Questions_For_You.md',
-            'config/project-config.json'
-        ]
-
-        for item in items_to_archive:
-            src = os.path.join(PROJECT_ROOT, item)
-            if os.path.exists(src):
-                dest = os.path.join(archive_path, item)
-                os.makedirs(os.path.dirname(dest), exist_ok=True)
-                if os.path.isdir(src):
-                    shutil.copytree(src, dest)
-                else:
-                    shutil.copy2(src, dest)
+        result = archive_engine.archive(name, ARCHIVE_ITEMS,
+                                        lambda percent, message=None: progress(percent * 0.9, message),
+                                        **options)
+        archive_path = result['archivePath']
+        stats = result['stats']
+
+    progress(90, 'Clearing working files')
 
     # Clear working files
     items_to_clear = [
@@ -1129,6 +1635,7 @@ def reset_project():
                            phase=0,
                            total_phases=0,
                            phase_name=None,
+                           session_id=None,
                            error=None,
                            activity='Project reset. Configure to start new project.')
 
@@ -1137,15 +1644,14 @@ def reset_project():
 
 _No questions yet. Claude will write questions here if clarification is needed._
 """
-    with open(os.path.join(PROJECT_ROOT, 'Questions_For_You.md'), 'w', encoding='utf-8') as f:
-        f.write(fresh_questions)
+    questions_file.reset(fresh_questions)
 
-    return jsonify({
-        'success': True,
+    return {
         'archived': archive_path is not None,
         'archivePath': archive_path,
+        'stats': stats,
         'message': 'Project reset. Old files archived.' if archive_path else 'Project reset. No files to archive.'
-    })
+    }
 
 
 @app.route('/api/archive/list')
@@ -1162,16 +1668,43 @@ def list_archives():
             if os.path.isdir(path):
                 parts = name.split('_', 2)
                 if len(parts) >= 2:
+                    manifest = archive_engine.manifest(name) or {}
                     archives.append({
                         'name': name,
                         'date': parts[0],
                         'time': parts[1] if len(parts) > 1 else '',
-                        'project': parts[2] if len(parts) > 2 else 'Unknown'
+                        'project': parts[2] if len(parts) > 2 else 'Unknown',
+                        'bundle': manifest.get('bundle'),
+                        'base': manifest.get('base')
                     })
 
     return jsonify(archives)
 
 
+@app.route('/api/archive/<name>/download')
+def download_archive(name):
+    """
+    Download an archive as a single file.
+
+    Bundled archives are sent from disk as they are; folder archives are
+    streamed as a .tar.gz built on the fly. Neither is held in memory.
+    """
+    archive_path = os.path.join(PROJECT_ROOT, 'archive', name)
+    if name != os.path.basename(name) or name.startswith('.') or not os.path.isdir(archive_path):
+        return jsonify({'success': False, 'error': 'Archive not found'}), 404
+
+    bundle = archive_engine.bundle_path(name)
+    if bundle:
+        file_name = os.path.basename(bundle)
+        suffix = file_name[file_name.index('.tar'):]
+        return send_file(bundle, as_attachment=True, download_name=f'{name}{suffix}',
+                         mimetype='application/zstd' if suffix == '.tar.zst' else 'application/gzip')
+
+    return Response(stream_directory(archive_path, name), mimetype='application/gzip', headers={
+        'Content-Disposition': f'attachment; filename="{name}.tar.gz"'
+    })
+
+
 @app.route('/api/archive/open')
 def open_archive_folder():
     """Open the archive folder in Explorer"""
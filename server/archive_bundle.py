@@ -0,0 +1,199 @@
+"""
+Archive Bundles for Simple Claude Conductor
+
+Writes and streams single-file archive bundles: a tar compressed with
+Zstandard (.tar.zst, when the optional zstandard package is installed) or
+gzip (.tar.gz) otherwise. Bundles are written as a stream, one file at a
+time, and their SHA-256 is computed while they are written, so neither
+building nor downloading one holds more than a chunk in memory.
+"""
+
+import hashlib
+import io
+import os
+import queue
+import tarfile
+import threading
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+
+try:
+    import zstandard
+    HAS_ZSTANDARD = True
+except ImportError:
+    HAS_ZSTANDARD = False
+
+CHUNK_SIZE = 1024 * 1024
+
+# Chunks buffered between a streaming tar writer and the HTTP response
+STREAM_QUEUE = 8
+
+# Zstandard level: fast, still well ahead of gzip on ratio
+ZSTD_LEVEL = 3
+
+
+def bundle_suffix() -> str:
+    """Suffix of the bundles this install writes."""
+    return '.tar.zst' if HAS_ZSTANDARD else '.tar.gz'
+
+
+class _HashingWriter:
+    """Writes through to a file, hashing and counting the bytes."""
+
+    def __init__(self, f: BinaryIO):
+        self._f = f
+        self.hasher = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.hasher.update(data)
+        self.size += len(data)
+        return self._f.write(data)
+
+    def flush(self) -> None:
+        self._f.flush()
+
+
+class BundleWriter:
+    """
+    Streaming writer of a compressed tar bundle.
+
+    The bundle is written to a temp file and renamed into place by close(),
+    so an interrupted bundle never looks complete.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize BundleWriter.
+
+        Args:
+            path: Bundle path (should end in bundle_suffix())
+        """
+        self.path = path
+        self._tmp_path = f'{path}.tmp'
+        self._file = open(self._tmp_path, 'wb')
+        self._hashing = _HashingWriter(self._file)
+        if HAS_ZSTANDARD:
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(self._hashing, closefd=False)
+            self._tar = tarfile.open(fileobj=self._compressor, mode='w|')
+        else:
+            self._compressor = None
+            self._tar = tarfile.open(fileobj=self._hashing, mode='w|gz')
+
+    def add_file(self, src: str, arcname: str) -> None:
+        """Append a file from disk."""
+        info = self._tar.gettarinfo(src, arcname=arcname)
+        with open(src, 'rb') as f:
+            self._tar.addfile(info, f)
+
+    def add_bytes(self, arcname: str, data: bytes) -> None:
+        """Append a file from memory (e.g. the manifest)."""
+        info = tarfile.TarInfo(arcname)
+        info.size = len(data)
+        self._tar.addfile(info, io.BytesIO(data))
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Finish the bundle.
+
+        Returns:
+            Dict with file (bundle file name), size and sha256
+        """
+        self._tar.close()
+        if self._compressor is not None:
+            self._compressor.close()
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+        return {'file': os.path.basename(self.path), 'size': self._hashing.size,
+                'sha256': self._hashing.hasher.hexdigest()}
+
+    def abort(self) -> None:
+        """Discard a partly written bundle."""
+        try:
+            self._tar.close()
+            if self._compressor is not None:
+                self._compressor.close()
+        except Exception:
+            pass
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+class _StreamCancelled(Exception):
+    """The client went away mid-download."""
+
+
+class _QueueWriter:
+    """File-like sink that hands written bytes to a bounded queue."""
+
+    def __init__(self, chunks: 'queue.Queue[Optional[bytes]]', cancelled: threading.Event):
+        self._chunks = chunks
+        self._cancelled = cancelled
+        self._buffer = bytearray()
+
+    def write(self, data) -> int:
+        self._buffer += data
+        if len(self._buffer) >= CHUNK_SIZE:
+            self.flush()
+        return len(data)
+
+    def flush(self) -> None:
+        if self._buffer:
+            chunk = bytes(self._buffer)
+            self._buffer.clear()
+            while True:
+                try:
+                    self._chunks.put(chunk, timeout=1)
+                    return
+                except queue.Full:
+                    if self._cancelled.is_set():
+                        raise _StreamCancelled()
+
+
+def stream_directory(path: str, root_name: str) -> Iterator[bytes]:
+    """
+    Stream a folder as a .tar.gz, generated on the fly.
+
+    The tar is written on a background thread into a small bounded queue,
+    so a slow client never makes the server hold the whole archive.
+
+    Args:
+        path: Folder to stream
+        root_name: Name of the top-level folder inside the tar
+
+    Yields:
+        Chunks of the compressed tar
+    """
+    chunks: 'queue.Queue[Optional[bytes]]' = queue.Queue(maxsize=STREAM_QUEUE)
+    cancelled = threading.Event()
+    errors = []
+
+    def produce():
+        try:
+            writer = _QueueWriter(chunks, cancelled)
+            with tarfile.open(fileobj=writer, mode='w|gz') as tar:
+                tar.add(path, arcname=root_name)
+            writer.flush()
+        except _StreamCancelled:
+            return
+        except Exception as e:
+            errors.append(e)
+        while not cancelled.is_set():
+            try:
+                chunks.put(None, timeout=1)
+                return
+            except queue.Full:
+                pass
+
+    threading.Thread(target=produce, name='archive-stream', daemon=True).start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        # Unblocks the writer if the client disconnected
+        cancelled.set()
+    if errors:
+        raise errors[0]
@@ -0,0 +1,389 @@
+"""
+Archive Engine for Simple Claude Conductor
+
+Archives the project's working files (planning docs, output, state files)
+into archive/<timestamp>_<name> without copying unchanged data again.
+
+Each file is placed in the archive the cheapest way the filesystem allows:
+
+- reflink: a copy-on-write clone (Btrfs, XFS, ...), which shares the
+  source's data blocks until either side changes
+- hardlink: a hard link to a content-addressed blob under
+  .conductor/archive/blobs, so identical content across archives, and
+  across files, is stored once; blobs are read-only, so an archived file
+  cannot be edited in place (which would change every archive sharing it)
+- copy: a plain copy, where neither is possible (e.g. FAT drives)
+
+Content hashes are cached on each file's fingerprint (modification time and
+size), so a file unchanged since the last archive is neither re-read nor
+re-stored. Every archive gets a manifest (.manifest.json) listing each
+file's size, hash and how it was stored.
+
+Two options change what is stored:
+
+- bundle: files go into one compressed tar (see archive_bundle) instead of
+  a folder; the manifest, also inside the bundle, records its hash
+- incremental: files unchanged since the previous archive of the same
+  project are not stored again; the manifest names the archive holding them
+"""
+
+import errno
+import hashlib
+import json
+import os
+import shutil
+import stat as stat_module
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from server.archive_bundle import BundleWriter, bundle_suffix
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+# ioctl that clones one file's extents into another (linux/fs.h)
+FICLONE = 0x40049409
+
+MANIFEST_NAME = '.manifest.json'
+MANIFEST_VERSION = 1
+
+# Blobs are shared by every archive holding the same content, so they are
+# read-only: an in-place edit of one archived copy must not change the rest
+BLOB_MODE = 0o444
+
+# Errors meaning "this filesystem cannot do that", not "this file failed"
+UNSUPPORTED = {errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL, errno.ENOTTY, errno.EPERM,
+               getattr(errno, 'ENOTSUP', errno.EOPNOTSUPP)}
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file, read in chunks."""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def fingerprint(stat: os.stat_result) -> str:
+    return f'{stat.st_mtime_ns}-{stat.st_size}'
+
+
+def reflink(src: str, dest: str) -> None:
+    """
+    Clone src to dest sharing data blocks (copy-on-write).
+
+    Raises:
+        OSError: If the platform or filesystem cannot clone
+    """
+    if not HAS_FCNTL:
+        raise OSError(errno.EOPNOTSUPP, 'Reflinks are not supported on this platform')
+    with open(src, 'rb') as source, open(dest, 'wb') as target:
+        try:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+        except OSError:
+            target.close()
+            os.remove(dest)
+            raise
+    shutil.copystat(src, dest)
+
+
+def remove_file(path: str) -> None:
+    """Delete a file, clearing the read-only flag first where the platform requires it (Windows)."""
+    try:
+        os.remove(path)
+    except PermissionError:
+        os.chmod(path, stat_module.S_IWRITE | stat_module.S_IREAD)
+        os.remove(path)
+
+
+class ArchiveEngine:
+    """
+    Deduplicating archiver for project working files.
+
+    Layout under .conductor/archive:
+        blobs/<aa>/<sha256>   stored content, hard-linked into archives
+        blobs.json            size and mtime of each blob when stored
+        hashes.json           project path -> fingerprint and sha256
+    """
+
+    def __init__(self, project_root: str):
+        """
+        Initialize ArchiveEngine.
+
+        Args:
+            project_root: Path to the project root directory
+        """
+        self.project_root = project_root
+        self.archive_dir = os.path.join(project_root, 'archive')
+        self.store_dir = os.path.join(project_root, '.conductor', 'archive')
+        self.blob_dir = os.path.join(self.store_dir, 'blobs')
+        self._lock = threading.Lock()
+        # Cleared once a filesystem refuses a clone, so it is not retried per file
+        self._reflinks = HAS_FCNTL
+
+    # ---- Archiving ----
+
+    def archive(self, name: str, items: List[str],
+                progress: Optional[Callable[[float, str], None]] = None,
+                project: Optional[str] = None, bundle: bool = False,
+                incremental: bool = False) -> Dict[str, Any]:
+        """
+        Archive project files and folders into archive/<name>.
+
+        Args:
+            name: Archive folder name
+            items: Paths relative to the project root; missing ones are skipped
+            progress: Optional progress(percent, message) callback (job style)
+            project: Project the archive belongs to (for incremental archives)
+            bundle: Store files in one compressed tar instead of a folder tree
+            incremental: Skip files unchanged since the project's previous archive
+
+        Returns:
+            Dict with archivePath, archived (the items that existed), base
+            (the previous archive, when incremental), bundle (file, size,
+            sha256, when bundled) and stats: files, bytes, hashed (files
+            read because they changed), unchanged (files left in earlier
+            archives), and reflink, hardlink, copy and bundle counts
+        """
+        progress = progress or (lambda percent, message=None: None)
+        archive_path = os.path.join(self.archive_dir, name)
+        os.makedirs(archive_path, exist_ok=True)
+        self.prune()
+
+        base = self.previous_archive(project, exclude=name) if incremental else None
+        base_files = {entry['path']: entry for entry in base['files']} if base else {}
+        archived = [item for item in items if os.path.exists(os.path.join(self.project_root, item))]
+        files = list(self._walk(archived, None if bundle else archive_path))
+        stats = {'files': 0, 'bytes': 0, 'hashed': 0, 'unchanged': 0,
+                 'reflink': 0, 'hardlink': 0, 'copy': 0, 'bundle': 0}
+        entries = []
+        writer = BundleWriter(os.path.join(archive_path, f'bundle{bundle_suffix()}')) if bundle else None
+
+        try:
+            with self._lock:
+                hashes = self._load_json('hashes.json')
+                blobs = self._load_json('blobs.json')
+                for i, (relative, stat) in enumerate(files, 1):
+                    src = os.path.join(self.project_root, relative)
+                    known = hashes.get(relative)
+                    if known and known['fingerprint'] == fingerprint(stat):
+                        digest = known['sha256']
+                    else:
+                        digest = file_sha256(src)
+                        hashes[relative] = {'fingerprint': fingerprint(stat), 'sha256': digest}
+                        stats['hashed'] += 1
+
+                    entry = {'path': relative, 'size': stat.st_size, 'sha256': digest}
+                    previous = base_files.get(relative)
+                    if previous and previous['sha256'] == digest:
+                        entry.update(stored='unchanged', archive=previous.get('archive', base['name']))
+                        stats['unchanged'] += 1
+                    elif writer:
+                        writer.add_file(src, relative)
+                        entry['stored'] = 'bundle'
+                        stats['bundle'] += 1
+                    else:
+                        entry['stored'] = self._place(src, os.path.join(archive_path, relative), digest, blobs)
+                        stats[entry['stored']] += 1
+                    stats['files'] += 1
+                    stats['bytes'] += stat.st_size
+                    entries.append(entry)
+                    progress(i * 100 / len(files), f'Archived {relative}')
+
+                self._save_json('hashes.json', hashes)
+                self._save_json('blobs.json', blobs)
+
+            manifest = {
+                'version': MANIFEST_VERSION,
+                'name': name,
+                'project': project,
+                'created': datetime.now().isoformat(),
+                'base': base['name'] if base else None,
+                'items': archived,
+                'stats': stats,
+                'files': entries
+            }
+            if writer:
+                writer.add_bytes(MANIFEST_NAME, json.dumps(manifest, indent=1).encode('utf-8'))
+                manifest['bundle'] = writer.close()
+                writer = None
+        except BaseException:
+            if writer:
+                writer.abort()
+            raise
+
+        self._write_manifest(archive_path, manifest)
+        return {'archivePath': archive_path, 'archived': archived, 'base': manifest['base'],
+                'bundle': manifest.get('bundle'), 'stats': stats}
+
+    def _walk(self, items: List[str], archive_path: Optional[str]) -> Iterator[Tuple[str, os.stat_result]]:
+        """
+        Files under the items as (project-relative path, stat).
+
+        When archive_path is given, the items' folders (empty ones too) are
+        created in it.
+        """
+        for item in items:
+            src = os.path.join(self.project_root, item)
+            if not os.path.isdir(src):
+                yield item.replace(os.sep, '/'), os.stat(src)
+                continue
+            for root, dirs, names in os.walk(src):
+                relative_root = os.path.relpath(root, self.project_root)
+                if archive_path:
+                    os.makedirs(os.path.join(archive_path, relative_root), exist_ok=True)
+                for file_name in sorted(names):
+                    path = os.path.join(root, file_name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        # Broken symlink
+                        continue
+                    yield os.path.join(relative_root, file_name).replace(os.sep, '/'), stat
+
+    def _place(self, src: str, dest: str, digest: str, blobs: Dict[str, Any]) -> str:
+        """Put one file into the archive; returns how it was stored."""
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        if os.path.lexists(dest):
+            # Archiving twice in the same minute reuses the folder
+            remove_file(dest)
+        if self._reflinks:
+            try:
+                reflink(src, dest)
+                return 'reflink'
+            except OSError as e:
+                if e.errno not in UNSUPPORTED:
+                    raise
+                self._reflinks = False
+
+        blob_path = self._blob_path(digest)
+        try:
+            if not self._blob_intact(digest, blobs):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                tmp_path = f'{blob_path}.tmp'
+                shutil.copy2(src, tmp_path)
+                os.chmod(tmp_path, BLOB_MODE)
+                if os.path.lexists(blob_path):
+                    remove_file(blob_path)
+                os.replace(tmp_path, blob_path)
+                stat = os.stat(blob_path)
+                blobs[digest] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+            elif os.stat(blob_path).st_mode & 0o222:
+                # Made writable through one of its links (e.g. on Windows, to delete it)
+                os.chmod(blob_path, BLOB_MODE)
+            os.link(blob_path, dest)
+            return 'hardlink'
+        except OSError:
+            # No hard links here (e.g. FAT drives)
+            shutil.copy2(src, dest)
+            return 'copy'
+
+    def _blob_intact(self, digest: str, blobs: Dict[str, Any]) -> bool:
+        """Whether a blob exists and was not edited through one of its links since it was stored."""
+        known = blobs.get(digest)
+        try:
+            stat = os.stat(self._blob_path(digest))
+        except FileNotFoundError:
+            return False
+        return bool(known) and (stat.st_size, stat.st_mtime_ns) == (known['size'], known['mtime_ns'])
+
+    def _write_manifest(self, archive_path: str, manifest: Dict[str, Any]) -> None:
+        tmp_path = os.path.join(archive_path, f'{MANIFEST_NAME}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp_path, os.path.join(archive_path, MANIFEST_NAME))
+
+    # ---- Reading ----
+
+    def manifest(self, name: str) -> Optional[Dict[str, Any]]:
+        """The manifest of an archive, or None for archives made without one."""
+        try:
+            with open(os.path.join(self.archive_dir, name, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def previous_archive(self, project: Optional[str], exclude: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """The manifest of the project's most recent archive, or None."""
+        latest = None
+        if project and os.path.isdir(self.archive_dir):
+            for name in os.listdir(self.archive_dir):
+                if name == exclude or name.startswith('.'):
+                    continue
+                manifest = self.manifest(name)
+                if manifest and manifest.get('project') == project and \
+                        (latest is None or manifest['created'] > latest['created']):
+                    latest = manifest
+        return latest
+
+    def bundle_path(self, name: str) -> Optional[str]:
+        """Path of an archive's bundle, or None for a folder archive."""
+        manifest = self.manifest(name)
+        if not manifest or not manifest.get('bundle'):
+            return None
+        path = os.path.join(self.archive_dir, name, manifest['bundle']['file'])
+        return path if os.path.isfile(path) else None
+
+    # ---- Housekeeping ----
+
+    def prune(self) -> None:
+        """Drop blobs no archive links to any more (their archives were deleted)."""
+        with self._lock:
+            blobs = self._load_json('blobs.json')
+            for digest in list(blobs):
+                try:
+                    if os.stat(self._blob_path(digest)).st_nlink <= 1:
+                        remove_file(self._blob_path(digest))
+                        del blobs[digest]
+                except FileNotFoundError:
+                    del blobs[digest]
+            self._save_json('blobs.json', blobs)
+
+    # ---- Internals ----
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def _load_json(self, name: str) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.store_dir, name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_json(self, name: str, data: Dict[str, Any]) -> None:
+        os.makedirs(self.store_dir, exist_ok=True)
+        path = os.path.join(self.store_dir, name)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+
+# Singleton instance
+_archive_engine: Optional[ArchiveEngine] = None
+
+
+def get_archive_engine(project_root: Optional[str] = None) -> ArchiveEngine:
+    """
+    Get or create the ArchiveEngine singleton.
+
+    Args:
+        project_root: Path to project root (required on first call)
+
+    Returns:
+        ArchiveEngine instance
+    """
+    global _archive_engine
+
+    if _archive_engine is None:
+        if project_root is None:
+            raise ValueError("project_root required for first initialization")
+        _archive_engine = ArchiveEngine(project_root)
+
+    return _archive_engine
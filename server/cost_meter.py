@@ -0,0 +1,177 @@
+"""
+Live Cost Meter for Simple Claude Conductor
+
+Follows the session log of the active Claude run (and subagent logs as they
+appear) by offset polling, folding each new usage record into running token
+and cost totals. The latest snapshot is published on the SSE stream so
+operators can watch spend per minute and cancel runaway runs early.
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from scripts.pricing import request_cost
+from scripts.session_parser import new_seen_set, read_usage
+from scripts.usage_warehouse import subagent_id
+
+
+def session_logs(log_dir: Path, session_id: str) -> List[Path]:
+    """Main log of a session followed by its subagent logs (nested ones included)."""
+    subagent_dir = log_dir / session_id / 'subagents'
+    paths = [log_dir / f'{session_id}.jsonl']
+    if subagent_dir.is_dir():
+        paths += sorted(subagent_dir.rglob('*.jsonl'))
+    return paths
+
+
+def log_offsets(log_dir: Path, session_id: str) -> Dict[Path, int]:
+    """
+    Current size of each log of a session.
+
+    Taken before a resumed session is started, so the meter skips what its
+    earlier runs already wrote.
+    """
+    offsets = {}
+    for path in session_logs(Path(log_dir), session_id):
+        try:
+            offsets[path] = path.stat().st_size
+        except OSError:
+            pass
+    return offsets
+
+
+class CostMeter:
+    """
+    Tails one Claude session's logs on a background thread.
+
+    A new session is metered from the start of its logs; a resumed one from
+    the offsets given to start(), so it reports the spend of the current run
+    rather than of the whole session.
+    """
+
+    # Seconds between log polls
+    POLL_INTERVAL = 3
+
+    # Window for the spend-per-minute rate (seconds)
+    RATE_WINDOW = 60
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._snapshot: Optional[Dict[str, Any]] = None
+
+    def start(self, log_dir: Path, session_id: str, is_running: Callable[[], bool],
+              offsets: Optional[Dict[Path, int]] = None) -> None:
+        """
+        Start metering a run.
+
+        Args:
+            log_dir: Claude project directory the session logs to
+            session_id: Session of the run
+            is_running: Returns False once the Claude process has exited
+            offsets: Log offsets to start from, from log_offsets() taken before
+                a resumed session was started (None for a new session)
+        """
+        self.stop()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(Path(log_dir), session_id, is_running, dict(offsets or {}),
+                                              self._stop),
+                                        name='cost-meter', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop metering; the last snapshot stays available."""
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.POLL_INTERVAL + 1)
+        self._thread = None
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """Latest totals of the current or last run, or None before the first run."""
+        with self._lock:
+            return dict(self._snapshot) if self._snapshot else None
+
+    def _run(self, log_dir: Path, session_id: str, is_running: Callable[[], bool], offsets: Dict[Path, int],
+             stop: threading.Event) -> None:
+        main_log = log_dir / f'{session_id}.jsonl'
+        subagent_dir = log_dir / session_id / 'subagents'
+
+        started = time.time()
+        totals = {'input_tokens': 0, 'output_tokens': 0, 'cache_read': 0, 'cache_write': 0}
+        cost = 0.0
+        messages = 0
+        model = None
+        agents = set()
+        # Claude logs a streamed message once per content block
+        seen = new_seen_set('exact')
+        history = deque([(started, 0.0)])
+
+        while True:
+            running = is_running() and not stop.is_set()
+            for path in session_logs(log_dir, session_id):
+                records, offsets[path] = read_usage(str(path), offsets.get(path, 0), seen)
+                for record in records:
+                    for field in totals:
+                        totals[field] += record[field]
+                    cost += request_cost(record['model'], *(record[field] for field in totals), record['timestamp'])
+                    messages += 1
+                    if path == main_log:
+                        model = record['model']
+                    else:
+                        agents.add(subagent_id(path, subagent_dir))
+
+            now = time.time()
+            history.append((now, cost))
+            while len(history) > 2 and history[1][0] <= now - self.RATE_WINDOW:
+                history.popleft()
+            window_start, window_cost = history[0]
+            elapsed = now - started
+
+            with self._lock:
+                self._snapshot = {
+                    'sessionId': session_id,
+                    'running': running,
+                    'startedAt': datetime.fromtimestamp(started).isoformat(),
+                    'updatedAt': datetime.fromtimestamp(now).isoformat(),
+                    'elapsedSeconds': round(elapsed, 1),
+                    'cost': round(cost, 4),
+                    'costPerMinute': round((cost - window_cost) / (now - window_start) * 60, 4)
+                    if now > window_start else 0,
+                    'averagePerMinute': round(cost / elapsed * 60, 4) if elapsed > 0 else 0,
+                    'messages': messages,
+                    'subagents': len(agents),
+                    'model': model,
+                    'tokens': {
+                        'input': totals['input_tokens'],
+                        'output': totals['output_tokens'],
+                        'cacheRead': totals['cache_read'],
+                        'cacheWrite': totals['cache_write']
+                    }
+                }
+
+            if not running or stop.wait(self.POLL_INTERVAL):
+                break
+
+
+# Singleton instance
+_cost_meter: Optional[CostMeter] = None
+
+
+def get_cost_meter() -> CostMeter:
+    """
+    Get or create the CostMeter singleton.
+
+    Returns:
+        CostMeter instance
+    """
+    global _cost_meter
+
+    if _cost_meter is None:
+        _cost_meter = CostMeter()
+
+    return _cost_meter
@@ -0,0 +1,148 @@
+"""
+Executor Backends for Simple Claude Conductor
+
+An executor turns a prompt into the command line that ProcessManager spawns.
+The real Claude CLI is one backend; the bundled simulator is another, so the
+conductor can be exercised end to end without the CLI or a network.
+"""
+
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+
+class Executor:
+    """
+    Base class for executor backends.
+
+    Subclasses only build the command line - ProcessManager still owns the
+    subprocess, PID tracking, output capture and exit monitoring.
+    """
+
+    name = 'base'
+
+    def build_command(self, prompt: str, session_id: str, resume: bool) -> List[str]:
+        """
+        Build the command to run a prompt.
+
+        Args:
+            prompt: Command/prompt to send to Claude
+            session_id: Session id to start, or to resume when resume is True
+            resume: Whether to continue an existing session
+
+        Returns:
+            Command as a list of arguments
+        """
+        raise NotImplementedError
+
+    def not_found_message(self) -> str:
+        """Error shown when the executable cannot be found."""
+        return f"Executor '{self.name}' could not be started."
+
+    def projects_dir(self) -> Optional[str]:
+        """Claude projects dir the backend logs sessions under, or None for the CLI's default."""
+        return None
+
+
+class ClaudeCLIExecutor(Executor):
+    """Runs prompts through the real `claude` CLI in print mode."""
+
+    name = 'claude'
+
+    def build_command(self, prompt: str, session_id: str, resume: bool) -> List[str]:
+        if resume:
+            return ['claude', '-p', prompt, '--resume', session_id]
+        return ['claude', '-p', prompt, '--session-id', session_id]
+
+    def not_found_message(self) -> str:
+        return "Claude CLI not found. Please ensure 'claude' is installed and in PATH."
+
+
+class SimulatorExecutor(Executor):
+    """
+    Runs prompts through the bundled fake-Claude simulator (server/simulator.py).
+
+    The simulator prints output at a fixed rate, edits the project files the
+    way Claude would and writes a session JSONL log with realistic usage
+    records. Token counts follow the seed and prompt; ids and timestamps are
+    fresh on every run.
+    """
+
+    name = 'simulator'
+
+    SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'simulator.py')
+
+    DEFAULTS = {
+        'linesPerSecond': 20.0,
+        'durationSeconds': 5.0,
+        'exitCode': 0,
+        'phases': 3,
+        'questions': False,
+        'seed': 0,
+        'model': 'claude-sonnet-4-20250514',
+        'projectsDir': None,
+    }
+
+    def __init__(self, **options: Any):
+        """
+        Initialize simulator executor.
+
+        Args:
+            **options: Overrides for DEFAULTS (camelCase, as in project-config.json)
+        """
+        unknown = set(options) - set(self.DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown simulator options: {sorted(unknown)}")
+        self.options = {**self.DEFAULTS, **options}
+
+    def build_command(self, prompt: str, session_id: str, resume: bool) -> List[str]:
+        opts = self.options
+        cmd = [
+            sys.executable, self.SCRIPT,
+            '-p', prompt,
+            '--resume' if resume else '--session-id', session_id,
+            '--rate', str(opts['linesPerSecond']),
+            '--duration', str(opts['durationSeconds']),
+            '--exit-code', str(opts['exitCode']),
+            '--phases', str(opts['phases']),
+            '--seed', str(opts['seed']),
+            '--model', opts['model'],
+        ]
+        if opts['questions']:
+            cmd.append('--questions')
+        if opts['projectsDir']:
+            cmd.extend(['--projects-dir', opts['projectsDir']])
+        return cmd
+
+    def not_found_message(self) -> str:
+        return f"Simulator script not found at {self.SCRIPT}"
+
+    def projects_dir(self) -> Optional[str]:
+        return self.options['projectsDir']
+
+
+EXECUTORS = {
+    ClaudeCLIExecutor.name: ClaudeCLIExecutor,
+    SimulatorExecutor.name: SimulatorExecutor,
+}
+
+
+def create_executor(name: str = 'claude', options: Optional[Dict[str, Any]] = None) -> Executor:
+    """
+    Create an executor backend by name.
+
+    Args:
+        name: Backend name ('claude' or 'simulator')
+        options: Backend-specific options (only used by the simulator)
+
+    Returns:
+        Executor instance
+
+    Raises:
+        ValueError: If the backend name or options are unknown
+    """
+    if name not in EXECUTORS:
+        raise ValueError(f"Unknown executor: {name}. Must be one of {sorted(EXECUTORS)}")
+    if name == SimulatorExecutor.name:
+        return SimulatorExecutor(**(options or {}))
+    return EXECUTORS[name]()
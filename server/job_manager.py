@@ -0,0 +1,214 @@
+"""
+Job Manager for Simple Claude Conductor
+
+Runs slow server-side work (cost reports, archiving, file processing) on a
+background thread pool so HTTP requests return immediately. Job progress is
+published on the SSE stream.
+"""
+
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+class JobConflict(Exception):
+    """A job was submitted as new while a matching one is still active."""
+
+    def __init__(self, job: 'Job'):
+        super().__init__(f"Another '{job.kind}' job is already {job.status}")
+        self.job = job
+
+
+class Job:
+    """
+    A unit of background work with progress reporting.
+
+    Status moves queued → running → done | error.
+    """
+
+    def __init__(self, kind: str, key: Optional[str] = None):
+        """
+        Initialize Job.
+
+        Args:
+            kind: Job type (e.g. 'cost_report')
+            key: Optional identity; an active job with the same kind and
+                key is reused instead of starting a duplicate, and jobs
+                sharing a key run one at a time whatever their kind
+        """
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.key = key
+        self.status = 'queued'
+        self.progress = 0
+        self.message = 'Queued'
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created = datetime.now()
+        self.finished: Optional[datetime] = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in ('queued', 'running')
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serialisable view of the job."""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': self.progress,
+            'message': self.message,
+            'result': self.result,
+            'error': self.error,
+            'created': self.created.isoformat(),
+            'finished': self.finished.isoformat() if self.finished else None,
+        }
+
+
+class JobManager:
+    """
+    Thread-pool backed job runner.
+
+    Job functions are called as func(progress, *args, **kwargs), where
+    progress(percent, message) updates the job's reported progress.
+    """
+
+    # Finished jobs kept for status queries
+    MAX_FINISHED = 50
+
+    # Finished jobs stay on the SSE stream for this long (seconds)
+    RECENT_SECONDS = 30
+
+    def __init__(self, max_workers: int = 2):
+        """
+        Initialize JobManager.
+
+        Args:
+            max_workers: Jobs that may run at the same time
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='conductor-job')
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.RLock()
+        # Key -> lock held while a job with that key runs
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    def submit(self, kind: str, func: Callable[..., Any], *args, key: Optional[str] = None,
+               reuse: bool = True, **kwargs) -> Job:
+        """
+        Queue a job, or return the matching active one.
+
+        Args:
+            kind: Job type
+            func: Callable taking (progress, *args, **kwargs); its return
+                value becomes the job result
+            key: Identity used to de-duplicate concurrent identical jobs;
+                jobs of any kind sharing a key never run at the same time
+            reuse: Return a matching active job; when False, raise instead
+                (for jobs whose arguments differ between requests)
+
+        Returns:
+            The queued (or already active) job
+
+        Raises:
+            JobConflict: If reuse is False and a matching job is active
+        """
+        with self._lock:
+            existing = self.find_active(kind, key)
+            if existing:
+                if not reuse:
+                    raise JobConflict(existing)
+                return existing
+
+            job = Job(kind, key)
+            self._jobs[job.id] = job
+            self._prune()
+
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def _run(self, job: Job, func: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        def progress(percent: float, message: Optional[str] = None) -> None:
+            job.progress = max(0, min(100, int(percent)))
+            if message:
+                job.message = message
+
+        key_lock = None
+        if job.key is not None:
+            with self._lock:
+                key_lock = self._key_locks.setdefault(job.key, threading.Lock())
+            if not key_lock.acquire(blocking=False):
+                job.message = 'Waiting for another job to finish'
+                key_lock.acquire()
+
+        job.status = 'running'
+        job.message = 'Running'
+        try:
+            job.result = func(progress, *args, **kwargs)
+            job.progress = 100
+            job.status = 'done'
+            job.message = 'Done'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'error'
+            job.message = f'Failed: {e}'
+        finally:
+            job.finished = datetime.now()
+            if key_lock:
+                key_lock.release()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by id."""
+        return self._jobs.get(job_id)
+
+    def find_active(self, kind: str, key: Optional[str] = None) -> Optional[Job]:
+        """Get the queued or running job of a kind (and key), if any."""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.active and job.kind == kind and job.key == key:
+                    return job
+        return None
+
+    def list(self, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """All known jobs, newest first."""
+        with self._lock:
+            jobs = [j for j in self._jobs.values() if kind is None or j.kind == kind]
+        jobs.sort(key=lambda j: j.created, reverse=True)
+        return [j.to_dict() for j in jobs]
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Active and recently finished jobs, for the SSE stream."""
+        now = datetime.now()
+        with self._lock:
+            jobs = [
+                j for j in self._jobs.values()
+                if j.active or (j.finished and (now - j.finished).total_seconds() < self.RECENT_SECONDS)
+            ]
+        jobs.sort(key=lambda j: j.created)
+        return [j.to_dict() for j in jobs]
+
+    def _prune(self) -> None:
+        finished = sorted((j for j in self._jobs.values() if not j.active), key=lambda j: j.created)
+        for job in finished[:max(0, len(finished) - self.MAX_FINISHED)]:
+            del self._jobs[job.id]
+
+
+# Singleton instance
+_job_manager: Optional[JobManager] = None
+
+
+def get_job_manager() -> JobManager:
+    """
+    Get or create the JobManager singleton.
+
+    Returns:
+        JobManager instance
+    """
+    global _job_manager
+
+    if _job_manager is None:
+        _job_manager = JobManager()
+
+    return _job_manager
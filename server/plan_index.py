@@ -0,0 +1,303 @@
+"""
+Plan Index for Simple Claude Conductor
+
+Parses docs/planning/task-plan.md into structured phases: number, title,
+status, task checkboxes, success criteria, dependencies and estimated
+size. The index is rebuilt in one pass over the file's lines only when the
+file's fingerprint (modification time and size) changes, and is shared by
+the state machine, GET /api/plan and the SSE stream.
+
+Each parse is tagged with a hash of the plan, used as the HTTP ETag, and
+the index before the latest change is kept so clients that saw it get only
+the phases that changed.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+# "## Phase 2: Title" or "### Phase 2 - Title"
+PHASE_HEADER = re.compile(r'#{2,3}\s+Phase\s+(\d+)[:\s-]+(.+)')
+# "**Label**: value" or "**Label:** value"
+LABELED_LINE = re.compile(r'\*\*([^*:]+?):?\*\*:?\s*(.*)')
+# "- [ ] item", "* [x] item" or "1. [x] item"
+CHECKBOX = re.compile(r'\s*(?:[-*+]|\d+\.)\s+\[([ xX])\]\s+(.*)')
+# "- item" or "1. item"
+BULLET = re.compile(r'\s*(?:[-*+]|\d+\.)\s+(.*)')
+# A size written into the phase title, e.g. "(1-2 hours)"
+TITLE_ESTIMATE = re.compile(r'\s*\(([\d.]+(?:\s*[-–]\s*[\d.]+)?\s*'
+                            r'(?:min(?:ute)?s?|h|hrs?|hours?|days?|weeks?|points?|pts))\)\s*$', re.IGNORECASE)
+PHASE_REFERENCE = re.compile(r'Phase\s+(\d+)', re.IGNORECASE)
+
+# Labels (lower case) that start each phase section
+CRITERIA_LABELS = ('success criteria', 'acceptance criteria', 'done when')
+DEPENDENCY_LABELS = ('dependencies', 'depends on', 'prerequisites')
+ESTIMATE_LABELS = ('estimated size', 'estimate', 'estimated effort', 'effort', 'size', 'estimated time')
+
+# Phase fields compared when computing deltas
+PHASE_FIELDS = ('number', 'title', 'status', 'tasks', 'tasksDone', 'tasksTotal', 'criteria',
+                'dependencies', 'estimate')
+
+
+def _section(label: str) -> Optional[str]:
+    label = label.strip().lower()
+    if label in CRITERIA_LABELS:
+        return 'criteria'
+    if label in DEPENDENCY_LABELS:
+        return 'dependencies'
+    if label in ESTIMATE_LABELS:
+        return 'estimate'
+    if label == 'status':
+        return 'status'
+    return None
+
+
+def _dependencies(text: str) -> List[int]:
+    """Phase numbers named in a dependency line ('Phase 1, Phase 3' or '1, 3')."""
+    numbers = PHASE_REFERENCE.findall(text) or re.findall(r'\b(\d+)\b', text)
+    return [int(n) for n in numbers]
+
+
+def _finish_phase(phase: Dict[str, Any]) -> Dict[str, Any]:
+    """Derive counts and a status for a parsed phase."""
+    done = sum(1 for t in phase['tasks'] if t['done'])
+    total = len(phase['tasks'])
+    if phase['status'] is None:
+        phase['status'] = ('complete' if total and done == total else
+                           'in_progress' if done else 'pending')
+    phase['tasksDone'] = done
+    phase['tasksTotal'] = total
+    phase['dependencies'] = sorted(set(phase['dependencies']))
+    return phase
+
+
+def parse_plan(content: str) -> Dict[str, Any]:
+    """
+    Parse task-plan.md.
+
+    Args:
+        content: File contents
+
+    Returns:
+        Dict with title (the first level-1 heading) and phases: dicts with
+        number, title, status (the Status field, else derived from the
+        checkboxes), tasks (text, done), tasksDone, tasksTotal, criteria
+        (text, done: None for plain bullets), dependencies (phase numbers)
+        and estimate
+    """
+    title = None
+    phases = []
+    phase = None
+    level = 0
+    section = None
+
+    for line in content.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if stripped.startswith('#'):
+            header = PHASE_HEADER.match(stripped)
+            if header:
+                if phase:
+                    phases.append(_finish_phase(phase))
+                phase_title = header.group(2).strip()
+                estimate = TITLE_ESTIMATE.search(phase_title)
+                phase = {
+                    'number': int(header.group(1)),
+                    'title': phase_title[:estimate.start()].strip() if estimate else phase_title,
+                    'status': None,
+                    'tasks': [],
+                    'criteria': [],
+                    'dependencies': [],
+                    'estimate': estimate.group(1) if estimate else None
+                }
+                level = len(stripped) - len(stripped.lstrip('#'))
+                section = None
+                continue
+            if stripped.startswith('# ') and title is None and phase is None:
+                title = stripped[2:].strip()
+                continue
+            if phase and len(stripped) - len(stripped.lstrip('#')) <= level:
+                # A heading at the phase's level or above ends the phase
+                phases.append(_finish_phase(phase))
+                phase = None
+            elif phase:
+                # A subheading may start a section ("### Success Criteria")
+                section = _section(stripped.lstrip('#').strip().rstrip(':'))
+            continue
+        if phase is None:
+            continue
+
+        labeled = LABELED_LINE.match(stripped)
+        if labeled:
+            section = _section(labeled.group(1))
+            value = labeled.group(2).strip()
+            if section == 'status' and value:
+                phase['status'] = re.sub(r'[^a-z]+', '_', value.lower()).strip('_') or None
+            elif section == 'estimate' and value:
+                phase['estimate'] = value
+            elif section == 'dependencies' and value:
+                phase['dependencies'] += _dependencies(value)
+            continue
+
+        checkbox = CHECKBOX.match(line)
+        if checkbox:
+            item = {'text': checkbox.group(2).strip(), 'done': checkbox.group(1) != ' '}
+            (phase['criteria'] if section == 'criteria' else phase['tasks']).append(item)
+            continue
+        bullet = BULLET.match(line)
+        if bullet:
+            text = bullet.group(1).strip()
+            if section == 'criteria':
+                phase['criteria'].append({'text': text, 'done': None})
+            elif section == 'dependencies':
+                phase['dependencies'] += _dependencies(text)
+            elif section == 'estimate' and not phase['estimate']:
+                phase['estimate'] = text
+
+    if phase:
+        phases.append(_finish_phase(phase))
+    return {'title': title, 'phases': phases}
+
+
+def plan_delta(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Phases that changed between two plan indexes.
+
+    Returns:
+        Dict with etag, since (the previous etag), changed (full phase
+        dicts that are new or differ), removed (phase numbers), order
+        (phase numbers as they now appear), title and totals
+    """
+    before = {p['number']: p for p in previous['phases']}
+    after = {p['number']: p for p in current['phases']}
+    return {
+        'etag': current['etag'],
+        'since': previous['etag'],
+        'changed': [p for n, p in after.items()
+                    if n not in before or any(before[n][f] != p[f] for f in PHASE_FIELDS)],
+        'removed': [n for n in before if n not in after],
+        'order': [p['number'] for p in current['phases']],
+        'title': current['title'],
+        'totals': current['totals']
+    }
+
+
+class PlanIndex:
+    """
+    Cached, structured view of task-plan.md.
+
+    Thread-safe; the file is only re-read when its fingerprint changes.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize PlanIndex.
+
+        Args:
+            path: Path to task-plan.md
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._fingerprint: Optional[str] = None
+        self._index: Optional[Dict[str, Any]] = None
+        self._previous: Optional[Dict[str, Any]] = None
+
+    def fingerprint(self) -> Optional[str]:
+        """Modification time and size of the plan, or None if it does not exist."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return f'{stat.st_mtime_ns}-{stat.st_size}'
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Get the plan index, re-parsing the plan only if it changed.
+
+        Returns:
+            Dict with exists, etag, title, phases (see parse_plan) and
+            totals (phases, complete, tasksDone, tasksTotal)
+        """
+        fingerprint = self.fingerprint()
+        with self._lock:
+            if self._index is not None and self._fingerprint == fingerprint:
+                return self._index
+
+            content = ''
+            if fingerprint is not None:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        content = f.read()
+                except OSError:
+                    fingerprint = None
+            etag = hashlib.sha1(content.encode('utf-8')).hexdigest()[:16] if fingerprint else 'none'
+            if self._index is not None and self._index['etag'] == etag:
+                # Touched but unchanged
+                self._fingerprint = fingerprint
+                return self._index
+
+            plan = parse_plan(content)
+            phases = plan['phases']
+            self._previous = self._index
+            self._fingerprint = fingerprint
+            self._index = {
+                'exists': fingerprint is not None,
+                'etag': etag,
+                'title': plan['title'],
+                'phases': phases,
+                'totals': {
+                    'phases': len(phases),
+                    'complete': sum(1 for p in phases if p['status'] == 'complete'),
+                    'tasksDone': sum(p['tasksDone'] for p in phases),
+                    'tasksTotal': sum(p['tasksTotal'] for p in phases)
+                }
+            }
+            return self._index
+
+    def delta(self, since: Optional[str]) -> Dict[str, Any]:
+        """
+        Changes since the index a client last saw.
+
+        Args:
+            since: ETag the client has, or None
+
+        Returns:
+            A delta (see plan_delta) when `since` is the index before the
+            latest change, an empty delta when it is current, else the full
+            index with full=True
+        """
+        index = self.load()
+        with self._lock:
+            previous = self._previous
+        if since == index['etag']:
+            return plan_delta(index, index)
+        if previous is not None and since == previous['etag']:
+            return plan_delta(previous, index)
+        return {**index, 'full': True}
+
+
+# Singleton instance
+_plan_index: Optional[PlanIndex] = None
+
+
+def get_plan_index(path: Optional[str] = None) -> PlanIndex:
+    """
+    Get or create the PlanIndex singleton.
+
+    Args:
+        path: Path to task-plan.md (required on first call)
+
+    Returns:
+        PlanIndex instance
+    """
+    global _plan_index
+
+    if _plan_index is None:
+        if path is None:
+            raise ValueError("path required for first initialization")
+        _plan_index = PlanIndex(path)
+
+    return _plan_index
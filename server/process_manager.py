@@ -10,9 +10,12 @@ import sys
 import threading
 import queue
 import os
+import uuid
 from datetime import datetime
 from typing import Optional, List, Callable
 
+from .executors import Executor, ClaudeCLIExecutor
+
 
 class ProcessManager:
     """
@@ -24,31 +27,62 @@ class ProcessManager:
     - Proper Windows console handling
     - Timeout detection
     - Crash detection
+    - Session id tracking so follow-up runs can resume a session
+    - Pluggable executor backend (real CLI or simulator)
     - Thread-safe operations
     """
 
-    def __init__(self):
-        """Initialize ProcessManager."""
+    def __init__(self, executor: Optional[Executor] = None):
+        """
+        Initialize ProcessManager.
+
+        Args:
+            executor: Backend that builds the command (defaults to the Claude CLI)
+        """
+        self.executor: Executor = executor or ClaudeCLIExecutor()
         self.process: Optional[subprocess.Popen] = None
         self.output_queue: queue.Queue = queue.Queue()
         self.output_thread: Optional[threading.Thread] = None
         self.start_time: Optional[datetime] = None
+        self.session_id: Optional[str] = None
         self._lock = threading.RLock()
         self._on_exit_callback: Optional[Callable[[int], None]] = None
 
+    def set_executor(self, executor: Executor) -> None:
+        """
+        Switch the executor backend used for subsequent runs.
+
+        Args:
+            executor: Backend that builds the command
+
+        Raises:
+            RuntimeError: If Claude is running
+        """
+        with self._lock:
+            if self.is_running():
+                raise RuntimeError("Cannot switch executor while Claude is running")
+            self.executor = executor
+
     def start_claude(
         self,
         prompt: str,
         working_dir: str,
-        new_console: bool = True
+        new_console: bool = True,
+        resume_session_id: Optional[str] = None
     ) -> int:
         """
         Start Claude with given prompt.
 
+        Every run is pinned to a known session id: fresh runs are started
+        with a generated ``--session-id``, follow-up runs pass ``--resume``
+        so Claude continues the earlier conversation and its prompt cache.
+        The command itself is built by the configured executor backend.
+
         Args:
             prompt: Command/prompt to send to Claude
             working_dir: Project root directory
             new_console: Whether to open a new console window (Windows)
+            resume_session_id: Session to resume instead of starting cold
 
         Returns:
             Process ID
@@ -68,7 +102,8 @@ class ProcessManager:
                     break
 
             # Build command
-            cmd = ['claude', '-p', prompt]
+            session_id = resume_session_id or str(uuid.uuid4())
+            cmd = self.executor.build_command(prompt, session_id, resume=resume_session_id is not None)
 
             # Platform-specific subprocess creation
             kwargs = {
@@ -95,10 +130,9 @@ class ProcessManager:
             try:
                 self.process = subprocess.Popen(cmd, **kwargs)
                 self.start_time = datetime.now()
+                self.session_id = session_id
             except FileNotFoundError:
-                raise RuntimeError(
-                    "Claude CLI not found. Please ensure 'claude' is installed and in PATH."
-                )
+                raise RuntimeError(self.executor.not_found_message())
 
             # Start output reader thread (only if we're capturing output)
             if 'stdout' in kwargs:
@@ -174,6 +208,15 @@ class ProcessManager:
             return None
         return self.process.pid
 
+    def get_session_id(self) -> Optional[str]:
+        """
+        Get the Claude session id of the current or most recent run.
+
+        Returns:
+            Session id or None if nothing has been started
+        """
+        return self.session_id
+
     def get_return_code(self) -> Optional[int]:
         """
         Get process return code.
@@ -250,6 +293,7 @@ class ProcessManager:
         with self._lock:
             self.process = None
             self.start_time = None
+            self.session_id = None
             self._on_exit_callback = None
             # Clear output queue
             while not self.output_queue.empty():
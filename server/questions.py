@@ -0,0 +1,353 @@
+"""
+Questions File for Simple Claude Conductor
+
+Claude asks for clarification by writing Questions_For_You.md. The file is
+parsed in one pass over its lines into structured questions, and the result
+is cached on the file's fingerprint (modification time and size), so the UI
+poll, the SSE stream and the state machine share a single parse per change.
+
+While Claude runs, a watcher thread polls the fingerprint and reports each
+change, so new questions surface as a state transition instead of as a side
+effect of reading them.
+
+Answers are written back by splicing them into the spans recorded by the
+parse, all in one pass, and the file is replaced atomically (temp file +
+rename) so Claude never reads a half-written file. After a save the spans
+are shifted rather than re-scanned, which keeps per-keystroke draft saves
+cheap.
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# "### Question 3: Topic" starts a question...
+QUESTION_HEADER = re.compile(r'### Question (\d+):\s*(.*)')
+# ...this label starts its answer...
+ANSWER_LABEL = '**Your Answer:**'
+# ...and the answer runs to the next question or a horizontal rule
+SECTION_BREAK = '---'
+
+# Written for a blank answer, and what skipping fills unanswered questions with
+PLACEHOLDER = '_____'
+SKIPPED = '(Skipped - Claude will decide)'
+
+
+def is_unanswered(answer: str) -> bool:
+    """Check whether an answer is still the blank placeholder (empty or underscores)."""
+    return not answer.strip('_ \t\r\n')
+
+
+def scan_questions(content: str) -> Tuple[List[Dict[str, Any]], List[Optional[List[int]]]]:
+    """
+    Parse the questions of Questions_For_You.md and locate their answers.
+
+    Args:
+        content: File contents
+
+    Returns:
+        Tuple of (questions, spans). Questions are dicts with number, topic,
+        question and answer ('' while unanswered), in file order. Each span
+        is the [start, end) offset of a question's answer text in content:
+        from after the answer label to the end of its last non-blank line,
+        or None when the question has no answer label.
+    """
+    questions = []
+    spans = []
+    current = None
+    in_answer = False
+
+    def finish():
+        if current is not None:
+            answer = '\n'.join(current['answer']).strip()
+            questions.append({
+                'number': current['number'],
+                'topic': current['topic'],
+                'question': '\n'.join(current['question']).strip(),
+                'answer': '' if is_unanswered(answer) else answer
+            })
+            spans.append(current['span'])
+
+    offset = 0
+    for raw in content.splitlines(keepends=True):
+        start = offset
+        offset += len(raw)
+        line = raw.rstrip('\r\n')
+        if line.startswith('### Question'):
+            header = QUESTION_HEADER.match(line)
+            if header:
+                finish()
+                current = {'number': int(header.group(1)), 'topic': header.group(2).strip(),
+                           'question': [], 'answer': [], 'span': None}
+                in_answer = False
+                continue
+        if current is None:
+            continue
+        if line.startswith(SECTION_BREAK):
+            finish()
+            current = None
+        elif line.startswith(ANSWER_LABEL) and not in_answer:
+            in_answer = True
+            current['answer'].append(line[len(ANSWER_LABEL):])
+            current['span'] = [start + len(ANSWER_LABEL), start + len(line)]
+        elif in_answer:
+            current['answer'].append(line)
+            if line.strip():
+                current['span'][1] = start + len(line)
+        else:
+            current['question'].append(line)
+    finish()
+    return questions, spans
+
+
+def parse_questions(content: str) -> List[Dict[str, Any]]:
+    """
+    Parse the questions of Questions_For_You.md.
+
+    Returns:
+        List of dicts with number, topic, question and answer, as for
+        scan_questions
+    """
+    return scan_questions(content)[0]
+
+
+def format_answer(answer: str) -> Tuple[List[str], str]:
+    """
+    Prepare an answer for writing after its label.
+
+    Lines that would read as a new question, answer label or section break
+    are indented by a space so the answer cannot change the file's structure.
+
+    Returns:
+        Tuple of (lines to write, answer as a re-parse would read it)
+    """
+    lines = (answer or '').replace('\r\n', '\n').replace('\r', '\n').strip().split('\n')
+    lines = [' ' + line if line.startswith(('### Question', ANSWER_LABEL, SECTION_BREAK)) else line
+             for line in lines]
+    value = '\n'.join(lines).strip()
+    if is_unanswered(value):
+        return [PLACEHOLDER], ''
+    return lines, value
+
+
+class QuestionsFile:
+    """
+    Cached, structured view of Questions_For_You.md.
+
+    Thread-safe; the file is only re-read when its fingerprint changes.
+    """
+
+    # Seconds between fingerprint checks while watching
+    POLL_INTERVAL = 2
+
+    def __init__(self, path: str):
+        """
+        Initialize QuestionsFile.
+
+        Args:
+            path: Path to Questions_For_You.md
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self._cache: Optional[Dict[str, Any]] = None
+        # Raw text of the cached parse and its answer spans, for write-back
+        self._content = ''
+        self._spans: List[Optional[List[int]]] = []
+
+    def fingerprint(self) -> Optional[str]:
+        """Modification time and size of the file, or None if it does not exist."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return f'{stat.st_mtime_ns}-{stat.st_size}'
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Get the parsed questions, re-reading the file only if it changed.
+
+        Returns:
+            Dict with exists, fingerprint, questions, count and unanswered
+        """
+        with self._lock:
+            return self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        fingerprint = self.fingerprint()
+        if self._cache is not None and self._cache['fingerprint'] == fingerprint:
+            return self._cache
+
+        content = ''
+        if fingerprint is not None:
+            try:
+                # Keep line endings as written, so spans are offsets into the file
+                with open(self.path, 'r', encoding='utf-8', newline='') as f:
+                    content = f.read()
+            except OSError:
+                fingerprint = None
+        questions, self._spans = scan_questions(content)
+        self._content = content
+        self._publish(fingerprint, questions)
+        return self._cache
+
+    def _publish(self, fingerprint: Optional[str], questions: List[Dict[str, Any]]) -> None:
+        self._cache = {
+            'exists': fingerprint is not None,
+            'fingerprint': fingerprint,
+            'questions': questions,
+            'count': len(questions),
+            'unanswered': sum(1 for q in questions if not q['answer'])
+        }
+
+    def save_answers(self, answers: Dict[Any, str]) -> Dict[str, Any]:
+        """
+        Write answers into the file, leaving everything else as it is.
+
+        Any subset of the questions may be saved (e.g. drafts as the user
+        types); a blank answer puts the placeholder back. All answers are
+        spliced in one pass and the file is replaced atomically.
+
+        Args:
+            answers: Question number (int or numeric string) -> answer text
+
+        Returns:
+            Dict with saved and unknown question numbers and the new fingerprint
+
+        Raises:
+            FileNotFoundError: If the questions file does not exist
+        """
+        with self._lock:
+            model = self._load()
+            if not model['exists']:
+                raise FileNotFoundError(self.path)
+
+            index = {}
+            for i, question in enumerate(model['questions']):
+                if self._spans[i] is not None:
+                    index.setdefault(question['number'], i)
+            edits = {}
+            unknown = []
+            for number, answer in answers.items():
+                try:
+                    i = index[int(number)]
+                except (KeyError, ValueError):
+                    unknown.append(number)
+                    continue
+                edits[i] = format_answer(answer)
+
+            if edits:
+                self._write(edits)
+            return {
+                'saved': sorted(model['questions'][i]['number'] for i in edits),
+                'unknown': unknown,
+                'fingerprint': self._cache['fingerprint']
+            }
+
+    def skip_unanswered(self, text: str = SKIPPED) -> Dict[str, Any]:
+        """
+        Fill every unanswered question with `text`, leaving given answers alone.
+
+        Returns:
+            As for save_answers
+
+        Raises:
+            FileNotFoundError: If the questions file does not exist
+        """
+        with self._lock:
+            model = self._load()
+            return self.save_answers({q['number']: text for q in model['questions'] if not q['answer']})
+
+    def _write(self, edits: Dict[int, Tuple[List[str], str]]) -> None:
+        """Splice formatted answers (by question index) into the file and shift the cached spans."""
+        content = self._content
+        newline = '\r\n' if '\r\n' in content else '\n'
+        pieces = []
+        position = 0
+        shift = 0
+        spans = []
+        questions = [dict(q) for q in self._cache['questions']]
+        for i, span in enumerate(self._spans):
+            if span is None:
+                spans.append(None)
+                continue
+            start, end = span
+            if i not in edits:
+                spans.append([start + shift, end + shift])
+                continue
+            lines, value = edits[i]
+            text = ' ' + newline.join(lines)
+            pieces += [content[position:start], text]
+            position = end
+            spans.append([start + shift, start + shift + len(text)])
+            shift += len(text) - (end - start)
+            questions[i]['answer'] = value
+        pieces.append(content[position:])
+        content = ''.join(pieces)
+
+        self._replace(content)
+        self._spans = spans
+        self._publish(self.fingerprint(), questions)
+
+    def reset(self, content: str) -> None:
+        """Replace the whole file (e.g. with a fresh template), atomically."""
+        with self._lock:
+            self._replace(content)
+            self._load()
+
+    def _replace(self, content: str) -> None:
+        """Write content to a temp file and rename it over the questions file."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+        os.replace(tmp_path, self.path)
+        self._content = content
+
+    def summary(self) -> Dict[str, Any]:
+        """Question counts and fingerprint, for clients deciding whether to re-fetch."""
+        model = self.load()
+        return {key: model[key] for key in ('fingerprint', 'count', 'unanswered')}
+
+    def watch(self, is_running: Callable[[], bool], on_change: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Report changes to the file on a background thread.
+
+        Args:
+            is_running: Watching stops once this returns False
+            on_change: Called with the parsed questions after each change
+        """
+        def run():
+            last = self.fingerprint()
+            while is_running():
+                fingerprint = self.fingerprint()
+                if fingerprint != last:
+                    last = fingerprint
+                    on_change(self.load())
+                time.sleep(self.POLL_INTERVAL)
+
+        threading.Thread(target=run, name='questions-watcher', daemon=True).start()
+
+
+# Singleton instance
+_questions_file: Optional[QuestionsFile] = None
+
+
+def get_questions_file(path: Optional[str] = None) -> QuestionsFile:
+    """
+    Get or create the QuestionsFile singleton.
+
+    Args:
+        path: Path to Questions_For_You.md (required on first call)
+
+    Returns:
+        QuestionsFile instance
+    """
+    global _questions_file
+
+    if _questions_file is None:
+        if path is None:
+            raise ValueError("path required for first initialization")
+        _questions_file = QuestionsFile(path)
+
+    return _questions_file
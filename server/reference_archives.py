@@ -0,0 +1,247 @@
+"""
+Reference Archive Extraction for Simple Claude Conductor
+
+Zip and tar archives (.tar, .tar.gz, .tar.bz2, .tar.xz, .tar.zst) uploaded
+as reference material are unpacked into a folder of the same name, so Claude
+and the reference index see the files rather than an opaque blob.
+
+Extraction streams: tar archives are decompressed as a single pass over the
+file, and zip members are inflated on a small thread pool. Archives are
+untrusted input, so member paths that would escape the target folder, links
+and device files are skipped, and extraction stops when the output grows past
+the size limit, the member count limit, or too far beyond the archive's own
+size (a zip bomb).
+"""
+
+import os
+import shutil
+import stat
+import tarfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import zstandard
+    HAS_ZSTANDARD = True
+except ImportError:
+    HAS_ZSTANDARD = False
+
+CHUNK_SIZE = 1024 * 1024
+
+# Most members one archive may hold
+MAX_MEMBERS = 10000
+
+# Most bytes written per byte of archive
+MAX_RATIO = 100
+
+# Zip members inflated at the same time
+WORKERS = 4
+
+# Archive suffixes, longest first so '.tar.gz' wins over '.gz'
+ARCHIVE_SUFFIXES = ('.tar.gz', '.tar.bz2', '.tar.xz', '.tar.zst', '.tgz', '.tbz2', '.txz', '.tzst',
+                    '.tar', '.zip')
+
+
+class ExtractionError(Exception):
+    """An archive that is unreadable or breaks an extraction limit."""
+
+
+def archive_suffix(name: str) -> Optional[str]:
+    """The archive suffix of a file name, or None if it is not an archive."""
+    lower = name.lower()
+    for suffix in ARCHIVE_SUFFIXES:
+        if lower.endswith(suffix) and len(name) > len(suffix):
+            return suffix
+    return None
+
+
+def safe_member_path(name: str) -> Optional[str]:
+    """
+    Normalise an archive member name to a relative path.
+
+    Returns:
+        Path with '/' separators, or None for names that are absolute,
+        climb out with '..', or name nothing
+    """
+    parts = []
+    for part in name.replace('\\', '/').split('/'):
+        if part in ('', '.'):
+            continue
+        if part == '..' or ':' in part:
+            return None
+        parts.append(part)
+    if not parts or name.startswith(('/', '\\')):
+        return None
+    return '/'.join(parts)
+
+
+class _Budget:
+    """Shared output limits for one extraction; thread-safe."""
+
+    def __init__(self, archive_size: int, max_bytes: int):
+        self.limit = min(max_bytes, max(archive_size, 1) * MAX_RATIO)
+        self.written = 0
+        self.members = 0
+        self._lock = threading.Lock()
+
+    def add_member(self) -> None:
+        with self._lock:
+            self.members += 1
+            if self.members > MAX_MEMBERS:
+                raise ExtractionError(f'Archive has more than {MAX_MEMBERS:,} files')
+
+    def add_bytes(self, count: int) -> None:
+        with self._lock:
+            self.written += count
+            if self.written > self.limit:
+                raise ExtractionError(f'Archive expands past {self.limit:,} bytes; not extracting it')
+
+
+def _copy(source, target_path: str, budget: _Budget) -> None:
+    """Stream a member to disk, charging every chunk to the budget."""
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    with open(target_path, 'wb') as f:
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            budget.add_bytes(len(chunk))
+            f.write(chunk)
+
+
+def _extract_zip(path: str, target: str, budget: _Budget, progress: Callable[[float, str], None]) -> List[str]:
+    with zipfile.ZipFile(path) as archive:
+        members = []
+        for info in archive.infolist():
+            mode = info.external_attr >> 16
+            if info.is_dir() or stat.S_ISLNK(mode):
+                continue
+            relative = safe_member_path(info.filename)
+            if relative is None:
+                continue
+            budget.add_member()
+            members.append((info, relative))
+
+    total = sum(info.file_size for info, _ in members) or 1
+    done = [0]
+    lock = threading.Lock()
+    local = threading.local()
+    handles = []
+
+    def extract(member):
+        info, relative = member
+        # ZipFile handles are not safe to share between threads
+        if not hasattr(local, 'archive'):
+            local.archive = zipfile.ZipFile(path)
+            with lock:
+                handles.append(local.archive)
+        with local.archive.open(info) as source:
+            _copy(source, os.path.join(target, relative), budget)
+        with lock:
+            done[0] += info.file_size
+            progress(done[0] * 100 / total, f'Extracted {relative}')
+        return relative
+
+    try:
+        with ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix='reference-extract') as pool:
+            return list(pool.map(extract, members))
+    finally:
+        for handle in handles:
+            handle.close()
+
+
+class _CountingReader:
+    """File wrapper that reports how far into the archive decompression has read."""
+
+    def __init__(self, f, on_read: Callable[[int], None]):
+        self._f = f
+        self._on_read = on_read
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._f.read(size)
+        self._on_read(self._f.tell())
+        return data
+
+
+def _extract_tar(path: str, suffix: str, target: str, budget: _Budget,
+                 progress: Callable[[float, str], None]) -> List[str]:
+    size = os.path.getsize(path) or 1
+    extracted = []
+    with open(path, 'rb') as raw:
+        reader = _CountingReader(raw, lambda position: progress(position * 100 / size, 'Extracting'))
+        if suffix in ('.tar.zst', '.tzst'):
+            if not HAS_ZSTANDARD:
+                raise ExtractionError('Install zstandard to extract .tar.zst archives')
+            stream = zstandard.ZstdDecompressor().stream_reader(reader)
+            archive = tarfile.open(fileobj=stream, mode='r|')
+        else:
+            # 'r|*' reads the archive as a stream, detecting the compression
+            archive = tarfile.open(fileobj=reader, mode='r|*')
+        with archive:
+            for member in archive:
+                # Links and devices could point outside the folder; only regular files are kept
+                if not member.isfile():
+                    continue
+                relative = safe_member_path(member.name)
+                if relative is None:
+                    continue
+                budget.add_member()
+                _copy(archive.extractfile(member), os.path.join(target, relative), budget)
+                extracted.append(relative)
+    return extracted
+
+
+def extract_archive(path: str, max_bytes: int,
+                    progress: Optional[Callable[[float, str], None]] = None) -> Dict[str, Any]:
+    """
+    Unpack an archive into a folder beside it named after the archive.
+
+    Files are written to a hidden folder first and moved into place once
+    all of them are out, so a failed extraction leaves nothing behind. An
+    existing folder of that name gets a numbered sibling instead.
+
+    Args:
+        path: Archive to extract
+        max_bytes: Most bytes the extracted files may total
+        progress: Optional progress(percent, message) callback (job style)
+
+    Returns:
+        Dict with folder (name of the created folder) and files (paths
+        extracted, relative to it)
+
+    Raises:
+        ExtractionError: If the archive is unreadable or breaks a limit
+    """
+    progress = progress or (lambda percent, message=None: None)
+    suffix = archive_suffix(os.path.basename(path))
+    if suffix is None:
+        raise ExtractionError(f'{os.path.basename(path)} is not a supported archive')
+
+    parent = os.path.dirname(path)
+    stem = os.path.basename(path)[:-len(suffix)]
+    staging = os.path.join(parent, f'.{stem}.extracting')
+    shutil.rmtree(staging, ignore_errors=True)
+    budget = _Budget(os.path.getsize(path), max_bytes)
+    try:
+        if suffix == '.zip':
+            files = _extract_zip(path, staging, budget, progress)
+        else:
+            files = _extract_tar(path, suffix, staging, budget, progress)
+    except (zipfile.BadZipFile, tarfile.TarError, EOFError, OSError) as e:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise ExtractionError(f'Could not read {os.path.basename(path)}: {e}')
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    folder = stem
+    number = 2
+    while os.path.exists(os.path.join(parent, folder)):
+        folder = f'{stem} ({number})'
+        number += 1
+    os.makedirs(staging, exist_ok=True)
+    os.replace(staging, os.path.join(parent, folder))
+    progress(100, f'Extracted {len(files)} file(s)')
+    return {'folder': folder, 'files': sorted(files)}
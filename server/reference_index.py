@@ -0,0 +1,542 @@
+"""
+Reference Index for Simple Claude Conductor
+
+Pre-processes the files in File_References_For_Your_Project so Claude does
+not have to read every one from scratch on every run. For each file it
+extracts plain text (PDF, Word and Excel included), estimates the tokens it
+would cost to read, and builds a short outline. Results are cached under
+.conductor/references keyed by content hash, so a file is only processed
+again when its bytes change, and a renamed or re-uploaded copy costs nothing.
+
+A compact index (.index.md in the reference folder) lists each file with its
+size in tokens, outline and where to read its text; Claude is pointed at the
+index and reads only what it needs.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import struct
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from xml.etree import ElementTree
+
+try:
+    import pypdf
+    HAS_PYPDF = True
+except ImportError:
+    HAS_PYPDF = False
+
+try:
+    import openpyxl
+    HAS_OPENPYXL = True
+except ImportError:
+    HAS_OPENPYXL = False
+
+# Bump when extraction changes, so cached results are rebuilt
+EXTRACTOR_VERSION = 1
+
+# Rough characters per token for English text and code
+CHARS_PER_TOKEN = 4
+
+# Image tokens: pixels per token, and the most one image costs (it is downscaled)
+PIXELS_PER_TOKEN = 750
+MAX_IMAGE_TOKENS = 1600
+
+# Outline entries kept per file
+OUTLINE_LIMIT = 12
+
+# Files extracted at the same time
+WORKERS = 4
+
+# Characters read from a text file at a time, and the most of one line kept
+TEXT_CHUNK = 1024 * 1024
+MAX_LINE = 64 * 1024
+
+INDEX_NAME = '.index.md'
+
+TEXT_EXTENSIONS = {
+    '.txt', '.md', '.markdown', '.rst', '.csv', '.tsv', '.json', '.jsonl', '.yaml', '.yml', '.toml',
+    '.ini', '.cfg', '.xml', '.html', '.htm', '.css', '.js', '.jsx', '.ts', '.tsx', '.py', '.java',
+    '.c', '.h', '.cpp', '.cs', '.go', '.rs', '.rb', '.php', '.sh', '.bat', '.ps1', '.sql', '.log',
+    '.svg', '.vue', '.swift', '.kt'
+}
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.webp'}
+
+MARKDOWN_HEADING = re.compile(r'#{1,3}\s+(.+)')
+CODE_DEFINITION = re.compile(r'(?:export\s+)?(?:async\s+)?(?:def|class|function|interface|struct|fn|func)\s+\w+')
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file, read in chunks."""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+# ---- Extractors: each returns (text, outline), text files only (tokens, outline) ----
+
+def _outline_text(text: str, ext: str) -> List[str]:
+    """Headings of markdown, definitions of code, else the first lines."""
+    lines = text.splitlines()
+    if ext in ('.md', '.markdown'):
+        outline = [m.group(1).strip() for m in map(MARKDOWN_HEADING.match, lines) if m]
+    elif ext in ('.csv', '.tsv'):
+        header = lines[0] if lines else ''
+        outline = [f'Columns: {header.strip()}', f'{max(0, len(lines) - 1):,} rows']
+    else:
+        outline = [m.group(0) for m in (CODE_DEFINITION.match(line.strip()) for line in lines) if m]
+    if not outline:
+        outline = [line.strip()[:100] for line in lines if line.strip()][:3]
+    return list(dict.fromkeys(outline))[:OUTLINE_LIMIT]
+
+
+def scan_text_file(path: str, ext: str):
+    """
+    Token estimate and outline of a text file, read in chunks.
+
+    Text files are not cached (Claude reads them as they are), so only the
+    counts and the outline are kept; memory stays flat for multi-GB CSVs.
+
+    Returns:
+        Tuple of (tokens, outline)
+    """
+    chars = 0
+    newlines = 0
+    last_char = ''
+    header = None
+    first_lines: List[str] = []
+    found: Dict[str, None] = {}
+    markdown = ext in ('.md', '.markdown')
+    tabular = ext in ('.csv', '.tsv')
+
+    def take(line: str) -> None:
+        nonlocal header
+        if header is None:
+            header = line
+        if len(first_lines) < 3 and line.strip():
+            first_lines.append(line.strip()[:100])
+        if tabular or len(found) >= OUTLINE_LIMIT:
+            return
+        if markdown:
+            match = MARKDOWN_HEADING.match(line)
+            if match:
+                found.setdefault(match.group(1).strip())
+        else:
+            match = CODE_DEFINITION.match(line.strip())
+            if match:
+                found.setdefault(match.group(0))
+
+    carry = ''
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for chunk in iter(lambda: f.read(TEXT_CHUNK), ''):
+            chars += len(chunk)
+            newlines += chunk.count('\n')
+            last_char = chunk[-1]
+            if len(first_lines) < 3 or (not tabular and len(found) < OUTLINE_LIMIT):
+                lines = chunk.split('\n')
+                # Only the head of an overlong line is kept for the outline
+                lines[0] = (carry + lines[0])[:MAX_LINE]
+                carry = lines.pop()[:MAX_LINE]
+                for line in lines:
+                    take(line)
+    if carry:
+        take(carry)
+
+    if tabular:
+        lines = newlines + (1 if chars and last_char != '\n' else 0)
+        outline = [f'Columns: {(header or "").strip()}', f'{max(0, lines - 1):,} rows']
+    else:
+        outline = list(found) or first_lines
+    return math.ceil(chars / CHARS_PER_TOKEN), outline[:OUTLINE_LIMIT]
+
+
+def extract_pdf(path: str, ext: str):
+    reader = pypdf.PdfReader(path)
+    pages = [page.extract_text() or '' for page in reader.pages]
+    outline = []
+    try:
+        outline = [item.title for item in reader.outline if hasattr(item, 'title')]
+    except Exception:
+        pass
+    text = '\n\n'.join(f'--- Page {i} ---\n{page}' for i, page in enumerate(pages, 1))
+    if not outline:
+        outline = _outline_text('\n'.join(pages), ext)
+    return text, [f'{len(pages)} pages'] + outline[:OUTLINE_LIMIT - 1]
+
+
+def extract_docx(path: str, ext: str):
+    with zipfile.ZipFile(path) as archive:
+        root = ElementTree.fromstring(archive.read('word/document.xml'))
+    paragraphs = []
+    outline = []
+    for paragraph in root.iter(f'{WORD_NAMESPACE}p'):
+        text = ''.join(node.text or '' for node in paragraph.iter(f'{WORD_NAMESPACE}t'))
+        style = paragraph.find(f'{WORD_NAMESPACE}pPr/{WORD_NAMESPACE}pStyle')
+        if style is not None and style.get(f'{WORD_NAMESPACE}val', '').startswith('Heading') and text.strip():
+            outline.append(text.strip())
+        paragraphs.append(text)
+    text = '\n'.join(paragraphs)
+    return text, (outline or _outline_text(text, ext))[:OUTLINE_LIMIT]
+
+
+def extract_xlsx(path: str, ext: str):
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    sections = []
+    outline = []
+    for sheet in workbook.worksheets:
+        rows = ['\t'.join('' if v is None else str(v) for v in row)
+                for row in sheet.iter_rows(values_only=True)]
+        sections.append(f'--- Sheet: {sheet.title} ---\n' + '\n'.join(rows))
+        outline.append(f'{sheet.title}: {len(rows):,} rows' + (f' ({rows[0][:80]})' if rows else ''))
+    workbook.close()
+    return '\n\n'.join(sections), outline[:OUTLINE_LIMIT]
+
+
+def image_size(path: str) -> Optional[tuple]:
+    """Width and height of a PNG, GIF or JPEG, read from its header."""
+    with open(path, 'rb') as f:
+        head = f.read(26)
+        if head.startswith(b'\x89PNG\r\n\x1a\n'):
+            return struct.unpack('>II', head[16:24])
+        if head[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack('<HH', head[6:10])
+        if head.startswith(b'\xff\xd8'):
+            f.seek(2)
+            while True:
+                marker = f.read(4)
+                if len(marker) < 4 or marker[0] != 0xFF:
+                    return None
+                length = struct.unpack('>H', marker[2:])[0]
+                if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+                    height, width = struct.unpack('>xHH', f.read(5))
+                    return width, height
+                f.seek(length - 2, os.SEEK_CUR)
+    return None
+
+
+def analyze_file(path: str) -> Dict[str, Any]:
+    """
+    Extract a file's text, token estimate and outline.
+
+    Returns:
+        Dict with kind (text, pdf, docx, xlsx, image or binary), tokens
+        (None when unknown), outline, text (None when the file is read as
+        is or has no text) and, when extraction failed or is unavailable,
+        note
+    """
+    ext = os.path.splitext(path)[1].lower()
+    result = {'kind': 'binary', 'tokens': None, 'outline': [], 'text': None}
+    try:
+        if ext in TEXT_EXTENSIONS:
+            tokens, outline = scan_text_file(path, ext)
+            result.update(kind='text', tokens=tokens, outline=outline)
+        elif ext == '.pdf':
+            result['kind'] = 'pdf'
+            if not HAS_PYPDF:
+                result['note'] = 'Install pypdf to extract PDF text'
+                return result
+            text, outline = extract_pdf(path, ext)
+            result.update(tokens=estimate_tokens(text), outline=outline, text=text)
+        elif ext == '.docx':
+            text, outline = extract_docx(path, ext)
+            result.update(kind='docx', tokens=estimate_tokens(text), outline=outline, text=text)
+        elif ext in ('.xlsx', '.xlsm'):
+            result['kind'] = 'xlsx'
+            if not HAS_OPENPYXL:
+                result['note'] = 'Install openpyxl to extract spreadsheet text'
+                return result
+            text, outline = extract_xlsx(path, ext)
+            result.update(tokens=estimate_tokens(text), outline=outline, text=text)
+        elif ext in IMAGE_EXTENSIONS:
+            result['kind'] = 'image'
+            size = image_size(path)
+            if size:
+                result['tokens'] = min(MAX_IMAGE_TOKENS, math.ceil(size[0] * size[1] / PIXELS_PER_TOKEN))
+                result['outline'] = [f'{size[0]}x{size[1]} image']
+    except Exception as e:
+        result['note'] = f'Could not extract: {e}'
+    return result
+
+
+class ReferenceIndex:
+    """
+    Content-hash cache of reference file analyses, and the index built from it.
+
+    Layout under .conductor/references:
+        extracted/<sha256>.json   analysis of a file (kind, tokens, outline)
+        extracted/<sha256>.txt    extracted text, for PDFs, Word and Excel files
+        fingerprints.json         file path -> fingerprint and sha256
+    """
+
+    def __init__(self, project_root: str, reference_dir: Optional[str] = None):
+        """
+        Initialize ReferenceIndex.
+
+        Args:
+            project_root: Path to the project root directory
+            reference_dir: Folder to index (default: File_References_For_Your_Project)
+        """
+        self.project_root = project_root
+        self.reference_dir = reference_dir or os.path.join(project_root, 'File_References_For_Your_Project')
+        self.store_dir = os.path.join(project_root, '.conductor', 'references')
+        self.extract_dir = os.path.join(self.store_dir, 'extracted')
+        self.fingerprints_path = os.path.join(self.store_dir, 'fingerprints.json')
+        self.index_path = os.path.join(self.reference_dir, INDEX_NAME)
+        self._lock = threading.Lock()
+        self._fingerprints: Optional[Dict[str, Dict[str, str]]] = None
+
+    # ---- Scanning ----
+
+    def _files(self) -> Dict[str, str]:
+        """
+        Path -> fingerprint for the files in the reference folder.
+
+        Paths are relative to the folder with '/' separators, and include
+        subfolders (e.g. extracted archives); hidden files and folders are
+        skipped.
+        """
+        files = {}
+        for root, dirs, names in os.walk(self.reference_dir):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            prefix = os.path.relpath(root, self.reference_dir).replace(os.sep, '/')
+            for name in names:
+                if name.startswith('.'):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                files[name if prefix == '.' else f'{prefix}/{name}'] = f'{stat.st_mtime_ns}-{stat.st_size}'
+        return files
+
+    def _known(self) -> Dict[str, Dict[str, str]]:
+        if self._fingerprints is None:
+            try:
+                with open(self.fingerprints_path, 'r', encoding='utf-8') as f:
+                    self._fingerprints = json.load(f)
+            except (OSError, ValueError):
+                self._fingerprints = {}
+        return self._fingerprints
+
+    def pending(self) -> List[str]:
+        """Files whose content has not been analysed since they last changed."""
+        files = self._files()
+        with self._lock:
+            known = self._known()
+            stale = [name for name, fingerprint in files.items()
+                     if known.get(name, {}).get('fingerprint') != fingerprint
+                     or not os.path.exists(self._result_path(known[name]['sha256']))]
+        return sorted(stale)
+
+    def _result_path(self, digest: str) -> str:
+        return os.path.join(self.extract_dir, f'{digest}.json')
+
+    def _text_path(self, digest: str) -> str:
+        return os.path.join(self.extract_dir, f'{digest}.txt')
+
+    def _load_result(self, digest: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._result_path(digest), 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return result if result.get('version') == EXTRACTOR_VERSION else None
+
+    # ---- Processing ----
+
+    def _process(self, name: str) -> None:
+        """Hash one file and analyse it unless its content is already cached."""
+        path = os.path.join(self.reference_dir, name)
+        try:
+            stat = os.stat(path)
+            digest = file_sha256(path)
+        except OSError:
+            return
+        if self._load_result(digest) is None:
+            result = analyze_file(path)
+            text = result.pop('text')
+            os.makedirs(self.extract_dir, exist_ok=True)
+            if text is not None:
+                tmp_path = f'{self._text_path(digest)}.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                os.replace(tmp_path, self._text_path(digest))
+            result.update(version=EXTRACTOR_VERSION, sha256=digest, hasText=text is not None)
+            tmp_path = f'{self._result_path(digest)}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f)
+            os.replace(tmp_path, self._result_path(digest))
+        with self._lock:
+            self._known()[name] = {'fingerprint': f'{stat.st_mtime_ns}-{stat.st_size}', 'sha256': digest}
+
+    def refresh(self, progress: Optional[Callable[[float, str], None]] = None) -> Dict[str, Any]:
+        """
+        Analyse new and changed files on a thread pool, then rewrite the index.
+
+        Rescans until nothing is pending, so files added while it runs are
+        picked up too.
+
+        Args:
+            progress: Optional progress(percent, message) callback (job style)
+
+        Returns:
+            Summary (see summary)
+        """
+        done = 0
+        attempted = set()
+        with ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix='reference-index') as pool:
+            while True:
+                # Unreadable files stay pending; try each once per refresh
+                names = [name for name in self.pending() if name not in attempted]
+                if not names:
+                    break
+                attempted.update(names)
+                total = done + len(names)
+                for name in pool.map(lambda n: (self._process(n), n)[1], names):
+                    done += 1
+                    if progress:
+                        progress(done * 100 / total, f'Indexed {name}')
+        self._save_fingerprints()
+        self.write_index()
+        return self.summary()
+
+    def _save_fingerprints(self) -> None:
+        files = self._files()
+        with self._lock:
+            known = {name: value for name, value in self._known().items() if name in files}
+            self._fingerprints = known
+            os.makedirs(self.store_dir, exist_ok=True)
+            tmp_path = f'{self.fingerprints_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(known, f)
+            os.replace(tmp_path, self.fingerprints_path)
+
+    # ---- Reading ----
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Cached analysis of each file in the reference folder.
+
+        Returns:
+            Path (see _files) -> dict with indexed (False while pending), kind,
+            tokens, outline, sha256, note and textPath (relative to the
+            project root, when text was extracted)
+        """
+        files = self._files()
+        with self._lock:
+            known = dict(self._known())
+        entries = {}
+        for name, fingerprint in sorted(files.items()):
+            record = known.get(name)
+            result = None
+            if record and record['fingerprint'] == fingerprint:
+                result = self._load_result(record['sha256'])
+            if result is None:
+                entries[name] = {'indexed': False, 'kind': None, 'tokens': None, 'outline': []}
+                continue
+            entry = {'indexed': True, 'kind': result['kind'], 'tokens': result['tokens'],
+                     'outline': result['outline'], 'sha256': result['sha256']}
+            if result.get('note'):
+                entry['note'] = result['note']
+            if result['hasText']:
+                entry['textPath'] = os.path.relpath(self._text_path(result['sha256']),
+                                                    self.project_root).replace(os.sep, '/')
+            entries[name] = entry
+        return entries
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Token budget of the reference folder.
+
+        Returns:
+            Dict with files, indexed, pending, totalTokens (over files with an
+            estimate) and unknown (indexed files with no estimate)
+        """
+        entries = self.entries()
+        indexed = [e for e in entries.values() if e['indexed']]
+        return {
+            'files': len(entries),
+            'indexed': len(indexed),
+            'pending': len(entries) - len(indexed),
+            'totalTokens': sum(e['tokens'] or 0 for e in indexed),
+            'unknown': sum(1 for e in indexed if e['tokens'] is None)
+        }
+
+    def write_index(self) -> Optional[str]:
+        """
+        Write the compact index Claude reads instead of every file.
+
+        Returns:
+            Path of the index relative to the project root, or None (and any
+            old index removed) when the folder has no files
+        """
+        entries = self.entries()
+        if not entries:
+            if os.path.exists(self.index_path):
+                os.remove(self.index_path)
+            return None
+
+        summary = self.summary()
+        folder = os.path.basename(self.reference_dir)
+        lines = [
+            '# Reference Files Index',
+            '',
+            f'{summary["files"]} file(s), about {summary["totalTokens"]:,} tokens in total. '
+            'Read only the files relevant to the current task. Where an extracted text '
+            'file is listed, read it instead of the original.',
+            ''
+        ]
+        for name, entry in entries.items():
+            tokens = f'~{entry["tokens"]:,} tokens' if entry['tokens'] is not None else 'size unknown'
+            kind = entry['kind'] or 'not indexed yet'
+            lines.append(f'## {folder}/{name}')
+            lines.append(f'{kind}, {tokens}')
+            if entry.get('textPath'):
+                lines.append(f'Extracted text: {entry["textPath"]}')
+            if entry.get('note'):
+                lines.append(f'Note: {entry["note"]}')
+            lines += [f'- {item}' for item in entry['outline']]
+            lines.append('')
+
+        tmp_path = f'{self.index_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines))
+        os.replace(tmp_path, self.index_path)
+        return os.path.relpath(self.index_path, self.project_root).replace(os.sep, '/')
+
+
+# Singleton instance
+_reference_index: Optional[ReferenceIndex] = None
+
+
+def get_reference_index(project_root: Optional[str] = None) -> ReferenceIndex:
+    """
+    Get or create the ReferenceIndex singleton.
+
+    Args:
+        project_root: Path to project root (required on first call)
+
+    Returns:
+        ReferenceIndex instance
+    """
+    global _reference_index
+
+    if _reference_index is None:
+        if project_root is None:
+            raise ValueError("project_root required for first initialization")
+        _reference_index = ReferenceIndex(project_root)
+
+    return _reference_index
@@ -0,0 +1,431 @@
+"""
+Reference Store for Simple Claude Conductor
+
+Reference files are uploaded by streaming them to disk in chunks, hashing
+them (SHA-256) on the fly, so server memory stays flat however large the
+file. Finished uploads go into a content-addressed blob store under
+.conductor/references and are hard-linked into File_References_For_Your_Project:
+uploading the same file twice, or under another name, stores it once. The
+links share one inode, so they are read-only: editing one in place would
+change every reference with that content.
+
+Uploads are resumable. A client creates an upload, then sends chunks at
+increasing offsets; after a dropped connection it asks for the current
+offset and carries on from there, even across server restarts.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from typing import Any, BinaryIO, Dict, Optional
+
+from server.archive_engine import remove_file
+
+# Bytes read from a request stream at a time
+CHUNK_SIZE = 1024 * 1024
+
+# Chunk size suggested to clients (bytes per PUT)
+CLIENT_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Unfinished uploads older than this are discarded (seconds)
+UPLOAD_EXPIRY = 7 * 24 * 3600
+
+# Blobs are hard-linked into the reference folder, so every file with the
+# same content shares one inode: read-only, so editing one cannot change
+# the others (or the blob)
+BLOB_MODE = 0o444
+
+UPLOAD_ID = re.compile(r'[0-9a-f]{32}')
+
+
+class UploadError(Exception):
+    """An upload request that cannot be honoured; carries the HTTP status to return."""
+
+    def __init__(self, message: str, status: int = 400, **details: Any):
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+
+class IncomingFile:
+    """
+    Write-only sink for one streamed upload.
+
+    Bytes go straight to a temp file in the store, hashed and checked
+    against the size limit as they arrive. Used as the stream factory of a
+    multipart form parser, so file parts are never buffered elsewhere.
+    """
+
+    def __init__(self, path: str, name: Optional[str], max_bytes: int):
+        self.path = path
+        self.name = name
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hasher = hashlib.sha256()
+        self._file = open(path, 'wb')
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise UploadError(f'{self.name or "File"} is over the {self.max_bytes:,} byte limit', status=413,
+                              maxBytes=self.max_bytes)
+        self.hasher.update(data)
+        return self._file.write(data)
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        # Form parsers rewind a finished part; nothing is read back, so just flush
+        self._file.flush()
+        return 0
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    def discard(self) -> None:
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def safe_filename(name: str) -> str:
+    """
+    Reduce a client-supplied file name to a bare name.
+
+    Raises:
+        UploadError: If nothing usable is left
+    """
+    name = os.path.basename((name or '').replace('\\', '/')).strip()
+    if not name or name in ('.', '..') or name.startswith('.'):
+        raise UploadError(f'Invalid file name: {name!r}')
+    return name
+
+
+class ReferenceStore:
+    """
+    Content-addressed store behind the reference folder.
+
+    Layout under .conductor/references:
+        blobs/<aa>/<sha256>   stored files, hard-linked into the reference folder
+        blobs.json            size and mtime of each blob when stored
+        uploads/<id>.json     upload metadata (name, size, created)
+        uploads/<id>.part     bytes received so far
+    """
+
+    def __init__(self, project_root: str, reference_dir: Optional[str] = None):
+        """
+        Initialize ReferenceStore.
+
+        Args:
+            project_root: Path to the project root directory
+            reference_dir: Folder the files are linked into (default:
+                File_References_For_Your_Project)
+        """
+        self.reference_dir = reference_dir or os.path.join(project_root, 'File_References_For_Your_Project')
+        self.store_dir = os.path.join(project_root, '.conductor', 'references')
+        self.blob_dir = os.path.join(self.store_dir, 'blobs')
+        self.upload_dir = os.path.join(self.store_dir, 'uploads')
+        self.index_path = os.path.join(self.store_dir, 'blobs.json')
+        self._lock = threading.Lock()
+        # Upload id -> (bytes hashed, running hash), so chunks need not be re-read
+        self._hashers: Dict[str, Any] = {}
+        self._busy: set = set()
+
+    # ---- Resumable uploads ----
+
+    def create_upload(self, name: str, size: int, max_bytes: int) -> Dict[str, Any]:
+        """
+        Start an upload.
+
+        Args:
+            name: File name to create in the reference folder
+            size: Total size in bytes
+            max_bytes: Largest size allowed
+
+        Returns:
+            Upload status (see status)
+
+        Raises:
+            UploadError: For a bad name or size, or a file over the limit (413)
+        """
+        name = safe_filename(name)
+        if not isinstance(size, int) or size < 0:
+            raise UploadError('size must be a non-negative integer')
+        if size > max_bytes:
+            raise UploadError(f'{name} is {size:,} bytes; the limit is {max_bytes:,}', status=413,
+                              maxBytes=max_bytes)
+
+        self.prune()
+        os.makedirs(self.upload_dir, exist_ok=True)
+        upload_id = uuid.uuid4().hex
+        meta = {'id': upload_id, 'name': name, 'size': size, 'created': time.time()}
+        with open(self._meta_path(upload_id), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        open(self._part_path(upload_id), 'wb').close()
+        return self.status(upload_id)
+
+    def status(self, upload_id: str) -> Dict[str, Any]:
+        """
+        Progress of an upload.
+
+        Returns:
+            Dict with id, name, size, offset (bytes received) and chunkSize
+
+        Raises:
+            UploadError: If the upload does not exist (404)
+        """
+        meta = self._meta(upload_id)
+        return {
+            'id': upload_id,
+            'name': meta['name'],
+            'size': meta['size'],
+            'offset': os.path.getsize(self._part_path(upload_id)),
+            'chunkSize': CLIENT_CHUNK_SIZE
+        }
+
+    def write_chunk(self, upload_id: str, offset: int, stream: BinaryIO, length: Optional[int]) -> Dict[str, Any]:
+        """
+        Append a chunk to an upload, and finish it once all bytes are in.
+
+        Args:
+            upload_id: Upload to append to
+            offset: Where the chunk starts; must equal the bytes received
+            stream: Request body
+            length: Declared chunk length (Content-Length), if known
+
+        Returns:
+            Upload status; once complete also complete=True, sha256, file
+            and deduplicated
+
+        Raises:
+            UploadError: 404 for an unknown upload, 409 when the offset is
+                not the current one or another chunk is being written,
+                413 when the chunk runs past the declared size
+        """
+        meta = self._meta(upload_id)
+        with self._lock:
+            if upload_id in self._busy:
+                raise UploadError('Another chunk of this upload is being written', status=409)
+            self._busy.add(upload_id)
+        try:
+            part_path = self._part_path(upload_id)
+            received = os.path.getsize(part_path)
+            if offset != received:
+                raise UploadError(f'Expected offset {received}', status=409, offset=received)
+            if length is not None and received + length > meta['size']:
+                raise UploadError('Chunk runs past the declared size', status=413, offset=received)
+
+            hasher = self._hasher(upload_id, received)
+            with open(part_path, 'ab') as f:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if received + len(chunk) > meta['size']:
+                        raise UploadError('Chunk runs past the declared size', status=413, offset=received)
+                    f.write(chunk)
+                    hasher.update(chunk)
+                    received += len(chunk)
+            self._hashers[upload_id] = (received, hasher)
+
+            status = self.status(upload_id)
+            if received == meta['size']:
+                status.update(self._finish(upload_id, meta, hasher.hexdigest()))
+            return status
+        finally:
+            with self._lock:
+                self._busy.discard(upload_id)
+
+    def cancel(self, upload_id: str) -> None:
+        """Discard an unfinished upload."""
+        self._meta(upload_id)
+        self._discard(upload_id)
+
+    # ---- One-shot adds ----
+
+    def incoming(self, name: Optional[str], max_bytes: int) -> IncomingFile:
+        """
+        Open a sink for a file about to be streamed in (see add_incoming).
+
+        The caller must pass it to add_incoming or discard it.
+        """
+        os.makedirs(self.upload_dir, exist_ok=True)
+        return IncomingFile(os.path.join(self.upload_dir, f'{uuid.uuid4().hex}.stream'), name, max_bytes)
+
+    def add_incoming(self, incoming: IncomingFile, name: str) -> Dict[str, Any]:
+        """
+        Store a fully received file and link it into the reference folder.
+
+        Returns:
+            Dict with file, size, sha256 and deduplicated
+
+        Raises:
+            UploadError: For a bad name
+        """
+        try:
+            name = safe_filename(name)
+            incoming.close()
+            digest = incoming.hasher.hexdigest()
+            deduplicated = self._store_blob(incoming.path, digest)
+        finally:
+            incoming.discard()
+        self._link(digest, name)
+        return {'file': name, 'size': incoming.size, 'sha256': digest, 'deduplicated': deduplicated}
+
+    # ---- Housekeeping ----
+
+    def prune(self) -> None:
+        """Drop expired unfinished uploads and blobs no reference links to any more."""
+        now = time.time()
+        if os.path.isdir(self.upload_dir):
+            for entry in os.scandir(self.upload_dir):
+                if now - entry.stat().st_mtime > UPLOAD_EXPIRY:
+                    upload_id = entry.name.split('.')[0]
+                    if upload_id not in self._busy:
+                        self._hashers.pop(upload_id, None)
+                        os.remove(entry.path)
+
+        with self._lock:
+            index = self._load_index()
+            for digest in list(index):
+                path = self._blob_path(digest)
+                try:
+                    # Only the store's own link is left
+                    if os.stat(path).st_nlink <= 1:
+                        remove_file(path)
+                        del index[digest]
+                except FileNotFoundError:
+                    del index[digest]
+            self._save_index(index)
+
+    # ---- Internals ----
+
+    def _meta_path(self, upload_id: str) -> str:
+        return os.path.join(self.upload_dir, f'{upload_id}.json')
+
+    def _part_path(self, upload_id: str) -> str:
+        return os.path.join(self.upload_dir, f'{upload_id}.part')
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def _meta(self, upload_id: str) -> Dict[str, Any]:
+        if not UPLOAD_ID.fullmatch(upload_id or ''):
+            raise UploadError('Upload not found', status=404)
+        try:
+            with open(self._meta_path(upload_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            raise UploadError('Upload not found', status=404)
+
+    def _hasher(self, upload_id: str, received: int):
+        """Running hash of the bytes received; rebuilt from the partial file after a restart."""
+        cached = self._hashers.get(upload_id)
+        if cached and cached[0] == received:
+            return cached[1]
+        hasher = hashlib.sha256()
+        with open(self._part_path(upload_id), 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                hasher.update(chunk)
+        return hasher
+
+    def _finish(self, upload_id: str, meta: Dict[str, Any], digest: str) -> Dict[str, Any]:
+        deduplicated = self._store_blob(self._part_path(upload_id), digest)
+        self._link(digest, meta['name'])
+        self._discard(upload_id)
+        return {'complete': True, 'sha256': digest, 'file': meta['name'], 'deduplicated': deduplicated}
+
+    def _discard(self, upload_id: str) -> None:
+        self._hashers.pop(upload_id, None)
+        for path in (self._part_path(upload_id), self._meta_path(upload_id)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _store_blob(self, path: str, digest: str) -> bool:
+        """
+        Move a finished file into the blob store.
+
+        Returns:
+            True if an intact blob with this content already existed (the
+            file is then left for the caller to delete)
+        """
+        blob_path = self._blob_path(digest)
+        with self._lock:
+            index = self._load_index()
+            known = index.get(digest)
+            try:
+                stat = os.stat(blob_path)
+                # A reference edited in place changes its blob too (they share an inode)
+                if known and (stat.st_size, stat.st_mtime_ns) == (known['size'], known['mtime_ns']):
+                    return True
+                remove_file(blob_path)
+            except FileNotFoundError:
+                pass
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            os.chmod(path, BLOB_MODE)
+            os.replace(path, blob_path)
+            stat = os.stat(blob_path)
+            index[digest] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+            self._save_index(index)
+            return False
+
+    def _link(self, digest: str, name: str) -> None:
+        """Put a blob into the reference folder under `name`, replacing any file there."""
+        os.makedirs(self.reference_dir, exist_ok=True)
+        target = os.path.join(self.reference_dir, name)
+        tmp_path = os.path.join(self.reference_dir, f'.{name}.{uuid.uuid4().hex[:8]}.tmp')
+        blob_path = self._blob_path(digest)
+        try:
+            if os.stat(blob_path).st_mode & 0o222:
+                # Stored before blobs were read-only, or made writable through a link
+                os.chmod(blob_path, BLOB_MODE)
+            os.link(blob_path, tmp_path)
+        except OSError:
+            # No hard links here (e.g. FAT drives); fall back to a copy
+            shutil.copyfile(blob_path, tmp_path)
+        if os.path.lexists(target):
+            # A read-only link cannot be replaced on Windows
+            remove_file(target)
+        os.replace(tmp_path, target)
+
+    def _load_index(self) -> Dict[str, Any]:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, index: Dict[str, Any]) -> None:
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_path = f'{self.index_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
+
+
+# Singleton instance
+_reference_store: Optional[ReferenceStore] = None
+
+
+def get_reference_store(project_root: Optional[str] = None) -> ReferenceStore:
+    """
+    Get or create the ReferenceStore singleton.
+
+    Args:
+        project_root: Path to project root (required on first call)
+
+    Returns:
+        ReferenceStore instance
+    """
+    global _reference_store
+
+    if _reference_store is None:
+        if project_root is None:
+            raise ValueError("project_root required for first initialization")
+        _reference_store = ReferenceStore(project_root)
+
+    return _reference_store
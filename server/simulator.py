@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Fake Claude CLI for Simple Claude Conductor
+
+A seeded stand-in for `claude -p` used by the simulator executor.
+It accepts the same arguments the conductor passes to the real CLI and then:
+
+- prints output lines at a configurable rate
+- writes docs/planning/task-plan.md, Questions_For_You.md and STATUS.md
+  the way Claude does for the plan / refine / execute / continue prompts
+- appends a session JSONL log with realistic usage records under
+  ~/.claude/projects/<encoded project path>/<session id>.jsonl
+- exits with the requested code
+
+Token counts and file contents follow --seed and the prompt. Ids and
+timestamps are fresh on every run, as with the real CLI, so a resumed
+session never logs the same message id twice and log times line up with
+the server's phase journal.
+
+Standard library only, so it runs on any box that can run the server.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+
+
+def encode_project_path(path):
+    """Encode a project path the way the Claude CLI names its project dirs."""
+    return re.sub(r'[^A-Za-z0-9]', '-', os.path.abspath(path))
+
+
+def default_projects_dir():
+    """Claude's projects dir, honouring CLAUDE_CONFIG_DIR like the real CLI."""
+    config_dir = os.environ.get('CLAUDE_CONFIG_DIR') or os.path.join(os.path.expanduser('~'), '.claude')
+    return os.path.join(config_dir, 'projects')
+
+
+def classify_prompt(prompt):
+    """Map a conductor prompt to the kind of work Claude would do."""
+    text = prompt.lower()
+    if text.startswith('generate a plan'):
+        return 'plan'
+    if 'refine the plan' in text or 'finalize it' in text:
+        return 'refine'
+    if text.startswith('execute'):
+        return 'execute'
+    return 'continue'
+
+
+class SessionLog:
+    """Appends Claude-style JSONL entries with plausible usage numbers."""
+
+    def __init__(self, path, session_id, model, rng, cwd):
+        self.path = path
+        self.session_id = session_id
+        self.model = model
+        self.rng = rng
+        self.cwd = cwd
+        self.parent = None
+        self.context = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # A resumed session already has a cached context to read from
+        if os.path.exists(path):
+            self.context = 20000 + rng.randint(0, 5000)
+
+    def _write(self, entry):
+        entry.update({
+            'uuid': str(uuid.uuid4()),
+            'parentUuid': self.parent,
+            'sessionId': self.session_id,
+            'cwd': self.cwd,
+            'isSidechain': False,
+            'timestamp': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+        })
+        self.parent = entry['uuid']
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+
+    def prompt(self, text):
+        self._write({'type': 'user', 'message': {'role': 'user', 'content': text}})
+
+    def assistant_turn(self, text, tool=None):
+        """Log one assistant turn; a cold context is written to cache first."""
+        fresh = self.rng.randint(3, 400)
+        if self.context == 0:
+            cache_read, cache_write = 0, 15000 + self.rng.randint(0, 10000)
+        else:
+            cache_read, cache_write = self.context, self.rng.randint(200, 3000)
+        self.context = cache_read + cache_write + fresh
+
+        content = [{'type': 'text', 'text': text}]
+        tool_id = None
+        if tool:
+            tool_id = 'toolu_' + uuid.uuid4().hex[:24]
+            content.append({'type': 'tool_use', 'id': tool_id, 'name': tool[0], 'input': tool[1]})
+
+        self._write({
+            'type': 'assistant',
+            'requestId': 'req_' + uuid.uuid4().hex[:24],
+            'message': {
+                'id': 'msg_' + uuid.uuid4().hex[:24],
+                'role': 'assistant',
+                'model': self.model,
+                'content': content,
+                'usage': {
+                    'input_tokens': fresh,
+                    'output_tokens': self.rng.randint(50, 1500),
+                    'cache_read_input_tokens': cache_read,
+                    'cache_creation_input_tokens': cache_write,
+                },
+            },
+        })
+
+        if tool_id:
+            # Tool results dominate real logs: large, and without usage
+            size = self.rng.randint(2000, 40000)
+            self._write({
+                'type': 'user',
+                'message': {'role': 'user', 'content': [
+                    {'type': 'tool_result', 'tool_use_id': tool_id, 'content': 'x' * size}
+                ]},
+            })
+
+
+def write_plan(root, phases, refined=False):
+    plan_dir = os.path.join(root, 'docs', 'planning')
+    os.makedirs(plan_dir, exist_ok=True)
+    lines = ['# Task Plan', '', '_Generated by the conductor simulator._', '']
+    for n in range(1, phases + 1):
+        lines += [
+            f'## Phase {n}: Simulated step {n}' + (' (refined)' if refined else ''),
+            '',
+            '**Status**: pending',
+            '',
+            f'- [ ] Task {n}.1',
+            f'- [ ] Task {n}.2',
+            '',
+            '**Success Criteria**:',
+            f'- Step {n} output exists',
+            '',
+        ]
+    with open(os.path.join(plan_dir, 'task-plan.md'), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+
+
+def write_questions(root):
+    content = """# Questions For You
+
+### Question 1: Scope
+Should the simulated project include optional features?
+
+**Your Answer:** _____
+
+### Question 2: Output format
+Which format should the deliverables use?
+
+**Your Answer:** _____
+
+---
+"""
+    with open(os.path.join(root, 'Questions_For_You.md'), 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def complete_phase(root, phase, total):
+    """Tick a phase's checkboxes in task-plan.md and update STATUS.md."""
+    plan_path = os.path.join(root, 'docs', 'planning', 'task-plan.md')
+    if os.path.exists(plan_path):
+        with open(plan_path, 'r', encoding='utf-8') as f:
+            plan = f.read()
+        plan = re.sub(rf'(- \[) (\] Task {phase}\.)', r'\1x\2', plan)
+        with open(plan_path, 'w', encoding='utf-8') as f:
+            f.write(plan)
+
+    # Only the human-readable table - the YAML frontmatter belongs to the server
+    status_path = os.path.join(root, 'STATUS.md')
+    if os.path.exists(status_path):
+        with open(status_path, 'r', encoding='utf-8') as f:
+            status = f.read()
+        status = re.sub(r'Phases Completed \| \d+ / \d+', f'Phases Completed | {phase} / {total}', status)
+        with open(status_path, 'w', encoding='utf-8') as f:
+            f.write(status)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seeded fake Claude CLI')
+    parser.add_argument('-p', '--print', dest='prompt', required=True, help='Prompt')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--session-id', help='Start a new session with this id')
+    group.add_argument('--resume', help='Resume an existing session')
+    parser.add_argument('--rate', type=float, default=20.0, help='Output lines per second')
+    parser.add_argument('--duration', type=float, default=5.0, help='Run time in seconds')
+    parser.add_argument('--exit-code', type=int, default=0, help='Exit code to return')
+    parser.add_argument('--phases', type=int, default=3, help='Phases in generated plans')
+    parser.add_argument('--questions', action='store_true', help='Ask questions while planning')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--model', default='claude-sonnet-4-20250514', help='Model to log')
+    parser.add_argument('--projects-dir', default=None, help='Claude projects dir for session logs')
+    args = parser.parse_args()
+
+    root = os.getcwd()
+    session_id = args.resume or args.session_id or str(uuid.uuid4())
+    kind = classify_prompt(args.prompt)
+    rng = random.Random(args.seed ^ zlib.crc32(args.prompt.encode('utf-8')))
+
+    projects_dir = args.projects_dir or default_projects_dir()
+    log = SessionLog(
+        os.path.join(projects_dir, encode_project_path(root), f'{session_id}.jsonl'),
+        session_id, args.model, rng, root
+    )
+    log.prompt(args.prompt)
+
+    total_lines = max(1, int(args.rate * args.duration))
+    interval = 1.0 / args.rate if args.rate > 0 else 0
+    total_phases = args.phases
+    plan_path = os.path.join(root, 'docs', 'planning', 'task-plan.md')
+    if kind in ('execute', 'continue') and os.path.exists(plan_path):
+        with open(plan_path, 'r', encoding='utf-8') as f:
+            total_phases = len(re.findall(r'^##[#]?\s+Phase\s+\d+', f.read(), re.MULTILINE)) or args.phases
+
+    print(f'[simulator] session {session_id} ({kind}): {args.prompt}', flush=True)
+
+    for i in range(1, total_lines + 1):
+        print(f'[simulator] {kind} step {i}/{total_lines}', flush=True)
+
+        # Roughly one logged turn per ten lines, every other one calling a tool
+        if i % 10 == 1:
+            tool = ('Read', {'file_path': plan_path}) if (i // 10) % 2 == 0 else None
+            log.assistant_turn(f'{kind} step {i}', tool)
+
+        if kind in ('execute', 'continue') and total_phases:
+            phase = i * total_phases // total_lines
+            if phase and phase != (i - 1) * total_phases // total_lines:
+                complete_phase(root, phase, total_phases)
+
+        if interval:
+            time.sleep(interval)
+
+    if kind == 'plan':
+        write_plan(root, args.phases)
+        if args.questions:
+            write_questions(root)
+    elif kind == 'refine':
+        write_plan(root, args.phases, refined=True)
+
+    log.assistant_turn(f'Finished: {args.prompt}')
+    print('[simulator] done', flush=True)
+    return args.exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
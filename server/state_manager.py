@@ -7,9 +7,11 @@ Implements a state machine with proper transitions and error handling.
 
 import os
 import re
+import json
+import uuid
 import yaml
 import threading
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 
 try:
@@ -86,6 +88,8 @@ class StateManager:
         'phase_name': None,
         'process_id': None,
         'process_start': None,
+        'session_id': None,
+        'run_id': None,
         'last_updated': None,
         'error': None,
         'previous_state': None,
@@ -101,7 +105,11 @@ class StateManager:
         """
         self.project_root = project_root
         self.status_file = os.path.join(project_root, 'STATUS.md')
+        self.journal_file = os.path.join(project_root, '.conductor', 'phase-events.jsonl')
         self._lock = threading.RLock()
+        self._last_event = None
+        # Phase reported by record_phase_progress, not yet saved to STATUS.md
+        self._phase_progress: Optional[Dict[str, Any]] = None
 
     def get_state(self) -> Dict[str, Any]:
         """
@@ -159,7 +167,7 @@ class StateManager:
             state['last_updated'] = datetime.now().isoformat()
             state.update(kwargs)
 
-            self._write_state(state)
+            self._write_state(state, action='set_state')
             return state
 
     def transition(self, action: str, **kwargs) -> Dict[str, Any]:
@@ -204,7 +212,7 @@ class StateManager:
             current_state['last_updated'] = datetime.now().isoformat()
             current_state.update(kwargs)
 
-            self._write_state(current_state)
+            self._write_state(current_state, action=action)
             return current_state
 
     def update_phase(self, phase: int, total: int, name: Optional[str] = None) -> Dict[str, Any]:
@@ -227,9 +235,31 @@ class StateManager:
                 state['phase_name'] = name
             state['last_updated'] = datetime.now().isoformat()
 
-            self._write_state(state)
+            self._write_state(state, action='update_phase')
             return state
 
+    def record_phase_progress(self, phase: int, total: int, name: Optional[str] = None) -> None:
+        """
+        Journal a phase boundary reported by Claude without rewriting STATUS.md.
+
+        While executing, Claude tracks progress in the STATUS.md body itself;
+        rewriting the file mid-run would clobber its notes. The phase is
+        kept in memory instead and merged into the next write, so later
+        events in the same run do not journal the older phase again.
+
+        Args:
+            phase: Phase now in progress
+            total: Total number of phases
+            name: Optional phase name
+        """
+        with self._lock:
+            state = self.get_state()
+            self._merge_phase_progress(state)
+            state.update(phase=phase, total_phases=total, phase_name=name or state.get('phase_name'))
+            self._phase_progress = {'run_id': state.get('run_id'), 'phase': phase,
+                                    'total_phases': total, 'phase_name': state['phase_name']}
+            self._journal(state, 'phase_progress')
+
     def set_activity(self, activity: str) -> Dict[str, Any]:
         """
         Update the activity message.
@@ -260,12 +290,16 @@ class StateManager:
         """
         return self.transition('error', error=error_message)
 
-    def set_process(self, pid: Optional[int]) -> Dict[str, Any]:
+    def set_process(self, pid: Optional[int], session_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Update the running process information.
 
+        The Claude session id is kept after the process exits so a later
+        follow-up action can resume it.
+
         Args:
             pid: Process ID or None if no process running
+            session_id: Claude session id of the run, if known
 
         Returns:
             Updated state dictionary
@@ -273,15 +307,68 @@ class StateManager:
         with self._lock:
             state = self.get_state()
             state['process_id'] = pid
+            if session_id:
+                state['session_id'] = session_id
             if pid:
                 state['process_start'] = datetime.now().isoformat()
+                state['run_id'] = uuid.uuid4().hex[:12]
             else:
                 state['process_start'] = None
+                state['run_id'] = None
             state['last_updated'] = datetime.now().isoformat()
 
-            self._write_state(state)
+            self._write_state(state, action='run_start' if pid else 'run_end')
             return state
 
+    def _merge_phase_progress(self, state: Dict[str, Any]) -> None:
+        """
+        Apply the phase last recorded by record_phase_progress to a state
+        read from STATUS.md.
+
+        Only applies within the run that recorded it, and never moves the
+        phase backwards.
+        """
+        progress = self._phase_progress
+        if not progress:
+            return
+        if progress['run_id'] != state.get('run_id') or (state.get('phase') or 0) > progress['phase']:
+            self._phase_progress = None
+            return
+        state.update(phase=progress['phase'], total_phases=progress['total_phases'],
+                     phase_name=progress['phase_name'] or state.get('phase_name'))
+
+    def _journal(self, state: Dict[str, Any], action: Optional[str]) -> None:
+        """
+        Append a phase-journal event if the state, phase or run changed.
+
+        The journal (.conductor/phase-events.jsonl) gives the cost report
+        the boundaries to attribute usage to phases. Times are UTC in the
+        same ISO format as Claude's session logs.
+        """
+        key = (state.get('state'), state.get('phase'), state.get('total_phases'),
+               state.get('phase_name'), state.get('run_id'))
+        if key == self._last_event:
+            return
+        self._last_event = key
+
+        event = {
+            'time': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z',
+            'action': action,
+            'state': state.get('state'),
+            'phase': state.get('phase'),
+            'total_phases': state.get('total_phases'),
+            'phase_name': state.get('phase_name'),
+            'session_id': state.get('session_id'),
+            'run_id': state.get('run_id')
+        }
+        try:
+            os.makedirs(os.path.dirname(self.journal_file), exist_ok=True)
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(event) + '\n')
+        except OSError:
+            # The journal only feeds cost attribution; never fail a transition over it
+            pass
+
     def _read_file(self) -> str:
         """Read STATUS.md with optional file locking."""
         if HAS_PORTALOCKER:
@@ -374,17 +461,24 @@ class StateManager:
 
         return state
 
-    def _write_state(self, state: Dict[str, Any]) -> None:
+    def _write_state(self, state: Dict[str, Any], action: Optional[str] = None) -> None:
         """
         Write state to STATUS.md with YAML frontmatter.
 
         Args:
             state: State dictionary to write
+            action: What caused the change, for the phase journal
         """
+        # Explicit phase updates and resets win over recorded progress;
+        # anything else saves it, after which STATUS.md is up to date
+        if action != 'update_phase' and state.get('state') not in ('reset', 'configured'):
+            self._merge_phase_progress(state)
+        self._phase_progress = None
+
         # Build YAML frontmatter
         frontmatter_fields = [
             'state', 'phase', 'total_phases', 'phase_name',
-            'process_id', 'process_start', 'last_updated',
+            'process_id', 'process_start', 'session_id', 'run_id', 'last_updated',
             'error', 'previous_state', 'activity'
         ]
         frontmatter = {k: state.get(k) for k in frontmatter_fields}
@@ -441,6 +535,7 @@ _State managed by StateManager_
 """
 
         self._write_file(content)
+        self._journal(state, action)
 
 
 # Singleton instance (created when module is imported with project root)
@@ -9,6 +9,7 @@ class APIClient {
         this.baseURL = baseURL;
         this.eventSource = null;
         this.onStateUpdate = null;
+        this.onPlanUpdate = null;
         this.onConnectionChange = null;
         this.reconnectAttempts = 0;
         this.maxReconnectAttempts = 10;
@@ -43,6 +44,18 @@ class APIClient {
             }
         };
 
+        // Plan changes arrive as a named event carrying only the changed phases
+        this.eventSource.addEventListener('plan', (event) => {
+            try {
+                const delta = JSON.parse(event.data);
+                if (this.onPlanUpdate) {
+                    this.onPlanUpdate(delta);
+                }
+            } catch (e) {
+                console.error('Failed to parse plan event:', e);
+            }
+        });
+
         this.eventSource.onerror = () => {
             console.log('SSE disconnected');
             if (this.onConnectionChange) {
@@ -121,12 +134,16 @@ class APIClient {
     // Questions API
     getQuestions() { return this.get('/questions'); }
     submitAnswers(answers) { return this.post('/questions/answer', { answers }); }
+    saveAnswer(number, answer) { return this.post('/questions/answer', { answers: { [number]: answer } }); }
     skipQuestions() { return this.post('/questions/skip', {}); }
 
     // Planning Questions API (new)
     refinePlan(skipped) { return this.post('/actions/refine-plan', { skipped }); }
     openQuestionsFile() { return this.get('/questions/open'); }
 
+    // Plan API
+    getPlan() { return this.get('/plan'); }
+
     // Action API (new endpoints)
     generatePlan() { return this.post('/actions/generate-plan', {}); }
     executePlan() { return this.post('/actions/execute', {}); }
@@ -145,29 +162,106 @@ class APIClient {
     getReferences() { return this.get('/references'); }
     archiveReferences() { return this.post('/references/archive', {}); }
 
-    // Upload files (special handling for FormData)
-    async uploadReferences(files) {
-        const formData = new FormData();
+    /**
+     * Upload files to the reference folder.
+     *
+     * Each file goes through the resumable upload API in chunks, so large
+     * files survive dropped connections and page reloads: the upload id is
+     * remembered per file, and an interrupted upload continues from the
+     * offset the server reports.
+     */
+    async uploadReferences(files, onProgress = null) {
+        const uploaded = [];
+        const total = Array.from(files).reduce((sum, file) => sum + file.size, 0);
+        let done = 0;
         for (const file of files) {
-            formData.append('files', file);
+            const result = await this.uploadReference(file, (sent) => {
+                if (onProgress) onProgress(done + sent, total);
+            });
+            done += file.size;
+            uploaded.push(result.file);
         }
-        const response = await fetch(`${this.baseURL}/references/upload`, {
-            method: 'POST',
-            body: formData  // Don't set Content-Type, browser will set it with boundary
-        });
-        if (!response.ok) {
-            const error = await response.json().catch(() => ({ error: response.statusText }));
-            throw new Error(error.error || `HTTP ${response.status}`);
+        return { success: true, files: uploaded };
+    }
+
+    async uploadReference(file, onProgress = null) {
+        const key = `upload:${file.name}:${file.size}:${file.lastModified}`;
+        let upload = null;
+        const savedId = localStorage.getItem(key);
+        if (savedId) {
+            upload = await this.request(`/references/uploads/${savedId}`).catch(() => null);
+        }
+        if (!upload) {
+            upload = await this.post('/references/uploads', { name: file.name, size: file.size });
+            localStorage.setItem(key, upload.id);
+        }
+
+        let offset = upload.offset;
+        let retries = 0;
+        while (true) {
+            if (onProgress) onProgress(offset);
+            try {
+                const end = Math.min(offset + upload.chunkSize, file.size);
+                const response = await fetch(`${this.baseURL}/references/uploads/${upload.id}?offset=${offset}`, {
+                    method: 'PUT',
+                    headers: { 'Content-Type': 'application/octet-stream' },
+                    body: file.slice(offset, end)
+                });
+                const result = await response.json().catch(() => ({ error: response.statusText }));
+                if (response.status === 409 && result.offset !== undefined) {
+                    // Server has a different offset (e.g. a chunk landed but its reply was lost)
+                    offset = result.offset;
+                    continue;
+                }
+                if (!response.ok) {
+                    localStorage.removeItem(key);
+                    throw new Error(result.error || `HTTP ${response.status}`);
+                }
+                retries = 0;
+                offset = result.offset;
+                if (result.complete) {
+                    localStorage.removeItem(key);
+                    if (onProgress) onProgress(file.size);
+                    return result;
+                }
+            } catch (e) {
+                if (!(e instanceof TypeError) || ++retries > 5) throw e;
+                // Connection dropped; wait, then resume from wherever the server got to
+                await new Promise(resolve => setTimeout(resolve, 1000 * retries));
+                const status = await this.request(`/references/uploads/${upload.id}`).catch(() => null);
+                if (status) offset = status.offset;
+            }
         }
-        return response.json();
     }
 
     // Archives
     getArchives() { return this.get('/archive/list'); }
     openArchive() { return this.get('/archive/open'); }
 
-    // Full reset (archive + reset)
-    resetProject(projectName) { return this.post('/reset', { projectName }); }
+    archiveProject(projectName, options = {}) { return this.post('/archive', { projectName, ...options }); }
+    downloadArchiveURL(name) { return `${this.baseURL}/archive/${encodeURIComponent(name)}/download`; }
+
+    // Full reset (archive + reset); runs as a background job
+    async resetProject(projectName, onProgress = null) {
+        const { jobId } = await this.post('/reset', { projectName });
+        return this.waitForJob(jobId, onProgress);
+    }
+
+    // Background jobs
+    getJob(jobId) { return this.get(`/jobs/${jobId}`); }
+
+    /**
+     * Poll a background job until it finishes; resolves with its result.
+     */
+    async waitForJob(jobId, onProgress = null, interval = 500) {
+        while (true) {
+            const job = await this.getJob(jobId);
+            if (onProgress) onProgress(job);
+            if (job.status === 'done') return job.result;
+            if (job.status === 'error') throw new Error(job.error);
+            await new Promise(resolve => setTimeout(resolve, interval));
+        }
+    }
 }
 
 // Export singleton
@@ -35,9 +35,15 @@ function conductorApp() {
         referenceFiles: [],
         noReferenceFiles: false,
         isDragging: false,
+        uploadProgress: null,  // Percent uploaded while an upload runs
+        seenExtractions: {},   // Archive extraction job id -> last status seen
 
         // Questions
         questions: [],
+        questionsFingerprint: null,
+
+        // Structured plan (kept current by SSE plan deltas)
+        plan: { etag: null, phases: [], totals: null },
 
         // System status
         system: {
@@ -67,6 +73,7 @@ function conductorApp() {
 
             // Connect to SSE for real-time updates
             api.onStateUpdate = (data) => this.handleStateUpdate(data);
+            api.onPlanUpdate = (delta) => this.applyPlanDelta(delta);
             api.onConnectionChange = (connected) => this.connected = connected;
             api.connectSSE();
 
@@ -88,11 +95,22 @@ function conductorApp() {
             this.lastUpdateTime = Date.now();
             this.secondsSinceUpdate = 0;
 
-            // Auto-load questions when in questions state
-            if (this.state.state === 'questions' && this.questions.length === 0) {
+            // Auto-load questions when in questions state, and again whenever the file changes
+            const questionsFingerprint = data.questions ? data.questions.fingerprint : null;
+            if (this.state.state === 'questions' &&
+                (this.questions.length === 0 || questionsFingerprint !== this.questionsFingerprint)) {
+                this.questionsFingerprint = questionsFingerprint;
                 this.loadQuestions();
             }
 
+            // Reload the file list as uploaded archives finish unpacking
+            for (const job of this.extractionJobs) {
+                if (!['queued', 'running'].includes(job.status) && this.seenExtractions[job.id] !== job.status) {
+                    this.loadReferenceFiles();
+                }
+                this.seenExtractions[job.id] = job.status;
+            }
+
             // Auto-collapse config when complete
             if (this.state.state === 'complete') {
                 this.configExpanded = false;
@@ -158,6 +176,34 @@ function conductorApp() {
             }
         },
 
+        /**
+         * Apply a plan event: a full plan, or the phases changed since the one we have
+         */
+        async applyPlanDelta(delta) {
+            if (delta.full) {
+                this.plan = { etag: delta.etag, phases: delta.phases, totals: delta.totals };
+                return;
+            }
+            if (delta.since !== this.plan.etag) {
+                // Missed a version (e.g. reconnected); fetch the whole plan
+                try {
+                    const plan = await api.getPlan();
+                    this.plan = { etag: plan.etag, phases: plan.phases, totals: plan.totals };
+                } catch (e) {
+                    console.error('Failed to load plan:', e);
+                }
+                return;
+            }
+            const phases = new Map(this.plan.phases.map(p => [p.number, p]));
+            delta.removed.forEach(n => phases.delete(n));
+            delta.changed.forEach(p => phases.set(p.number, p));
+            this.plan = {
+                etag: delta.etag,
+                phases: delta.order.map(n => phases.get(n)).filter(Boolean),
+                totals: delta.totals
+            };
+        },
+
         /**
          * Load questions
          */
@@ -223,6 +269,19 @@ function conductorApp() {
             }
         },
 
+        /**
+         * Save a draft answer while the user types
+         */
+        async saveDraft(question) {
+            try {
+                const result = await api.saveAnswer(question.number, question.answer || '');
+                // Our own write; don't reload the questions over the user's typing
+                this.questionsFingerprint = result.fingerprint;
+            } catch (e) {
+                console.error('Failed to save draft answer:', e);
+            }
+        },
+
         /**
          * Skip questions
          */
@@ -385,6 +444,10 @@ function conductorApp() {
             try {
                 const files = await api.getReferences();
                 this.referenceFiles = files || [];
+                // Token estimates fill in as the background indexer gets to each file
+                if (this.referenceFiles.some(file => !file.indexed)) {
+                    setTimeout(() => this.loadReferenceFiles(), 2000);
+                }
             } catch (e) {
                 console.error('Failed to load reference files:', e);
             }
@@ -442,14 +505,18 @@ function conductorApp() {
          */
         async uploadFiles(files) {
             this.loading = true;
+            this.uploadProgress = 0;
             try {
-                await api.uploadReferences(files);
+                await api.uploadReferences(files, (sent, total) => {
+                    this.uploadProgress = total ? Math.floor(sent * 100 / total) : 100;
+                });
                 await this.loadReferenceFiles();
                 this.noReferenceFiles = false;
             } catch (e) {
                 alert('Failed to upload files: ' + e.message);
             } finally {
                 this.loading = false;
+                this.uploadProgress = null;
             }
         },
 
@@ -471,6 +538,14 @@ function conductorApp() {
 
         // Computed properties
 
+        get extractionJobs() {
+            return (this.state.jobs || []).filter(job => job.kind === 'reference_extract');
+        },
+
+        get referenceTokens() {
+            return this.referenceFiles.reduce((sum, file) => sum + (file.tokens || 0), 0);
+        },
+
         get statusDotClass() {
             const classes = {
                 'complete': 'status-dot--success',
@@ -0,0 +1,32 @@
+import json
+
+from scripts import generate_cost_report as cost_report
+from scripts.cost_store import CostStore
+
+
+def write_log(path, message_id):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    entry = {
+        'type': 'assistant',
+        'timestamp': '2026-01-01T00:00:00.000Z',
+        'requestId': f'req-{message_id}',
+        'message': {'id': message_id, 'model': 'claude-sonnet-4-5',
+                    'usage': {'input_tokens': 10, 'output_tokens': 5}}
+    }
+    path.write_text(json.dumps(entry) + '\n', encoding='utf-8')
+
+
+def test_nested_subagent_logs_with_same_name_get_distinct_ids(tmp_path):
+    session_file = tmp_path / 'session.jsonl'
+    subagent_dir = tmp_path / 'session' / 'subagents'
+    write_log(session_file, 'main')
+    write_log(subagent_dir / 'agent-a.jsonl', 'a')
+    write_log(subagent_dir / 'agent-b.jsonl', 'b')
+    write_log(subagent_dir / 'agent-a' / 'subagents' / 'agent-c.jsonl', 'ac')
+    write_log(subagent_dir / 'agent-b' / 'subagents' / 'agent-c.jsonl', 'bc')
+
+    document, agents = cost_report.compute_report(session_file, subagent_dir, workers=1)
+
+    ids = sorted(agent['id'] for agent in agents)
+    assert ids == ['a', 'a/subagents/agent-c', 'b', 'b/subagents/agent-c', 'main']
+    CostStore(tmp_path / '.conductor').save(document, agents)
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from scripts import generate_cost_report as cost_report
+from scripts.session_parser import new_seen_set, read_usage
+
+TOKEN_FIELDS = ('input_tokens', 'output_tokens', 'cache_read', 'cache_write')
+
+# Lines the CLI writes per message: one per streamed content block
+DUPLICATES = 3
+MESSAGES = 40
+
+
+def write_duplicated_log(path):
+    """Log every assistant message DUPLICATES times with the same ids and usage."""
+    with open(path, 'w', encoding='utf-8') as f:
+        for n in range(MESSAGES):
+            usage = {'input_tokens': 10 + n, 'output_tokens': 100 + n,
+                     'cache_read_input_tokens': 1000 * n, 'cache_creation_input_tokens': 50}
+            blocks = [{'type': 'thinking', 'thinking': 'Planning'},
+                      {'type': 'text', 'text': f'Step {n}'},
+                      {'type': 'tool_use', 'id': f'toolu_{n:04d}', 'name': 'Read', 'input': {}}]
+            for block in blocks[:DUPLICATES]:
+                entry = {'type': 'assistant', 'timestamp': f'2026-01-01T00:{n // 60:02d}:{n % 60:02d}.000Z',
+                         'requestId': f'req_{n:04d}',
+                         'message': {'id': f'msg_{n:04d}', 'model': 'claude-sonnet-4-20250514',
+                                     'content': [block], 'usage': usage}}
+                f.write(json.dumps(entry) + '\n')
+
+
+def totals(records):
+    return {field: sum(r[field] for r in records) for field in TOKEN_FIELDS}
+
+
+@pytest.mark.parametrize('dedup', ['exact', 'bloom'])
+def test_read_usage_counts_each_message_once(tmp_path, dedup):
+    log = tmp_path / 'session.jsonl'
+    write_duplicated_log(log)
+
+    raw, _ = read_usage(log)
+    records, _ = read_usage(log, seen=new_seen_set(dedup))
+
+    assert len(raw) == MESSAGES * DUPLICATES
+    assert len(records) == MESSAGES
+    assert totals(records) == {field: value // DUPLICATES for field, value in totals(raw).items()}
+
+
+@pytest.mark.parametrize('dedup', ['exact', 'bloom'])
+def test_report_counts_each_message_once(tmp_path, dedup):
+    log = tmp_path / 'session.jsonl'
+    write_duplicated_log(log)
+
+    undeduplicated, _ = cost_report.compute_report(log, None, workers=1, dedup='off')
+    document, agents = cost_report.compute_report(log, None, workers=1, dedup=dedup)
+
+    assert undeduplicated['metrics']['tokens']['output'] == DUPLICATES * document['metrics']['tokens']['output']
+    assert agents[0]['messages'] == MESSAGES
+    assert document['totals'] == {field: value // DUPLICATES
+                                  for field, value in undeduplicated['totals'].items()}
@@ -0,0 +1,35 @@
+import json
+import os
+
+from server.state_manager import StateManager
+
+
+def read_journal(manager):
+    with open(manager.journal_file, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_recorded_phase_survives_next_write(tmp_path):
+    manager = StateManager(str(tmp_path))
+    manager.set_state('executing', phase=1, total_phases=5)
+    manager.set_process(1234)
+
+    manager.record_phase_progress(3, 5)
+    manager.set_state('complete')
+
+    events = read_journal(manager)
+    assert events[-1]['state'] == 'complete'
+    assert events[-1]['phase'] == 3
+    assert manager.get_state()['phase'] == 3
+
+
+def test_recorded_phase_does_not_leak_into_next_run(tmp_path):
+    manager = StateManager(str(tmp_path))
+    manager.set_state('executing', phase=1, total_phases=5)
+    manager.set_process(1234)
+    manager.record_phase_progress(3, 5)
+    manager.set_state('reset', phase=0, total_phases=0)
+
+    assert manager.get_state()['phase'] == 0
+    assert read_journal(manager)[-1]['phase'] == 0
+    assert os.path.exists(manager.status_file)